@@ -1,189 +1,102 @@
 # analysis_engine.py
 import pandas as pd
 import numpy as np
-import os
-import tempfile
+import time
 from datetime import datetime
+from price_cache import PriceCache
+from fundamental_cache import default_fundamental_cache
+from result_cache import analysis_key, default_result_cache
+from pipeline import AnalysisPipeline, StageError, configure_fundamental_analyzer
 
 class AnalysisEngine:
     """
     Engine untuk menangani logika analisis dan pemrosesan data
     """
-    def __init__(self):
+    def __init__(self, cache_dir=None, result_cache=None, fundamental_cache=None):
+        """
+        :param cache_dir: direktori cache Parquet untuk hasil parsing CSV (default: lihat price_cache.default_cache_dir)
+        :param result_cache: ResultCache untuk hasil analisis (default: instance bersama default_result_cache())
+        :param fundamental_cache: FundamentalCache persisten (default: instance bersama default_fundamental_cache())
+        """
         self.benchmark_data = None
         self.stock_data = {}
         self.results = None
         self.combined_results = None
         self.rrg_results = None
         self.analysis_date = None
-        self.temp_files = []
-    
-    def save_uploaded_file(self, uploaded_file):
-        """
-        Menyimpan file yang di-upload ke file sementara
-        """
-        with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(uploaded_file.name)[1]) as f:
-            f.write(uploaded_file.getvalue())
-            self.temp_files.append(f.name)
-            return f.name
+        self.price_cache = PriceCache(cache_dir)
+        self.result_cache = result_cache if result_cache is not None else default_result_cache()
+        self.fundamental_cache = fundamental_cache if fundamental_cache is not None else default_fundamental_cache()
+        self.pipeline = AnalysisPipeline(price_cache=self.price_cache, fundamental_cache=self.fundamental_cache)
     
-    def run_analysis(self, benchmark_file, stock_files, analysis_params):
+    def run_analysis(self, benchmark_file, stock_files, analysis_params, universe_file=None, progress_callback=None):
         """
         Menjalankan analisis berdasarkan file yang di-upload dan parameter yang diberikan
         
-        :param benchmark_file: File benchmark
-        :param stock_files: Daftar file saham
+        :param benchmark_file: File benchmark (UploadedFile, buffer, bytes, atau path)
+        :param stock_files: Daftar file saham (UploadedFile, buffer, bytes, atau path)
         :param analysis_params: Dictionary parameter analisis
-        :return: Tuple (success, message, results)
+        :param universe_file: File universe format panjang (Ticker,Date,OHLCV, boleh .gz) opsional
+        :param progress_callback: fungsi (fraksi 0-1, teks) untuk melaporkan progress per stage
+                                  (per file saham saat memuat data, per ticker saat mengambil data fundamental)
+        :return: Tuple (success, message, results). results['timings'] berisi waktu (detik) dan puncak
+                 memori (MB, jika analysis_params['measure_memory']) per stage; results['rrg_analyzer'] bernilai None jika hasil diambil dari cache
         """
         try:
-            # Simpan file ke temporary files
-            benchmark_temp = self.save_uploaded_file(benchmark_file)
-            stock_temps = [self.save_uploaded_file(f) for f in stock_files]
-            
             # Ekstrak parameter
-            period_years = analysis_params.get('period_years', 3.0)
-            rs_ratio_period = analysis_params.get('rs_ratio_period', 52)
-            rs_momentum_period = analysis_params.get('rs_momentum_period', 26)
-            max_date = analysis_params.get('max_date', None)
             analysis_type = analysis_params.get('analysis_type', 'RRG (Teknikal)')
             use_fundamental = analysis_params.get('use_fundamental', False)
             use_universe_score = analysis_params.get('use_universe_score', False)
-            universe_score_input = analysis_params.get('universe_score_input', 50)
+            use_result_cache = analysis_params.get('use_result_cache', True)
+            refresh_fundamental = analysis_params.get('refresh_fundamental', False)
             
-            # Import modul RRG dan fundamental
-            from rrg import RRGAnalyzer
+            # Kunci cache hasil hanya berisi hash file dan parameter, sedangkan data fundamental memiliki TTL
+            # sendiri (cache fundamental persisten); hasil dengan data fundamental tidak disimpan di cache hasil
+            # agar data yang kedaluwarsa tetap diambil ulang. Stage RRG tetap dipakai ulang oleh pipeline.
             if use_fundamental:
-                from fundamental_analyzer import FundamentalAnalyzer
-            
-            # Step 1: Inisialisasi RRG Analyzer
-            rrg_analyzer = RRGAnalyzer(
-                benchmark_file=benchmark_temp,
-                stock_files=stock_temps,
-                period_years=period_years,
-                max_date=max_date
-            )
-            
-            # Step 2: Load data
-            success = rrg_analyzer.load_data_from_files()
-            if not success:
-                return False, "Gagal memuat data dari file. Periksa format file CSV Anda.", None
+                use_result_cache = False
             
-            # Step 3: Hitung RS-Ratio
-            rrg_analyzer.calculate_rs_ratio(period=rs_ratio_period)
-            if not rrg_analyzer.rs_ratio:
-                return False, "Gagal menghitung RS-Ratio. Mungkin tidak cukup data.", None
+            # Setiap stage hanya dihitung ulang jika inputnya (file atau parameter stage) berubah
+            self.pipeline.progress_callback = progress_callback
+            self.pipeline.measure_memory = analysis_params.get('measure_memory', False)
+            self.pipeline.configure(benchmark_file, stock_files, analysis_params, universe_file,
+                                    refresh=('fundamental_data',) if refresh_fundamental else ())
             
-            # Step 4: Hitung RS-Momentum
-            rrg_analyzer.calculate_rs_momentum(period=rs_momentum_period)
-            if not rrg_analyzer.rs_momentum:
-                return False, "Gagal menghitung RS-Momentum. Mungkin tidak cukup data.", None
+            # Hasil untuk file dan parameter yang sama diambil dari cache
+            cache_key = None
+            if use_result_cache:
+                start_time = time.perf_counter()
+                cache_key = analysis_key(benchmark_file, stock_files, analysis_params, universe_file)
+                cached = self.result_cache.get(cache_key)
+                self.pipeline.timings['result_cache'] = {
+                    'seconds': time.perf_counter() - start_time,
+                    'peak_memory_mb': None,
+                    'cached': cached is not None
+                }
+                if cached is not None:
+                    self.rrg_results = cached['rrg_results']
+                    self.combined_results = cached['combined_results']
+                    self.analysis_date = cached['analysis_date']
+                    self.pipeline.report_progress(1.0, "Analisis selesai!")
+                    return True, "Analisis berhasil.", self._finish_results(cached, True, analysis_params, None)
             
-            # Step 5: Normalisasi data
-            success = rrg_analyzer.normalize_data()
-            if not success:
-                return False, "Gagal melakukan normalisasi data. Mungkin tidak cukup variasi dalam data.", None
-            
-            # Step 6: Dapatkan hasil RRG
-            rrg_results = rrg_analyzer.get_latest_data()
+            # Step 1-6: Load data, RS-Ratio, RS-Momentum, normalisasi, dan hasil RRG terbaru
+            rrg_results = self.pipeline.get('latest').copy()
             
             # Analisis Fundamental jika diaktifkan
             combined_results = None
             if use_fundamental and analysis_type in ["Fundamental", "Gabungan (Teknikal + Fundamental)"]:
-                # Konfigurasi indikator dan bobot fundamental
-                indicators = []
-                weights = {}
-                
-                include_roe = analysis_params.get('include_roe', True)
-                include_roa = analysis_params.get('include_roa', True)
-                include_profit_margin = analysis_params.get('include_profit_margin', True)
-                include_earnings_growth = analysis_params.get('include_earnings_growth', True)
-                include_debt_equity = analysis_params.get('include_debt_equity', True)
-                
-                roe_weight = analysis_params.get('roe_weight', 0.25)
-                roa_weight = analysis_params.get('roa_weight', 0.20)
-                pm_weight = analysis_params.get('pm_weight', 0.20)
-                eg_weight = analysis_params.get('eg_weight', 0.20)
-                de_weight = analysis_params.get('de_weight', 0.15)
-                
-                if include_roe:
-                    indicators.append('returnOnEquity')
-                    weights['returnOnEquity'] = roe_weight
-                
-                if include_roa:
-                    indicators.append('returnOnAssets')
-                    weights['returnOnAssets'] = roa_weight
-                
-                if include_profit_margin:
-                    indicators.append('profitMargins')
-                    weights['profitMargins'] = pm_weight
-                
-                if include_earnings_growth:
-                    indicators.append('earningsGrowth')
-                    weights['earningsGrowth'] = eg_weight
-                
-                if include_debt_equity:
-                    indicators.append('debtToEquity')
-                    weights['debtToEquity'] = de_weight
-                
-                # Inisialisasi FundamentalAnalyzer
-                fundamental_analyzer = FundamentalAnalyzer()
-                
-                # Set indikator dan bobot yang dipilih user
-                if indicators:
-                    fundamental_analyzer.fundamental_indicators = indicators
-                    fundamental_analyzer.indicator_weights = weights
-                
-                # Ekstrak ticker dari hasil RRG
-                tickers = rrg_results['Symbol'].tolist()
-                
-                # Dapatkan data fundamental
-                refresh_fundamental = analysis_params.get('refresh_fundamental', False)
-                fundamental_results = fundamental_analyzer.get_fundamental_analysis(tickers)
-                
-                # Tetapkan bobot tetap: 30% fundamental, 30% technical, 40% universe
-                fundamental_analyzer.technical_weight = 0.3
-                fundamental_analyzer.fundamental_weight = 0.3
-                
-                # Gabungkan hasil RRG dan fundamental
-                combined_results = fundamental_analyzer.combine_with_rrg(fundamental_results, rrg_results)
-                
-                # Tambahkan Stock Universe Score jika diaktifkan
-                if use_universe_score:
-                    # Tambahkan kolom universe score
-                    combined_results['Universe_Score'] = universe_score_input
-                    
-                    # Hitung skor gabungan baru dengan 3 komponen
-                    combined_results['Combined_Score'] = (
-                        combined_results['Universe_Score'] * 0.4 +
-                        combined_results['Fundamental_Score'] * 0.3 +
-                        combined_results['RS_Momentum_Normalized'] * 0.3
-                    )
-                    
-                    # Update rekomendasi berdasarkan skor gabungan baru
-                    def get_combined_recommendation(score):
-                        if score >= 80:
-                            return "Strong Buy"
-                        elif score >= 65:
-                            return "Buy"
-                        elif score >= 50:
-                            return "Hold"
-                        elif score >= 35:
-                            return "Reduce"
-                        else:
-                            return "Sell"
-                    
-                    combined_results['Combined_Recommendation'] = combined_results['Combined_Score'].apply(get_combined_recommendation)
+                combined_results = self.pipeline.get('combine').copy()
             
             # Ambil tanggal analisis
-            analysis_date = rrg_analyzer.get_analysis_date().strftime('%d %B %Y')
+            analysis_date = self.pipeline.get('load').get_analysis_date().strftime('%d %B %Y')
             
             # Simpan hasil
             self.rrg_results = rrg_results
             self.combined_results = combined_results
             self.analysis_date = analysis_date
             
-            return True, "Analisis berhasil.", {
+            results = {
                 'rrg_results': rrg_results,
                 'combined_results': combined_results,
                 'analysis_date': analysis_date,
@@ -191,22 +104,41 @@ class AnalysisEngine:
                 'use_fundamental': use_fundamental,
                 'use_universe_score': use_universe_score
             }
+            if cache_key is not None:
+                self.result_cache.put(cache_key, results)
+            
+            self.pipeline.report_progress(1.0, "Analisis selesai!")
+            return True, "Analisis berhasil.", self._finish_results(results, False, analysis_params,
+                                                                    self.pipeline.analyzer())
             
+        except StageError as e:
+            return False, str(e), None
+        
         except Exception as e:
             return False, f"Terjadi kesalahan dalam analisis: {str(e)}", None
-        
-        finally:
-            # Clean up temp files
-            self.cleanup_temp_files()
     
-    def cleanup_temp_files(self):
+    def _finish_results(self, results, from_cache, analysis_params, rrg_analyzer):
         """
-        Membersihkan file sementara
+        Melengkapi dict hasil dengan objek yang tidak disimpan di cache hasil
+        """
+        results['from_cache'] = from_cache
+        results['timings'] = dict(self.pipeline.timings)
+        results['rrg_analyzer'] = rrg_analyzer
+        results['fundamental_analyzer'] = None
+        if results.get('combined_results') is not None:
+            fundamental_analyzer = self.pipeline.get_fundamental_analyzer()
+            configure_fundamental_analyzer(fundamental_analyzer, analysis_params)
+            results['fundamental_analyzer'] = fundamental_analyzer
+        return results
+    
+    def plot_rrg(self, trail_length=4, title=None):
+        """
+        Grafik RRG untuk analisis terakhir; hanya stage plot yang dijalankan ulang
+        jika yang berubah hanya panjang trail atau judul
+        
+        :param trail_length: panjang trail
+        :param title: judul grafik (opsional)
+        :return: Figure matplotlib
         """
-        for temp_file in self.temp_files:
-            if os.path.exists(temp_file):
-                try:
-                    os.unlink(temp_file)
-                except:
-                    pass
-        self.temp_files = []
\ No newline at end of file
+        self.pipeline.update_params(trail_length=trail_length, plot_title=title)
+        return self.pipeline.get('plot')
\ No newline at end of file
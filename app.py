@@ -2,9 +2,7 @@ import streamlit as st
 import pandas as pd
 import matplotlib.pyplot as plt
 from datetime import datetime, timedelta
-import time
-import os
-import tempfile
+import io
 import numpy as np
 
 # Konfigurasi halaman harus menjadi perintah Streamlit pertama
@@ -17,8 +15,7 @@ st.set_page_config(
 
 # Import untuk analisis RRG dan fundamental
 try:
-    from rrg import RRGAnalyzer
-    from fundamental_analyzer import FundamentalAnalyzer
+    from analysis_engine import AnalysisEngine
 except Exception as e:
     st.error(f"Error mengimpor modul: {str(e)}")
     st.stop()
@@ -50,6 +47,13 @@ stock_files = st.sidebar.file_uploader(
     help="File CSV dengan format: Ticker,Date,Open,High,Low,Close,Volume"
 )
 
+# Upload satu file universe (format panjang, banyak ticker dalam satu file)
+universe_file = st.sidebar.file_uploader(
+    "Upload file Universe (opsional, satu file untuk semua saham):",
+    type=["csv", "gz"],
+    help="Satu file CSV (boleh .csv.gz) berisi banyak ticker dengan format: Ticker,Date,Open,High,Low,Close,Volume"
+)
+
 # Parameter analisis
 st.sidebar.header("Parameter Analisis")
 
@@ -218,206 +222,111 @@ with st.sidebar.expander("ℹ️ Tentang Analisis Gabungan"):
     - Rekomendasi gabungan mempertimbangkan ketiga aspek di atas
     """)
 
-# Fungsi untuk menyimpan file yang di-upload ke file sementara
-def save_uploaded_file(uploaded_file):
-    with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(uploaded_file.name)[1]) as f:
-        f.write(uploaded_file.getvalue())
-    return f.name
-
 if analyze_button:
     if benchmark_file is None:
         st.error("Silakan upload file benchmark terlebih dahulu.")
-    elif not stock_files:
-        st.error("Silakan upload setidaknya satu file saham.")
+    elif not stock_files and universe_file is None:
+        st.error("Silakan upload setidaknya satu file saham atau file universe.")
     else:
         try:
-            # Simpan file ke temporary files
-            benchmark_temp = save_uploaded_file(benchmark_file)
-            stock_temps = [save_uploaded_file(f) for f in stock_files]
-            
             # Mode debug
             if debug_mode:
                 st.sidebar.subheader("Informasi Debug")
                 st.sidebar.write("Benchmark:", benchmark_file.name)
                 st.sidebar.write("Jumlah File Saham:", len(stock_files))
+                if universe_file is not None:
+                    st.sidebar.write("File Universe:", universe_file.name)
                 if use_max_date:
                     st.sidebar.write("Maksimal Tanggal:", max_date)
                 
                 # Preview data benchmark
                 try:
                     st.sidebar.subheader("Preview Benchmark")
-                    benchmark_preview = pd.read_csv(benchmark_temp)
+                    benchmark_preview = pd.read_csv(io.BytesIO(benchmark_file.getvalue()))
                     st.sidebar.write(benchmark_preview.head(3))
                     
                     # Preview data saham pertama
                     if stock_files:
                         st.sidebar.subheader(f"Preview {stock_files[0].name}")
-                        stock_preview = pd.read_csv(stock_temps[0])
+                        stock_preview = pd.read_csv(io.BytesIO(stock_files[0].getvalue()))
                         st.sidebar.write(stock_preview.head(3))
                 except Exception as e:
                     st.sidebar.error(f"Error saat preview data: {str(e)}")
             
             # Jalankan analisis RRG
             progress_text = "Menganalisis data saham..."
-            my_bar = st.progress(0, text=progress_text)
-            
-            # Step 1: Inisialisasi RRG Analyzer
-            my_bar.progress(10, text="Inisialisasi analisis RRG...")
-            rrg_analyzer = RRGAnalyzer(
-                benchmark_file=benchmark_temp,
-                stock_files=stock_temps,
-                period_years=period_years,
-                max_date=max_date
-            )
-            
-            # Step 2: Load data
-            my_bar.progress(20, text="Memuat data dari file CSV...")
-            success = rrg_analyzer.load_data_from_files()
-            if not success:
-                st.error("Gagal memuat data dari file. Periksa format file CSV Anda.")
-                my_bar.empty()
-                # Clean up temp files
-                os.unlink(benchmark_temp)
-                for temp_file in stock_temps:
-                    os.unlink(temp_file)
-                st.stop()
+            my_bar = st.progress(0.0, text=progress_text)
             
-            # Step 3: Hitung RS-Ratio
-            my_bar.progress(30, text="Menghitung RS-Ratio...")
-            rrg_analyzer.calculate_rs_ratio(period=rs_ratio_period)
-            if not rrg_analyzer.rs_ratio:
-                st.error("Gagal menghitung RS-Ratio. Mungkin tidak cukup data.")
-                my_bar.empty()
-                # Clean up temp files
-                os.unlink(benchmark_temp)
-                for temp_file in stock_temps:
-                    os.unlink(temp_file)
-                st.stop()
+            # Engine disimpan di session state sehingga perubahan parameter hanya menghitung ulang
+            # stage yang terpengaruh (mis. periode momentum baru memakai ulang data dan RS-Ratio)
+            if 'analysis_engine' not in st.session_state:
+                st.session_state.analysis_engine = AnalysisEngine()
+            engine = st.session_state.analysis_engine
             
-            # Step 4: Hitung RS-Momentum
-            my_bar.progress(40, text="Menghitung RS-Momentum...")
-            rrg_analyzer.calculate_rs_momentum(period=rs_momentum_period)
-            if not rrg_analyzer.rs_momentum:
-                st.error("Gagal menghitung RS-Momentum. Mungkin tidak cukup data.")
-                my_bar.empty()
-                # Clean up temp files
-                os.unlink(benchmark_temp)
-                for temp_file in stock_temps:
-                    os.unlink(temp_file)
-                st.stop()
+            analysis_params = {
+                'period_years': period_years,
+                'max_date': max_date,
+                'rs_ratio_period': rs_ratio_period,
+                'rs_momentum_period': rs_momentum_period,
+                'analysis_type': analysis_type,
+                'use_fundamental': use_fundamental,
+                'measure_memory': debug_mode
+            }
+            if use_fundamental:
+                analysis_params.update({
+                    'include_roe': include_roe, 'include_roa': include_roa,
+                    'include_profit_margin': include_profit_margin,
+                    'include_earnings_growth': include_earnings_growth,
+                    'include_debt_equity': include_debt_equity,
+                    'roe_weight': roe_weight, 'roa_weight': roa_weight, 'pm_weight': pm_weight,
+                    'eg_weight': eg_weight, 'de_weight': de_weight,
+                    'use_universe_score': use_universe_score,
+                    'universe_score_input': universe_score_input if use_universe_score else 50,
+                    'refresh_fundamental': refresh_fundamental,
+                    # Data fundamental di cache yang sudah kedaluwarsa langsung dipakai dan diperbarui di latar belakang
+                    'stale_while_revalidate': True
+                })
             
-            # Step 5: Normalisasi data
-            my_bar.progress(50, text="Menormalisasi data...")
-            success = rrg_analyzer.normalize_data()
+            # File yang di-upload dibaca langsung dari memori tanpa file sementara
+            success, message, results = engine.run_analysis(
+                benchmark_file, stock_files, analysis_params, universe_file,
+                progress_callback=lambda fraction, text: my_bar.progress(fraction, text=text)
+            )
+            my_bar.empty()
             if not success:
-                st.error("Gagal melakukan normalisasi data. Mungkin tidak cukup variasi dalam data.")
-                my_bar.empty()
-                # Clean up temp files
-                os.unlink(benchmark_temp)
-                for temp_file in stock_temps:
-                    os.unlink(temp_file)
+                st.error(message)
                 st.stop()
             
-            # Step 6: Dapatkan hasil RRG
-            my_bar.progress(60, text="Mempersiapkan hasil RRG...")
-            rrg_results = rrg_analyzer.get_latest_data()
+            rrg_results = results['rrg_results']
+            combined_results = results['combined_results']
+            fundamental_analyzer = results['fundamental_analyzer']
             
-            # Analisis Fundamental jika diaktifkan
-            combined_results = None
-            if use_fundamental and analysis_type in ["Fundamental", "Gabungan (Teknikal + Fundamental)"]:
-                my_bar.progress(70, text="Menginisialisasi analisis fundamental...")
-                
-                # Konfigurasi analyzer fundamental dengan indikator dan bobot yang dipilih
-                indicators = []
-                weights = {}
-                
-                if include_roe:
-                    indicators.append('returnOnEquity')
-                    weights['returnOnEquity'] = roe_weight
-                    
-                if include_roa:
-                    indicators.append('returnOnAssets')
-                    weights['returnOnAssets'] = roa_weight
-                    
-                if include_profit_margin:
-                    indicators.append('profitMargins')
-                    weights['profitMargins'] = pm_weight
-                    
-                if include_earnings_growth:
-                    indicators.append('earningsGrowth')
-                    weights['earningsGrowth'] = eg_weight
-                    
-                if include_debt_equity:
-                    indicators.append('debtToEquity')
-                    weights['debtToEquity'] = de_weight
-                
-                fundamental_analyzer = FundamentalAnalyzer()
-                
-                # Set indikator dan bobot yang dipilih user
-                if indicators:
-                    fundamental_analyzer.fundamental_indicators = indicators
-                    fundamental_analyzer.indicator_weights = weights
-                
-                # Ekstrak ticker dari hasil RRG
-                tickers = rrg_results['Symbol'].tolist()
-                
-                my_bar.progress(80, text="Mengambil data fundamental dari Yahoo Finance...")
-                fundamental_results = fundamental_analyzer.get_fundamental_analysis(tickers)
-                
-                my_bar.progress(90, text="Menggabungkan hasil analisis...")
-                
-                # Untuk menggunakan bobot tetap dan skor universe
-                if use_fundamental:
-                    # Tetapkan bobot tetap: 30% fundamental, 30% technical, 40% universe
-                    fundamental_analyzer.technical_weight = 0.3
-                    fundamental_analyzer.fundamental_weight = 0.3
-                    
-                    # Gabungkan hasil RRG dan fundamental
-                    combined_results = fundamental_analyzer.combine_with_rrg(fundamental_results, rrg_results)
-                    
-                    # Tambahkan Stock Universe Score jika diaktifkan
-                    if use_universe_score:
-                        # Tambahkan kolom universe score
-                        combined_results['Universe_Score'] = universe_score_input
-                        
-                        # Hitung skor gabungan baru dengan 3 komponen
-                        combined_results['Combined_Score'] = (
-                            combined_results['Universe_Score'] * 0.4 +
-                            combined_results['Fundamental_Score'] * 0.3 +
-                            combined_results['RS_Momentum_Normalized'] * 0.3
-                        )
-                        
-                        # Update rekomendasi berdasarkan skor gabungan baru
-                        def get_combined_recommendation(score):
-                            if score >= 80:
-                                return "Strong Buy"
-                            elif score >= 65:
-                                return "Buy"
-                            elif score >= 50:
-                                return "Hold"
-                            elif score >= 35:
-                                return "Reduce"
-                            else:
-                                return "Sell"
-                        
-                        combined_results['Combined_Recommendation'] = combined_results['Combined_Score'].apply(get_combined_recommendation)
-                                         
-            # Step 7: Selesai
-            my_bar.progress(100, text="Analisis selesai!")
-            time.sleep(0.5)  # Beri waktu user untuk melihat progress 100%
-            my_bar.empty()
+            if combined_results is not None and 'Fundamental_Stale' in combined_results.columns:
+                stale_count = int(combined_results['Fundamental_Stale'].sum())
+                if stale_count:
+                    st.info(f"{stale_count} ticker memakai data fundamental tersimpan yang sudah kedaluwarsa. "
+                            "Data sedang diperbarui di latar belakang dan akan dipakai pada analisis berikutnya.")
             
-            # Clean up temp files
-            os.unlink(benchmark_temp)
-            for temp_file in stock_temps:
-                os.unlink(temp_file)
+            # Waktu dan puncak memori per stage
+            if debug_mode:
+                st.sidebar.subheader("Waktu per Stage")
+                timings = pd.DataFrame([
+                    {
+                        'Stage': stage,
+                        'Waktu (detik)': timing['seconds'],
+                        'Puncak Memori (MB)': timing['peak_memory_mb'],
+                        'Dari Cache': timing['cached']
+                    }
+                    for stage, timing in results['timings'].items()
+                ])
+                st.sidebar.dataframe(timings, hide_index=True)
             
             # Tampilkan hasil
             if (rrg_results is None or len(rrg_results) == 0) and combined_results is None:
                 st.error("Tidak dapat melakukan analisis. Pastikan data tersedia dan parameter sudah benar.")
             else:
                 # Tampilkan tanggal analisis aktual
-                analysis_date = rrg_analyzer.get_analysis_date().strftime('%d %B %Y')
+                analysis_date = results['analysis_date']
                 st.subheader(f"Analisis pada tanggal: {analysis_date}")
                 
                 # Bagi layar menjadi dua kolom
@@ -427,7 +336,7 @@ if analyze_button:
                     if analysis_type == "RRG (Teknikal)" or not use_fundamental:
                         # Tampilkan grafik RRG saja
                         st.subheader("Relative Rotation Graph (RRG)")
-                        fig = rrg_analyzer.plot_rrg(trail_length=trail_length)
+                        fig = engine.plot_rrg(trail_length=trail_length)
                         st.pyplot(fig)
                     elif analysis_type == "Fundamental" and use_fundamental:
                         # Tampilkan grafik Fundamental vs RS-Ratio
@@ -777,78 +686,71 @@ if analyze_button:
                 st.error(f"Detail error: {str(e)}")
                 import traceback
                 st.code(traceback.format_exc())
-            
-            # Clean up temp files
-            if 'benchmark_temp' in locals() and os.path.exists(benchmark_temp):
-                os.unlink(benchmark_temp)
-            if 'stock_temps' in locals():
-                for temp_file in stock_temps:
-                    if os.path.exists(temp_file):
-                        os.unlink(temp_file)
-            else: # Tampilkan info default ketika aplikasi pertama kali dibuka st.info("👈 Upload file CSV di panel sebelah kiri dan atur parameter, lalu klik 'Jalankan Analisis'.")
-                # Tampilkan contoh format file CSV
-                with st.expander("📝 Format File CSV yang Diperlukan"):
-                    st.markdown("""
-                    ### Format untuk Data Benchmark (misalnya: LQ45.csv)
-                    ```csv
-                    Ticker,Date,Open,High,Low,Close,Volume
-                    LQ45,01/01/2020,1022.344,1023.884,1014.473,1014.473,809234400
-                    LQ45,01/02/2020,1017.158,1017.52,1007.5,1011.618,612725900
-                    ...
-                    ```
-                    
-                    ### Format untuk Data Saham (misalnya: BBCA.csv)
-                    ```csv
-                    Ticker,Date,Open,High,Low,Close,Volume
-                    BBCA,01/01/2020,6675,6720,6670,6685,61168000
-                    BBCA,01/02/2020,6695,6780,6680,6690,49445000
-                    ...
-                    ```
-                    
-                    ### Catatan Penting Format:
-                    - **Header**: Wajib menggunakan header yang sesuai dengan kolom data
-                    - **Kolom Ticker**: Sebaiknya disertakan untuk menampilkan nama ticker yang benar pada grafik
-                    - **Format Tanggal**: Aplikasi mendukung format MM/DD/YYYY (01/01/2020) atau YYYY-MM-DD (2020-01-01)
-                    - **Pemisah Desimal**: Gunakan titik (.) bukan koma (,)
-                    - **Pemisah Kolom**: Gunakan koma (,) - format CSV standar
-                    - **Urutan Data**: Urutkan dari tanggal terlama ke terbaru (ascending)
-                    """)
+else: # Tampilkan info default ketika aplikasi pertama kali dibuka st.info("👈 Upload file CSV di panel sebelah kiri dan atur parameter, lalu klik 'Jalankan Analisis'.")
+    # Tampilkan contoh format file CSV
+    with st.expander("📝 Format File CSV yang Diperlukan"):
+        st.markdown("""
+        ### Format untuk Data Benchmark (misalnya: LQ45.csv)
+        ```csv
+        Ticker,Date,Open,High,Low,Close,Volume
+        LQ45,01/01/2020,1022.344,1023.884,1014.473,1014.473,809234400
+        LQ45,01/02/2020,1017.158,1017.52,1007.5,1011.618,612725900
+        ...
+        ```
+        
+        ### Format untuk Data Saham (misalnya: BBCA.csv)
+        ```csv
+        Ticker,Date,Open,High,Low,Close,Volume
+        BBCA,01/01/2020,6675,6720,6670,6685,61168000
+        BBCA,01/02/2020,6695,6780,6680,6690,49445000
+        ...
+        ```
+        
+        ### Catatan Penting Format:
+        - **Header**: Wajib menggunakan header yang sesuai dengan kolom data
+        - **Kolom Ticker**: Sebaiknya disertakan untuk menampilkan nama ticker yang benar pada grafik
+        - **Format Tanggal**: Aplikasi mendukung format MM/DD/YYYY (01/01/2020) atau YYYY-MM-DD (2020-01-01)
+        - **Pemisah Desimal**: Gunakan titik (.) bukan koma (,)
+        - **Pemisah Kolom**: Gunakan koma (,) - format CSV standar
+        - **Urutan Data**: Urutkan dari tanggal terlama ke terbaru (ascending)
+        - **File Universe**: Alternatif dari banyak file saham; satu file (boleh .csv.gz) dengan format yang sama berisi seluruh ticker
+        """)
 
-                # Tampilkan informasi analisis fundamental
-                with st.expander("📝 Analisis Gabungan Teknikal & Fundamental"):
-                    st.markdown("""
-                    ### Tentang Analisis Gabungan
-                    
-                    Aplikasi ini menggabungkan dua pendekatan analisis:
-                    
-                    1. **Analisis Teknikal (RRG)**: Menganalisis pergerakan harga saham relatif terhadap benchmark
-                       - RS-Ratio: Mengukur kekuatan relatif saham dibandingkan benchmark
-                       - RS-Momentum: Mengukur momentum pergerakan saham
-                    
-                    2. **Analisis Fundamental**: Menilai kesehatan keuangan perusahaan
-                       - Return on Equity (ROE): Mengukur efisiensi penggunaan modal
-                       - Return on Assets (ROA): Mengukur efisiensi penggunaan aset
-                       - Profit Margin: Mengukur kemampuan menghasilkan laba dari pendapatan
-                       - Earnings Growth: Pertumbuhan laba
-                       - Debt to Equity Ratio: Mengukur tingkat hutang
-                    
-                    ### Skor Gabungan
-                    
-                    **Catatan Analisis Gabungan:**
-                    - Data fundamental diambil dari Yahoo Finance dan mungkin tidak selalu tersedia atau terbaru
-                    - Stock Universe Score adalah input manual (0-100) berdasarkan penilaian laba 3 tahun terakhir, total return, dan notasi bursa
-                    - Skor gabungan dihitung dengan bobot:
-                      - 40% Stock Universe Score
-                      - 30% Skor Fundamental
-                      - 30% Skor RS-Momentum (Technical)
-                    
-                    Rekomendasi didasarkan pada skor gabungan:
-                    - **Strong Buy** (80-100): Fundamental kuat dan momentum teknikal positif
-                    - **Buy** (65-80): Fundamental dan teknikal cukup baik
-                    - **Hold** (50-65): Performa cukup stabil
-                    - **Reduce** (35-50): Menunjukkan kelemahan
-                    - **Sell** (0-35): Fundamental lemah dan teknikal negatif
-                    """)
+    # Tampilkan informasi analisis fundamental
+    with st.expander("📝 Analisis Gabungan Teknikal & Fundamental"):
+        st.markdown("""
+        ### Tentang Analisis Gabungan
+        
+        Aplikasi ini menggabungkan dua pendekatan analisis:
+        
+        1. **Analisis Teknikal (RRG)**: Menganalisis pergerakan harga saham relatif terhadap benchmark
+           - RS-Ratio: Mengukur kekuatan relatif saham dibandingkan benchmark
+           - RS-Momentum: Mengukur momentum pergerakan saham
+        
+        2. **Analisis Fundamental**: Menilai kesehatan keuangan perusahaan
+           - Return on Equity (ROE): Mengukur efisiensi penggunaan modal
+           - Return on Assets (ROA): Mengukur efisiensi penggunaan aset
+           - Profit Margin: Mengukur kemampuan menghasilkan laba dari pendapatan
+           - Earnings Growth: Pertumbuhan laba
+           - Debt to Equity Ratio: Mengukur tingkat hutang
+        
+        ### Skor Gabungan
+        
+        **Catatan Analisis Gabungan:**
+        - Data fundamental diambil dari Yahoo Finance dan mungkin tidak selalu tersedia atau terbaru
+        - Stock Universe Score adalah input manual (0-100) berdasarkan penilaian laba 3 tahun terakhir, total return, dan notasi bursa
+        - Skor gabungan dihitung dengan bobot:
+          - 40% Stock Universe Score
+          - 30% Skor Fundamental
+          - 30% Skor RS-Momentum (Technical)
+        
+        Rekomendasi didasarkan pada skor gabungan:
+        - **Strong Buy** (80-100): Fundamental kuat dan momentum teknikal positif
+        - **Buy** (65-80): Fundamental dan teknikal cukup baik
+        - **Hold** (50-65): Performa cukup stabil
+        - **Reduce** (35-50): Menunjukkan kelemahan
+        - **Sell** (0-35): Fundamental lemah dan teknikal negatif
+        """)
 # Footer
 st.markdown("---")
 st.markdown("Dibuat dengan ❤️ oleh Himawan Susetyo menggunakan Python dan Streamlit | © 2025")
\ No newline at end of file
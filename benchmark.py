@@ -0,0 +1,389 @@
+# benchmark.py
+# Benchmark waktu per stage analisis RRG dengan universe sintetis; hasil dicatat ke riwayat JSON
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+from price_cache import cache_base_dir
+from synthetic_data import write_universe
+
+# Stage yang diukur, sesuai urutan eksekusi
+STAGES = ('load_data_from_files', 'calculate_rs_ratio', 'calculate_rs_momentum', 'normalize_data',
+          'get_latest_data', 'plot_rrg', 'pdf_report', 'html_report')
+
+# Stage dianggap regresi jika lebih lambat dari faktor ini dibanding run sebelumnya dengan konfigurasi sama
+REGRESSION_THRESHOLD = 1.25
+
+# Stage yang lebih cepat dari ini (detik) diabaikan saat membandingkan (terlalu berisik)
+MIN_COMPARE_SECONDS = 0.01
+
+# Modul yang diukur waktu import-nya (cold start di proses baru)
+IMPORT_MODULES = ('price_cache', 'price_io', 'price_panel', 'rrg_kernels', 'price_store', 'rrg', 'rrg_incremental',
+                  'result_cache', 'pipeline', 'analysis_engine', 'rrg_cli', 'rrg_service', 'fundamental_analyzer',
+                  'fundamental_cache', 'fundamental_providers', 'fundamental_stub', 'scoring', 'report', 'report_html')
+
+# Pengambilan data fundamental paralel dari stub lokal: jumlah ticker, jumlah worker yang diuji,
+# latensi stub (detik), serta batas request per detik dan burst analyzer
+FUNDAMENTAL_TICKERS = 60
+FUNDAMENTAL_WORKERS = (1, 8)
+FUNDAMENTAL_LATENCY = 0.05
+FUNDAMENTAL_RATE_LIMIT = 40.0
+FUNDAMENTAL_BURST = 5
+
+# Dependensi berat yang hanya boleh dimuat saat code path yang membutuhkannya dijalankan
+HEAVY_MODULES = ('matplotlib', 'streamlit', 'yfinance', 'reportlab')
+
+
+def _git_commit():
+    """
+    Hash commit git saat ini (None jika bukan repository git)
+    """
+    try:
+        output = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return output.stdout.strip() or None
+
+
+def measure_import(module, repeat=3):
+    """
+    Mengukur waktu import kumulatif satu modul di proses Python baru (python -X importtime)
+
+    :param module: nama modul
+    :param repeat: jumlah pengulangan (diambil nilai minimum)
+    :return: dict {'seconds': waktu import, 'heavy_modules': dependensi berat yang ikut dimuat}
+    """
+    code = (f"import sys, json, {module}; "
+            f"print(json.dumps(sorted(m for m in {HEAVY_MODULES!r} if m in sys.modules)))")
+    best = None
+    heavy_modules = []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)), timeout=120)
+        if output.returncode != 0:
+            return {'seconds': None, 'heavy_modules': [], 'error': output.stderr.strip().splitlines()[-1]}
+        heavy_modules = json.loads(output.stdout.strip().splitlines()[-1])
+        # Format baris: "import time: self [us] | cumulative | imported package"
+        for line in output.stderr.splitlines():
+            parts = line.split('|')
+            if len(parts) == 3 and parts[2].strip() == module:
+                seconds = int(parts[1]) / 1e6
+                best = seconds if best is None else min(best, seconds)
+    return {'seconds': best, 'heavy_modules': heavy_modules}
+
+
+def measure_imports(modules=IMPORT_MODULES, repeat=3):
+    """
+    Waktu cold import setiap modul
+
+    :return: dict nama modul -> hasil measure_import()
+    """
+    return {module: measure_import(module, repeat) for module in modules}
+
+
+def measure_fundamental_fetch(n_tickers=FUNDAMENTAL_TICKERS, workers=FUNDAMENTAL_WORKERS,
+                              latency=FUNDAMENTAL_LATENCY, rate_limit=FUNDAMENTAL_RATE_LIMIT, burst=FUNDAMENTAL_BURST):
+    """
+    Mengukur dan memeriksa pengambilan data fundamental paralel terhadap stub HTTP lokal (fundamental_stub).
+    Diperiksa: satu baris per ticker input dengan urutan yang sama, ticker duplikat hanya diminta sekali ke stub,
+    semua baris berisi data stub,
+    dan laju request tidak melebihi rate limit (waktu minimal dan tidak ada respons 429 dari stub).
+
+    :param workers: list jumlah worker yang diuji
+    :return: dict jumlah worker -> {'seconds', 'requests', 'throttled', 'errors'}
+    """
+    from fundamental_analyzer import FundamentalAnalyzer
+    from fundamental_stub import FundamentalStub, start_server, synthetic_info
+    from single_flight import SingleFlight
+
+    tickers = [f"F{i:03d}" for i in range(n_tickers)]
+    # Ticker duplikat di input tetap muncul di hasil, tetapi hanya diminta sekali ke provider
+    requested = tickers + tickers[:3]
+    min_seconds = max(n_tickers - burst, 0) / rate_limit
+    results = {}
+    for n_workers in workers:
+        # Stub sedikit lebih longgar dari analyzer agar jitter jaringan tidak dihitung sebagai pelanggaran
+        stub = FundamentalStub(latency=latency, rate_limit=rate_limit * 1.1, burst=burst + 1)
+        server, url = start_server(stub)
+        try:
+            analyzer = FundamentalAnalyzer(provider=url, max_workers=n_workers, rate_limit=rate_limit, burst=burst,
+                                           cache=None, flight=SingleFlight())
+            start_time = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                frame = analyzer.get_fundamental_frame(requested)
+            seconds = time.perf_counter() - start_time
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        errors = []
+        if frame['Symbol'].tolist() != requested:
+            errors.append("urutan/isi ticker hasil tidak sama dengan input")
+        expected = [synthetic_info(f"{ticker}.JK")['returnOnEquity'] for ticker in requested]
+        if frame.get('returnOnEquity') is None or frame['returnOnEquity'].tolist() != expected:
+            errors.append("data fundamental tidak sama dengan data stub")
+        if stub.served != n_tickers:
+            errors.append(f"{stub.served} request ke stub untuk {n_tickers} ticker")
+        if stub.throttled or seconds < min_seconds * 0.95:
+            errors.append(f"rate limit {rate_limit:g}/s terlampaui ({stub.throttled} respons 429, {seconds:.2f}s)")
+        results[str(n_workers)] = {'seconds': seconds, 'requests': stub.served, 'throttled': stub.throttled,
+                                   'errors': errors}
+    return results
+
+
+def run_case(paths, period_years=3, rs_ratio_period=52, rs_momentum_period=26, reports=True):
+    """
+    Menjalankan satu analisis lengkap dan mengukur waktu setiap stage
+
+    :param paths: dict dari synthetic_data.write_universe()
+    :param reports: ukur juga pembuatan laporan PDF dan HTML
+    :return: dict nama stage -> detik
+    """
+    from rrg import RRGAnalyzer
+
+    timings = {}
+
+    def timed(stage, func, *args, **kwargs):
+        start_time = time.perf_counter()
+        result = func(*args, **kwargs)
+        timings[stage] = time.perf_counter() - start_time
+        return result
+
+    # Pesan per ticker dari analyzer tidak relevan untuk benchmark
+    with contextlib.redirect_stdout(io.StringIO()):
+        analyzer = RRGAnalyzer(paths['benchmark'], paths['stocks'], period_years=period_years,
+                               universe_file=paths['universe'])
+        if not timed('load_data_from_files', analyzer.load_data_from_files):
+            raise RuntimeError("Gagal memuat data sintetis")
+        timed('calculate_rs_ratio', analyzer.calculate_rs_ratio, period=rs_ratio_period)
+        timed('calculate_rs_momentum', analyzer.calculate_rs_momentum, period=rs_momentum_period)
+        if not timed('normalize_data', analyzer.normalize_data):
+            raise RuntimeError("Gagal melakukan normalisasi data sintetis")
+        results = timed('get_latest_data', analyzer.get_latest_data)
+        plt.close(timed('plot_rrg', analyzer.plot_rrg, trail_length=12))
+
+        if reports:
+            from report import build_pdf_report
+            from report_html import create_html_report
+            timed('pdf_report', build_pdf_report, results, "RRG (Teknikal)")
+            timed('html_report', create_html_report, results, "RRG (Teknikal)")
+            plt.close('all')
+
+    return timings
+
+
+def run_benchmark(scales=((10, 1), (100, 3), (500, 3)), repeat=3, seed=0, missing_rate=0.01, holiday_rate=0.02,
+                  reports=True, long_format=False, work_dir=None, imports=True, fundamentals=True):
+    """
+    Menjalankan benchmark untuk beberapa skala universe
+
+    :param scales: list tuple (jumlah ticker, jumlah tahun)
+    :param repeat: jumlah pengulangan per skala (dilaporkan min dan median)
+    :param work_dir: direktori untuk data sintetis (default: direktori sementara yang dihapus setelahnya)
+    :param imports: ukur juga waktu cold import setiap modul
+    :param fundamentals: ukur dan periksa juga pengambilan data fundamental paralel (stub lokal)
+    :return: dict record benchmark (siap disimpan ke riwayat)
+    """
+    record = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'commit': _git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'config': {'repeat': repeat, 'seed': seed, 'missing_rate': missing_rate, 'holiday_rate': holiday_rate,
+                   'reports': reports, 'long_format': long_format},
+        'cases': [],
+        'imports': measure_imports(repeat=repeat) if imports else {},
+        'fundamentals': measure_fundamental_fetch() if fundamentals else {},
+    }
+
+    with contextlib.ExitStack() as stack:
+        if work_dir is None:
+            work_dir = stack.enter_context(tempfile.TemporaryDirectory(prefix='rrg_benchmark_'))
+
+        for n_tickers, years in scales:
+            case_dir = os.path.join(work_dir, f"{n_tickers}x{years}y")
+            start_time = time.perf_counter()
+            paths = write_universe(case_dir, n_tickers, years, missing_rate, holiday_rate, seed,
+                                   long_format=long_format)
+            generate_seconds = time.perf_counter() - start_time
+
+            runs = [run_case(paths, period_years=years, reports=reports) for _ in range(repeat)]
+            stages = {}
+            for stage in STAGES:
+                values = [run[stage] for run in runs if stage in run]
+                if values:
+                    stages[stage] = {'min': min(values), 'median': statistics.median(values)}
+
+            record['cases'].append({
+                'name': f"{n_tickers}x{years}y",
+                'tickers': n_tickers,
+                'years': years,
+                'generate_seconds': generate_seconds,
+                'stages': stages,
+                'total_min': sum(stage['min'] for stage in stages.values()),
+            })
+
+    return record
+
+
+def default_history_path():
+    """
+    Lokasi file riwayat benchmark default (di direktori cache, bukan di direktori kerja/checkout)
+    """
+    return os.path.join(cache_base_dir(), 'benchmark_history.json')
+
+
+def load_history(path):
+    """
+    Membaca riwayat benchmark (list record), kosong jika file belum ada
+    """
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def append_history(path, record):
+    """
+    Menambahkan record ke file riwayat JSON
+    """
+    history = load_history(path)
+    history.append(record)
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(history, f, indent=2)
+    return history
+
+
+def find_regressions(record, history, threshold=REGRESSION_THRESHOLD):
+    """
+    Membandingkan record dengan run terakhir di riwayat yang memakai konfigurasi dan kasus yang sama
+
+    :return: list string deskripsi stage yang melambat
+    """
+    regressions = []
+    for module, value in record.get('imports', {}).items():
+        if value['heavy_modules']:
+            regressions.append(f"import {module} memuat {', '.join(value['heavy_modules'])}")
+    for n_workers, value in record.get('fundamentals', {}).items():
+        regressions.extend(f"fundamental {n_workers} worker: {error}" for error in value['errors'])
+
+    previous = next((item for item in reversed(history) if item.get('config') == record['config']), None)
+    if previous is None:
+        return regressions
+
+    for module, value in record.get('imports', {}).items():
+        old = previous.get('imports', {}).get(module)
+        if not old or old['seconds'] is None or value['seconds'] is None or old['seconds'] < MIN_COMPARE_SECONDS:
+            continue
+        ratio = value['seconds'] / old['seconds']
+        if ratio > threshold:
+            regressions.append(f"import {module}: {old['seconds']:.3f}s -> {value['seconds']:.3f}s ({ratio:.2f}x, "
+                               f"commit {previous.get('commit')} -> {record.get('commit')})")
+
+    previous_cases = {case['name']: case for case in previous['cases']}
+    for case in record['cases']:
+        before = previous_cases.get(case['name'])
+        if before is None:
+            continue
+        for stage, value in case['stages'].items():
+            old = before['stages'].get(stage)
+            if old is None or old['min'] < MIN_COMPARE_SECONDS:
+                continue
+            ratio = value['min'] / old['min']
+            if ratio > threshold:
+                regressions.append(f"{case['name']} {stage}: {old['min']:.3f}s -> {value['min']:.3f}s "
+                                   f"({ratio:.2f}x, commit {previous.get('commit')} -> {record.get('commit')})")
+    return regressions
+
+
+def print_record(record):
+    """
+    Menampilkan tabel waktu (min/median dalam milidetik) per kasus dan stage
+    """
+    for case in record['cases']:
+        print(f"\n{case['name']} ({case['tickers']} ticker, {case['years']} tahun), "
+              f"data dibuat dalam {case['generate_seconds']:.2f}s")
+        for stage, value in case['stages'].items():
+            print(f"  {stage:<24} min {value['min'] * 1000:10.1f} ms   median {value['median'] * 1000:10.1f} ms")
+        print(f"  {'total':<24} min {case['total_min'] * 1000:10.1f} ms")
+
+    if record.get('imports'):
+        print("\nWaktu cold import per modul")
+        for module, value in record['imports'].items():
+            if value['seconds'] is None:
+                print(f"  {module:<24} gagal: {value.get('error')}")
+                continue
+            heavy = f"   (memuat {', '.join(value['heavy_modules'])})" if value['heavy_modules'] else ""
+            print(f"  {module:<24} {value['seconds'] * 1000:10.1f} ms{heavy}")
+
+    if record.get('fundamentals'):
+        print(f"\nPengambilan data fundamental dari stub lokal ({FUNDAMENTAL_TICKERS} ticker, "
+              f"latensi {FUNDAMENTAL_LATENCY * 1000:.0f} ms, rate limit {FUNDAMENTAL_RATE_LIMIT:g}/s)")
+        for n_workers, value in record['fundamentals'].items():
+            status = "OK" if not value['errors'] else "GAGAL: " + "; ".join(value['errors'])
+            print(f"  {n_workers + ' worker':<24} {value['seconds'] * 1000:10.1f} ms   {status}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark stage analisis RRG dengan universe sintetis")
+    parser.add_argument('--tickers', type=int, nargs='+', default=[10, 100, 500],
+                        help="jumlah ticker per kasus (10-2000)")
+    parser.add_argument('--years', type=float, nargs='+', default=[3],
+                        help="panjang data dalam tahun (1-20); satu nilai untuk semua kasus atau satu per kasus")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--missing-rate', type=float, default=0.01)
+    parser.add_argument('--holiday-rate', type=float, default=0.02)
+    parser.add_argument('--no-reports', action='store_true', help="lewati pembuatan laporan PDF dan HTML")
+    parser.add_argument('--no-imports', action='store_true', help="lewati pengukuran waktu import modul")
+    parser.add_argument('--imports-only', action='store_true', help="hanya ukur waktu import modul")
+    parser.add_argument('--no-fundamentals', action='store_true',
+                        help="lewati pemeriksaan pengambilan data fundamental paralel (stub lokal)")
+    parser.add_argument('--long-format', action='store_true', help="gunakan satu file universe format panjang")
+    parser.add_argument('--work-dir', help="direktori data sintetis (default: direktori sementara)")
+    parser.add_argument('--history', help="file riwayat JSON (default: benchmark_history.json di direktori cache)")
+    parser.add_argument('--no-history', action='store_true', help="jangan simpan hasil ke riwayat")
+    args = parser.parse_args(argv)
+    args.history = args.history or default_history_path()
+
+    years = args.years if len(args.years) == len(args.tickers) else [args.years[0]] * len(args.tickers)
+    scales = [(n_tickers, int(y) if float(y).is_integer() else y) for n_tickers, y in zip(args.tickers, years)]
+
+    if args.imports_only:
+        scales = []
+    record = run_benchmark(scales, repeat=args.repeat, seed=args.seed, missing_rate=args.missing_rate,
+                           holiday_rate=args.holiday_rate, reports=not args.no_reports,
+                           long_format=args.long_format, work_dir=args.work_dir, imports=not args.no_imports,
+                           fundamentals=not args.no_fundamentals)
+    print_record(record)
+
+    history = load_history(args.history)
+    regressions = find_regressions(record, history)
+    if regressions:
+        print("\nRegresi dibanding run sebelumnya:")
+        for regression in regressions:
+            print(f"  {regression}")
+
+    if not args.no_history:
+        append_history(args.history, record)
+        print(f"\nHasil disimpan ke {args.history}")
+
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
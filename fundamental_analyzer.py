@@ -1,42 +1,124 @@
-import yfinance as yf
 import pandas as pd
 import numpy as np
-import time
 import os
 import re
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
+from rate_limiter import TokenBucket
+from fundamental_providers import create_provider
+from scoring import combined_score_spec
+from fundamental_cache import STALE_COLUMN
+from single_flight import SingleFlight
+
+DEFAULT_MAX_WORKERS = 4
+
+# Indikator fundamental default beserta bobotnya (dipakai jika pengguna tidak memilih indikator apa pun)
+DEFAULT_INDICATOR_WEIGHTS = {
+    'returnOnEquity': 0.25,     # ROE, 25%
+    'returnOnAssets': 0.20,     # ROA, 20%
+    'profitMargins': 0.20,      # Profit Margin, 20%
+    'earningsGrowth': 0.20,     # Pertumbuhan Laba, 20%
+    'debtToEquity': 0.15,       # Rasio Hutang terhadap Ekuitas, 15%
+}
+
+# Informasi dasar perusahaan yang ikut disimpan jika tersedia
+INFO_FIELDS = ('longName', 'sector', 'industry', 'marketCap')
+
+# Skala skor per indikator (dasar, offset, pengali): skor = clip(dasar + (nilai + offset) * pengali, 0, 100)
+INDICATOR_SCALES = {
+    'returnOnEquity': (0, 0, 500),      # ROE 0% = 0, ROE 20% = 100
+    'returnOnAssets': (0, 0, 1000),     # ROA 0% = 0, ROA 10% = 100
+    'profitMargins': (0, 0, 500),       # Margin 0% = 0, Margin 20% = 100
+    'earningsGrowth': (0, 0.2, 250),    # Growth -20% = 0, Growth 0% = 50, Growth 20% = 100
+    'debtToEquity': (100, 0, -50),      # DTE <= 0 = 100, DTE 100% = 50, DTE >= 200% = 0 (lebih rendah lebih baik)
+}
+
+def _numeric_column(frame, column, n_rows):
+    """
+    Kolom sebagai array float (nilai non-numerik dan kolom yang tidak ada menjadi NaN)
+    """
+    if column not in frame.columns:
+        return np.full(n_rows, np.nan)
+    series = frame[column]
+    if not pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series):
+        series = pd.to_numeric(series, errors='coerce')
+    return series.to_numpy(dtype=float, na_value=np.nan)
+
+_default_fetch_flight = None
+
+def default_fetch_flight():
+    """
+    SingleFlight bersama untuk seluruh analyzer dalam satu proses: pengambilan ticker yang sama dari
+    provider yang sama oleh beberapa sesi/request sekaligus cukup dijalankan sekali
+    """
+    global _default_fetch_flight
+    if _default_fetch_flight is None:
+        _default_fetch_flight = SingleFlight()
+    return _default_fetch_flight
 
 class FundamentalAnalyzer:
     """
     Kelas untuk menganalisis data fundamental dari Yahoo Finance
     """
     
-    def __init__(self):
+    def __init__(self, provider=None, max_workers=DEFAULT_MAX_WORKERS, rate_limit=None, burst=None, cache=None,
+                 stale_while_revalidate=False, flight=None):
         """
         Inisialisasi analyzer dengan indikator yang akan digunakan
+        
+        :param provider: sumber data fundamental (objek provider atau spesifikasi string, lihat
+                         fundamental_providers.create_provider; default: Yahoo Finance)
+        :param max_workers: jumlah thread pengambilan data fundamental (1 = berurutan)
+        :param rate_limit: maksimal request per detik ke provider (None = batas bawaan provider, 0 = tanpa batas)
+        :param burst: jumlah request yang boleh langsung dikirim sebelum dibatasi (default: rate_limit)
+        :param cache: FundamentalCache persisten opsional (dipakai bersama antar sesi dan proses)
+        :param stale_while_revalidate: pakai langsung data di cache yang sudah melewati TTL (ditandai di kolom
+                                       Fundamental_Stale) dan perbarui di thread latar; membutuhkan cache
+        :param flight: SingleFlight untuk menggabungkan pengambilan ticker yang sama yang berjalan bersamaan
+                       (default: instance bersama default_fetch_flight())
         """
-        # Indikator fundamental yang akan digunakan untuk analisis
-        self.fundamental_indicators = [
-            'returnOnEquity',      # ROE
-            'returnOnAssets',      # ROA
-            'profitMargins',       # Profit Margin
-            'earningsGrowth',      # Pertumbuhan Laba
-            'debtToEquity'         # Rasio Hutang terhadap Ekuitas
-        ]
-        
-        # Bobot untuk masing-masing indikator
-        self.indicator_weights = {
-            'returnOnEquity': 0.25,       # 25%
-            'returnOnAssets': 0.20,        # 20%
-            'profitMargins': 0.20,         # 20%
-            'earningsGrowth': 0.20,        # 20%
-            'debtToEquity': 0.15           # 15%
-        }
+        self.cache = cache
+        self.flight = flight if flight is not None else default_fetch_flight()
+        self.stale_while_revalidate = stale_while_revalidate
+        self.max_workers = max_workers
+        self._rate_limit = rate_limit
+        self._burst = burst
+        
+        # Indikator fundamental yang akan digunakan untuk analisis dan bobot masing-masing indikator
+        self.fundamental_indicators = list(DEFAULT_INDICATOR_WEIGHTS)
+        self.indicator_weights = dict(DEFAULT_INDICATOR_WEIGHTS)
         
         # Mapping dari kode ticker ke kode Yahoo Finance
         self.ticker_mapping = {}
         
-        # Cache untuk data fundamental
-        self.fundamental_data_cache = {}
+        # Pembaruan data basi di latar belakang (mode stale-while-revalidate)
+        self.revalidated = 0
+        self._revalidating = {}
+        self._revalidate_executor = None
+        self._revalidate_lock = threading.Lock()
+        
+        # Sumber data, rate limiter, dan cache data fundamental di memori (lapisan persisten ada di self.cache);
+        # cache memori diakses dari thread fetch dan thread pembaruan latar sehingga dijaga lock
+        self._data_lock = threading.Lock()
+        self.set_provider(provider)
+    
+    def set_provider(self, provider):
+        """
+        Mengganti sumber data fundamental (cache memori dikosongkan karena data berasal dari sumber lain)
+        
+        :param provider: objek provider atau spesifikasi string (None = konfigurasi default)
+        """
+        self.provider_spec = provider if isinstance(provider, str) or provider is None else None
+        self.provider = create_provider(provider)
+        rate_limit = self._rate_limit if self._rate_limit is not None else getattr(self.provider, 'rate_limit', None)
+        self.rate_limiter = TokenBucket(rate_limit, self._burst)
+        with self._data_lock:
+            self.fundamental_data_cache = {}
+    
+    def _cache_key(self, yahoo_ticker):
+        # Data dari provider berbeda (termasuk server HTTP atau file snapshot berbeda) disimpan terpisah
+        # di cache persisten dan tidak saling menggabungkan pengambilan yang sedang berjalan
+        return f"{self.provider.name}:{yahoo_ticker}"
     
     def convert_to_yahoo_ticker(self, ticker):
         """
@@ -75,53 +157,128 @@ class FundamentalAnalyzer:
     
     def get_fundamental_data(self, ticker, force_refresh=False):
         """
-        Mendapatkan data fundamental dari Yahoo Finance
+        Mendapatkan data fundamental dari provider (default: Yahoo Finance)
         
         :param ticker: string, ticker dalam format lokal
         :param force_refresh: boolean, apakah memaksa refresh data dari API
         :return: dict, data fundamental
         """
-        # Cek cache jika tidak dipaksa refresh
-        if not force_refresh and ticker in self.fundamental_data_cache:
-            return self.fundamental_data_cache[ticker]
+        use_cache = self.cache is not None and getattr(self.provider, 'cacheable', True)
+        revalidate = self.stale_while_revalidate and use_cache
+        
+        # Cek cache memori jika tidak dipaksa refresh. Jika ada cache persisten, umur data selalu diperiksa
+        # di sana (cache memori tidak mengenal TTL) agar data basi tetap diperbarui pada proses yang berjalan lama
+        if not force_refresh and not use_cache:
+            with self._data_lock:
+                cached = self.fundamental_data_cache.get(ticker)
+            if cached is not None:
+                return cached
         
         # Konversi ticker ke format Yahoo Finance
         yahoo_ticker = self.convert_to_yahoo_ticker(ticker)
         
-        try:
-            # Dapatkan data dari Yahoo Finance
-            yf_ticker = yf.Ticker(yahoo_ticker)
-            info = yf_ticker.info
-            
-            # Ekstrak data fundamental yang dibutuhkan
-            fundamental_data = {}
-            for indicator in self.fundamental_indicators:
-                if indicator in info and info[indicator] is not None:
-                    fundamental_data[indicator] = info[indicator]
-                else:
-                    fundamental_data[indicator] = None
-            
-            # Tambahkan informasi dasar perusahaan
-            if 'longName' in info:
-                fundamental_data['longName'] = info['longName']
-            if 'sector' in info:
-                fundamental_data['sector'] = info['sector']
-            if 'industry' in info:
-                fundamental_data['industry'] = info['industry']
-            if 'marketCap' in info:
-                fundamental_data['marketCap'] = info['marketCap']
-            
-            # Simpan ke cache
-            self.fundamental_data_cache[ticker] = fundamental_data
-            
-            # Tunggu sedikit untuk menghindari rate limiting
-            time.sleep(0.2)
-            
-            return fundamental_data
+        # Cek cache persisten (semua field indikator harus ada dan belum melewati TTL-nya)
+        if not force_refresh and use_cache:
+            if revalidate:
+                cached, stale_fields = self.cache.lookup(self._cache_key(yahoo_ticker), list(INDICATOR_SCALES))
+                if cached is not None and stale_fields:
+                    # Data basi langsung dipakai; data baru diambil di latar belakang untuk run berikutnya
+                    self.revalidate(ticker)
+                    return dict(cached, **{STALE_COLUMN: True})
+            else:
+                cached = self.cache.get(self._cache_key(yahoo_ticker), list(INDICATOR_SCALES))
+            if cached is not None:
+                with self._data_lock:
+                    self.fundamental_data_cache[ticker] = cached
+                return cached
         
+        return self._fetch_fundamental_data(ticker, yahoo_ticker, use_cache)
+    
+    def _fetch_fundamental_data(self, ticker, yahoo_ticker, use_cache):
+        """
+        Mengambil data fundamental dari provider dan menyimpannya ke cache memori dan persisten.
+        Jika ticker yang sama sedang diambil (oleh analyzer mana pun yang memakai self.flight),
+        hasil pengambilan tersebut dipakai bersama alih-alih mengirim request baru.
+        
+        :return: dict data fundamental, atau {} jika gagal (error dicetak)
+        """
+        try:
+            fundamental_data = self.flight.do(self._cache_key(yahoo_ticker), self._request_fundamental_data,
+                                              yahoo_ticker, use_cache)
         except Exception as e:
             print(f"Error saat mendapatkan data fundamental untuk {ticker}: {str(e)}")
             return {}
+        
+        with self._data_lock:
+            self.fundamental_data_cache[ticker] = fundamental_data
+        return fundamental_data
+    
+    def _request_fundamental_data(self, yahoo_ticker, use_cache):
+        """
+        Satu request ke provider; hasilnya disimpan ke cache persisten
+        
+        :return: dict data fundamental
+        :raises: exception dari provider
+        """
+        # Dapatkan data dari provider (dibatasi token bucket agar tidak terkena rate limiting)
+        self.rate_limiter.acquire()
+        info = self.provider.fetch(yahoo_ticker)
+            
+        # Ekstrak semua indikator (bukan hanya yang dipilih) agar perubahan pilihan cukup dihitung ulang
+        fundamental_data = {}
+        for indicator in INDICATOR_SCALES:
+            if indicator in info and info[indicator] is not None:
+                fundamental_data[indicator] = info[indicator]
+            else:
+                fundamental_data[indicator] = None
+        
+        # Tambahkan informasi dasar perusahaan
+        for field in INFO_FIELDS:
+            if field in info:
+                fundamental_data[field] = info[field]
+        
+        # Simpan ke cache persisten
+        if use_cache:
+            self.cache.put(self._cache_key(yahoo_ticker), fundamental_data)
+        
+        return fundamental_data
+    
+    def revalidate(self, ticker):
+        """
+        Menjadwalkan pengambilan ulang data fundamental ticker di thread latar
+        (ticker yang sedang diperbarui tidak dijadwalkan dua kali)
+        
+        :param ticker: string, ticker dalam format lokal
+        """
+        with self._revalidate_lock:
+            if ticker in self._revalidating:
+                return
+            if self._revalidate_executor is None:
+                self._revalidate_executor = ThreadPoolExecutor(max_workers=max(1, self.max_workers or 1),
+                                                               thread_name_prefix='fundamental-revalidate')
+            self._revalidating[ticker] = self._revalidate_executor.submit(self._revalidate, ticker)
+    
+    def _revalidate(self, ticker):
+        try:
+            use_cache = self.cache is not None and getattr(self.provider, 'cacheable', True)
+            if self._fetch_fundamental_data(ticker, self.convert_to_yahoo_ticker(ticker), use_cache):
+                with self._revalidate_lock:
+                    self.revalidated += 1
+        finally:
+            with self._revalidate_lock:
+                self._revalidating.pop(ticker, None)
+    
+    def wait_for_revalidation(self, timeout=None):
+        """
+        Menunggu pembaruan latar yang sedang berjalan selesai (misalnya sebelum job batch keluar)
+        
+        :param timeout: batas waktu tunggu (detik, None = tanpa batas)
+        :return: True jika tidak ada lagi pembaruan yang berjalan
+        """
+        with self._revalidate_lock:
+            pending = list(self._revalidating.values())
+        done, not_done = wait(pending, timeout=timeout)
+        return not not_done
     
     def calculate_fundamental_score(self, ticker_data):
         """
@@ -132,99 +289,117 @@ class FundamentalAnalyzer:
         """
         if not ticker_data:
             return 0
+        return float(self.score_fundamentals(pd.DataFrame([ticker_data]))[0])
+    
+    def score_fundamentals(self, fundamental_data):
+        """
+        Menghitung skor fundamental seluruh ticker sekaligus dengan operasi kolom NumPy.
+        Bobot dinormalisasi ulang per baris atas indikator yang tersedia (nilai kosong/NaN diabaikan).
         
-        scores = {}
-        total_weight = 0
-        
-        # ROE Score (0-100)
-        if 'returnOnEquity' in ticker_data and ticker_data['returnOnEquity'] is not None:
-            roe = ticker_data['returnOnEquity']
-            # ROE 0% = 0, ROE 20% = 100, linear scale
-            roe_score = min(100, max(0, roe * 500))  # ROE 0.2 (20%) = score 100
-            scores['returnOnEquity'] = roe_score
-            total_weight += self.indicator_weights['returnOnEquity']
-        
-        # ROA Score (0-100)
-        if 'returnOnAssets' in ticker_data and ticker_data['returnOnAssets'] is not None:
-            roa = ticker_data['returnOnAssets']
-            # ROA 0% = 0, ROA 10% = 100, linear scale
-            roa_score = min(100, max(0, roa * 1000))  # ROA 0.1 (10%) = score 100
-            scores['returnOnAssets'] = roa_score
-            total_weight += self.indicator_weights['returnOnAssets']
-        
-        # Profit Margin Score (0-100)
-        if 'profitMargins' in ticker_data and ticker_data['profitMargins'] is not None:
-            margin = ticker_data['profitMargins']
-            # Margin 0% = 0, Margin 20% = 100, linear scale
-            margin_score = min(100, max(0, margin * 500))  # Margin 0.2 (20%) = score 100
-            scores['profitMargins'] = margin_score
-            total_weight += self.indicator_weights['profitMargins']
-        
-        # Earnings Growth Score (0-100)
-        if 'earningsGrowth' in ticker_data and ticker_data['earningsGrowth'] is not None:
-            growth = ticker_data['earningsGrowth']
-            # Growth -20% = 0, Growth 0% = 50, Growth 20% = 100, linear scale
-            growth_score = min(100, max(0, (growth + 0.2) * 250))  # Growth 0.2 (20%) = score 100
-            scores['earningsGrowth'] = growth_score
-            total_weight += self.indicator_weights['earningsGrowth']
-        
-        # Debt to Equity Score (100-0, lower is better)
-        if 'debtToEquity' in ticker_data and ticker_data['debtToEquity'] is not None:
-            dte = ticker_data['debtToEquity']
-            if dte <= 0:
-                dte_score = 100  # No debt = perfect score
-            elif dte >= 2:
-                dte_score = 0    # DTE >= 200% = zero score
-            else:
-                dte_score = 100 - (dte * 50)  # Linear scale: DTE 100% = score 50
-            scores['debtToEquity'] = dte_score
-            total_weight += self.indicator_weights['debtToEquity']
-        
-        # Calculate weighted average score
-        if scores and total_weight > 0:
-            weighted_score = sum(scores[indicator] * self.indicator_weights[indicator] for indicator in scores) / total_weight
-            return weighted_score
-        else:
-            return 0
+        :param fundamental_data: DataFrame dengan kolom indikator (satu baris per ticker)
+        :return: ndarray skor fundamental (0-100); baris tanpa indikator yang tersedia bernilai 0
+        """
+        n_rows = len(fundamental_data)
+        indicators = [indicator for indicator in INDICATOR_SCALES
+                      if indicator in self.fundamental_indicators and indicator in self.indicator_weights]
+        if not indicators or n_rows == 0:
+            return np.zeros(n_rows)
+        
+        values = np.column_stack([_numeric_column(fundamental_data, indicator, n_rows) for indicator in indicators])
+        base, offset, multiplier = (np.array(column, dtype=float)
+                                    for column in zip(*(INDICATOR_SCALES[indicator] for indicator in indicators)))
+        weights = np.array([self.indicator_weights[indicator] for indicator in indicators], dtype=float)
+        
+        scores = np.clip(base + (values + offset) * multiplier, 0, 100)
+        present = ~np.isnan(values)
+        total_weight = np.where(present, weights, 0.0).sum(axis=1)
+        weighted_score = np.where(present, scores * weights, 0.0).sum(axis=1)
+        return np.divide(weighted_score, total_weight, out=np.zeros(n_rows), where=total_weight > 0)
     
-    def get_fundamental_analysis(self, tickers):
+    def rescore(self, fundamental_data):
         """
-        Mendapatkan analisis fundamental untuk daftar ticker
+        Menyusun hasil analisis fundamental dari data mentah dengan indikator dan bobot saat ini
+        (misalnya setelah bobot diubah) tanpa mengambil ulang data
+        
+        :param fundamental_data: DataFrame data mentah (Symbol, kolom indikator, kolom info)
+        :return: DataFrame, hasil analisis fundamental (Symbol, Fundamental_Score, indikator terpilih, info)
+        """
+        columns = [column for column in list(self.fundamental_indicators) + list(INFO_FIELDS)
+                   if column in fundamental_data.columns]
+        results = fundamental_data[['Symbol'] + columns].copy()
+        results.insert(1, 'Fundamental_Score', self.score_fundamentals(fundamental_data))
+        if self.stale_while_revalidate or STALE_COLUMN in fundamental_data.columns:
+            stale = fundamental_data[STALE_COLUMN] if STALE_COLUMN in fundamental_data.columns else False
+            results[STALE_COLUMN] = pd.Series(stale, index=results.index).eq(True)
+        return results
+    
+    def fetch_fundamental_data(self, tickers, progress_callback=None, max_workers=None, force_refresh=False):
+        """
+        Mengambil data fundamental untuk banyak ticker secara paralel dengan thread pool.
+        Laju request tetap dibatasi oleh rate_limiter; ticker duplikat hanya diambil sekali.
         
         :param tickers: list, daftar ticker dalam format lokal
-        :return: DataFrame, hasil analisis fundamental
+        :param progress_callback: fungsi (selesai, total) opsional, dipanggil setiap satu ticker selesai
+        :param max_workers: jumlah thread (default: self.max_workers)
+        :param force_refresh: abaikan cache memori dan persisten, ambil ulang dari provider
+        :return: list dict data fundamental, urutannya sama dengan tickers
+        """
+        tickers = list(tickers)
+        unique_tickers = list(dict.fromkeys(tickers))
+        workers = max_workers if max_workers is not None else self.max_workers
+        data = {}
+        
+        if not workers or workers <= 1 or len(unique_tickers) <= 1:
+            for done, ticker in enumerate(unique_tickers, start=1):
+                data[ticker] = self.get_fundamental_data(ticker, force_refresh)
+                if progress_callback is not None:
+                    progress_callback(done, len(unique_tickers))
+        else:
+            with ThreadPoolExecutor(max_workers=min(workers, len(unique_tickers))) as executor:
+                futures = {executor.submit(self.get_fundamental_data, ticker, force_refresh): ticker for ticker in unique_tickers}
+                for done, future in enumerate(as_completed(futures), start=1):
+                    # get_fundamental_data menangani error per ticker sendiri dan mengembalikan {}
+                    data[futures[future]] = future.result()
+                    if progress_callback is not None:
+                        progress_callback(done, len(unique_tickers))
+        
+        return [data[ticker] for ticker in tickers]
+    
+    def get_fundamental_frame(self, tickers, progress_callback=None, max_workers=None, force_refresh=False):
         """
-        results = []
+        Mengambil data fundamental mentah untuk daftar ticker sebagai DataFrame (belum diberi skor)
         
-        for ticker in tickers:
-            fundamental_data = self.get_fundamental_data(ticker)
-            fundamental_score = self.calculate_fundamental_score(fundamental_data)
-            
-            result = {
-                'Symbol': ticker,
-                'Fundamental_Score': fundamental_score
-            }
-            
-            # Tambahkan data mentah untuk referensi
-            for indicator in self.fundamental_indicators:
-                if indicator in fundamental_data:
-                    result[indicator] = fundamental_data[indicator]
-            
-            # Tambahkan informasi tambahan jika tersedia
-            for info_field in ['longName', 'sector', 'industry', 'marketCap']:
-                if info_field in fundamental_data:
-                    result[info_field] = fundamental_data[info_field]
-            
-            results.append(result)
+        :param tickers: list, daftar ticker dalam format lokal
+        :param progress_callback: fungsi (selesai, total) opsional, dipanggil setiap satu ticker selesai
+        :param max_workers: jumlah thread pengambilan data (default: self.max_workers)
+        :param force_refresh: ambil ulang data dari provider walaupun masih ada di cache
+        :return: DataFrame (Symbol, semua kolom indikator, kolom info), urutan baris sama dengan tickers
+        """
+        tickers = list(tickers)
+        all_data = self.fetch_fundamental_data(tickers, progress_callback, max_workers, force_refresh)
+        fundamental_data = pd.DataFrame(all_data, index=range(len(tickers)))
+        fundamental_data.insert(0, 'Symbol', tickers)
+        return fundamental_data
+    
+    def get_fundamental_analysis(self, tickers, progress_callback=None, max_workers=None, force_refresh=False):
+        """
+        Mendapatkan analisis fundamental untuk daftar ticker
         
-        return pd.DataFrame(results)
+        :param tickers: list, daftar ticker dalam format lokal
+        :param progress_callback: fungsi (selesai, total) opsional, dipanggil setiap satu ticker selesai
+        :param max_workers: jumlah thread pengambilan data (default: self.max_workers)
+        :param force_refresh: ambil ulang data dari provider walaupun masih ada di cache
+        :return: DataFrame, hasil analisis fundamental (urutan baris sama dengan tickers)
+        """
+        return self.rescore(self.get_fundamental_frame(tickers, progress_callback, max_workers, force_refresh))
     
-    def combine_with_rrg(self, fundamental_data, rrg_data):
+    def combine_with_rrg(self, fundamental_data, rrg_data, scoring_spec=None):
         """
         Menggabungkan data fundamental dengan data RRG
         
         :param fundamental_data: DataFrame, data fundamental
         :param rrg_data: DataFrame, data RRG
+        :param scoring_spec: scoring.ScoringSpec untuk skor gabungan (default: 50% fundamental, 50% RS-Momentum)
         :return: DataFrame, data gabungan
         """
         # Pastikan kedua DataFrame memiliki kolom 'Symbol' untuk join
@@ -234,40 +409,10 @@ class FundamentalAnalyzer:
         # Join berdasarkan Symbol
         combined_data = pd.merge(rrg_data, fundamental_data, on='Symbol', how='left')
         
-        # Isi nilai NaN dengan 0 untuk skor fundamental
-        if 'Fundamental_Score' in combined_data.columns:
-            combined_data = combined_data.copy()  # Membuat salinan eksplisit
-            combined_data['Fundamental_Score'] = combined_data['Fundamental_Score'].fillna(0)
-        else:
-            combined_data['Fundamental_Score'] = 0
-        
-        # Normalisasi RS-Momentum ke skala 0-100
-        # Asumsikan RS-Momentum biasanya berada di sekitar 100 dengan std 10
-        combined_data['RS_Momentum_Normalized'] = (combined_data['RS-Momentum'] - 90) * 100 / 20
-        combined_data['RS_Momentum_Normalized'] = combined_data['RS_Momentum_Normalized'].apply(lambda x: max(0, min(100, x)))
-        
-        # Hitung skor gabungan (50% fundamental, 50% RS-Momentum)
-        combined_data['Combined_Score'] = (
-            combined_data['Fundamental_Score'] * 0.5 + 
-            combined_data['RS_Momentum_Normalized'] * 0.5
-        )
-        
-        # Tentukan rekomendasi gabungan
-        def get_combined_recommendation(score):
-            if score >= 80:
-                return "Strong Buy"
-            elif score >= 65:
-                return "Buy"
-            elif score >= 50:
-                return "Hold"
-            elif score >= 35:
-                return "Reduce"
-            else:
-                return "Sell"
-        
-        combined_data['Combined_Recommendation'] = combined_data['Combined_Score'].apply(get_combined_recommendation)
-        
-        return combined_data
+        # Skor fundamental kosong diisi 0, RS-Momentum dinormalisasi ke 0-100, lalu skor dan rekomendasi
+        # gabungan dihitung sekaligus untuk semua saham
+        spec = scoring_spec if scoring_spec is not None else combined_score_spec()
+        return spec.apply(combined_data)
     
     def plot_combined_analysis(self, combined_data, ax=None):
         """
@@ -0,0 +1,192 @@
+# fundamental_cache.py
+# Cache data fundamental persisten (SQLite mode WAL) yang dipakai bersama antar sesi dan proses
+import json
+import os
+import sqlite3
+import threading
+import time
+from price_cache import cache_base_dir
+
+DAY = 24 * 60 * 60
+
+# Umur maksimal (detik) setiap field sebelum dianggap basi. Rasio fundamental berubah per kuartal,
+# kapitalisasi pasar mengikuti harga harian, sedangkan nama/sektor hampir tidak pernah berubah.
+FIELD_TTLS = {
+    'returnOnEquity': 30 * DAY,
+    'returnOnAssets': 30 * DAY,
+    'profitMargins': 30 * DAY,
+    'earningsGrowth': 30 * DAY,
+    'debtToEquity': 30 * DAY,
+    'marketCap': 1 * DAY,
+    'longName': 365 * DAY,
+    'sector': 365 * DAY,
+    'industry': 365 * DAY,
+}
+
+# TTL untuk field yang tidak ada di FIELD_TTLS
+DEFAULT_TTL = 7 * DAY
+
+# Kolom penanda data fundamental yang sudah melewati TTL (mode stale-while-revalidate)
+STALE_COLUMN = 'Fundamental_Stale'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS fundamentals (
+    ticker TEXT NOT NULL,
+    field TEXT NOT NULL,
+    value TEXT,
+    fetched_at REAL NOT NULL,
+    PRIMARY KEY (ticker, field)
+)
+"""
+
+
+def default_cache_path():
+    """
+    Lokasi file cache fundamental default (dapat diubah dengan environment variable RRG_FUNDAMENTAL_CACHE)
+    """
+    return os.environ.get('RRG_FUNDAMENTAL_CACHE') or os.path.join(cache_base_dir(), 'fundamentals.sqlite3')
+
+
+class FundamentalCache:
+    """
+    Cache data fundamental per ticker Yahoo Finance di SQLite. Setiap field disimpan dengan waktu
+    pengambilannya sehingga masa berlaku dapat diatur per field. Mode WAL memungkinkan beberapa proses
+    (misalnya beberapa sesi Streamlit dan job batch) membaca dan menulis file yang sama.
+    """
+
+    def __init__(self, path=None, ttls=None, default_ttl=DEFAULT_TTL, clock=time.time):
+        """
+        :param path: file SQLite (default: default_cache_path(); ':memory:' untuk cache sementara)
+        :param ttls: dict field -> TTL detik yang menimpa FIELD_TTLS
+        :param default_ttl: TTL untuk field yang tidak terdaftar
+        :param clock: fungsi waktu (detik epoch, dapat diganti untuk pengujian)
+        """
+        self.path = path or default_cache_path()
+        self.ttls = dict(FIELD_TTLS, **(ttls or {}))
+        self.default_ttl = default_ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._connection = None
+
+    def _connect(self):
+        if self._connection is None:
+            if self.path != ':memory:':
+                directory = os.path.dirname(os.path.abspath(self.path))
+                os.makedirs(directory, exist_ok=True)
+            # Satu koneksi per instance dipakai bersama oleh thread fetch (akses dijaga self._lock);
+            # timeout menunggu lock tulis dari proses lain
+            connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(SCHEMA)
+            connection.commit()
+            self._connection = connection
+        return self._connection
+
+    def ttl_for(self, field):
+        """
+        TTL (detik) untuk field
+        """
+        return self.ttls.get(field, self.default_ttl)
+
+    def lookup(self, ticker, fields=()):
+        """
+        Membaca semua field tersimpan untuk ticker beserta daftar field yang basi
+
+        :param ticker: ticker Yahoo Finance
+        :param fields: field yang wajib ada (field yang belum tersimpan dianggap basi); jika diisi, hanya field
+                       ini yang diperiksa TTL-nya. Field lain (misalnya marketCap, longName) tetap dikembalikan
+                       walaupun sudah melewati TTL dan diperbarui saat ticker diambil ulang.
+        :return: tuple (dict field -> nilai atau None jika ticker belum pernah disimpan, list field basi)
+        """
+        try:
+            with self._lock:
+                rows = self._connect().execute(
+                    "SELECT field, value, fetched_at FROM fundamentals WHERE ticker = ?", (ticker,)).fetchall()
+        except sqlite3.Error as e:
+            print(f"Gagal membaca cache fundamental untuk {ticker}: {str(e)}")
+            rows = []
+
+        if not rows:
+            return None, list(fields)
+
+        now = self.clock()
+        checked = set(fields)
+        data = {}
+        stale = [field for field in fields if field not in {row[0] for row in rows}]
+        for field, value, fetched_at in rows:
+            data[field] = json.loads(value)
+            if (not checked or field in checked) and now - fetched_at > self.ttl_for(field):
+                stale.append(field)
+        return data, stale
+
+    def get(self, ticker, fields=()):
+        """
+        Data fundamental ticker jika semua field masih berlaku
+
+        :param ticker: ticker Yahoo Finance
+        :param fields: field yang wajib ada dan diperiksa TTL-nya (kosong = semua field tersimpan)
+        :return: dict field -> nilai, atau None jika belum tersimpan atau ada field yang diperiksa sudah basi
+        """
+        data, stale = self.lookup(ticker, fields)
+        if data is None or stale:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return data
+
+    def put(self, ticker, data, fetched_at=None):
+        """
+        Menyimpan (menimpa) field data fundamental ticker
+
+        :param ticker: ticker Yahoo Finance
+        :param data: dict field -> nilai (harus dapat di-serialisasi ke JSON)
+        :param fetched_at: waktu pengambilan (default: sekarang)
+        """
+        fetched_at = self.clock() if fetched_at is None else fetched_at
+        rows = [(ticker, field, json.dumps(value), fetched_at) for field, value in data.items()]
+        try:
+            with self._lock:
+                connection = self._connect()
+                with connection:
+                    connection.executemany(
+                        "INSERT OR REPLACE INTO fundamentals (ticker, field, value, fetched_at) VALUES (?, ?, ?, ?)",
+                        rows)
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            print(f"Gagal menyimpan cache fundamental untuk {ticker}: {str(e)}")
+
+    def invalidate(self, ticker=None):
+        """
+        Menghapus entri cache untuk ticker (None = semua ticker)
+        """
+        try:
+            with self._lock:
+                connection = self._connect()
+                with connection:
+                    if ticker is None:
+                        connection.execute("DELETE FROM fundamentals")
+                    else:
+                        connection.execute("DELETE FROM fundamentals WHERE ticker = ?", (ticker,))
+        except sqlite3.Error as e:
+            print(f"Gagal menghapus cache fundamental: {str(e)}")
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+_default_fundamental_cache = None
+
+
+def default_fundamental_cache():
+    """
+    Instance FundamentalCache bersama untuk seluruh analyzer dalam satu proses
+    """
+    global _default_fundamental_cache
+    if _default_fundamental_cache is None:
+        _default_fundamental_cache = FundamentalCache()
+    return _default_fundamental_cache
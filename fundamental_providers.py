@@ -0,0 +1,157 @@
+# fundamental_providers.py
+# Sumber data fundamental yang dapat diganti: Yahoo Finance, file snapshot lokal, atau server HTTP (misalnya stub lokal)
+import json
+import os
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+
+# Sumber default jika tidak dikonfigurasi (dapat diubah dengan environment variable RRG_FUNDAMENTAL_PROVIDER)
+DEFAULT_PROVIDER = 'yfinance'
+
+# Nama kolom ticker yang dikenali di file snapshot CSV
+TICKER_COLUMNS = ('yahoo_ticker', 'Ticker', 'ticker', 'Symbol', 'symbol')
+
+
+class ProviderError(Exception):
+    """
+    Data fundamental tidak dapat diambil dari provider
+    """
+
+
+class YFinanceProvider:
+    """
+    Data fundamental dari Yahoo Finance (yfinance.Ticker(...).info)
+    """
+
+    name = 'yfinance'
+    # Batas request per detik agar tidak terkena rate limiting Yahoo
+    rate_limit = 5.0
+
+    def fetch(self, yahoo_ticker):
+        """
+        :param yahoo_ticker: ticker format Yahoo Finance (misalnya BBCA.JK)
+        :return: dict info ticker
+        """
+        # Import yfinance saat data fundamental benar-benar diambil (analisis teknikal tidak memerlukannya)
+        import yfinance
+        return yfinance.Ticker(yahoo_ticker).info
+
+
+class SnapshotProvider:
+    """
+    Data fundamental dari file snapshot lokal untuk job batch tanpa internet.
+    CSV: satu baris per ticker (kolom ticker, lihat TICKER_COLUMNS, plus kolom field seperti returnOnEquity).
+    JSON: objek {ticker: {field: nilai}} atau list objek dengan kolom ticker.
+    Ticker dicari dalam format Yahoo (BBCA.JK), lalu tanpa suffix (BBCA).
+    """
+
+    rate_limit = None
+    # File lokal sudah cepat dibaca; tidak perlu disimpan ke cache persisten
+    cacheable = False
+
+    def __init__(self, path):
+        """
+        :param path: file snapshot .csv atau .json
+        """
+        self.path = path
+        # Nama dipakai sebagai namespace cache; snapshot berbeda tidak boleh berbagi data
+        self.name = f"snapshot:{os.path.abspath(path)}"
+        self.data = self._read(path)
+
+    @staticmethod
+    def _read(path):
+        extension = os.path.splitext(path)[1].lower()
+        if extension == '.json':
+            with open(path, encoding='utf-8') as f:
+                content = json.load(f)
+            if isinstance(content, dict):
+                return {str(ticker): dict(info) for ticker, info in content.items()}
+            records = content
+        elif extension == '.csv':
+            import pandas as pd
+            frame = pd.read_csv(path)
+            # NaN di CSV berarti data tidak tersedia
+            records = [{key: (None if pd.isna(value) else value) for key, value in row.items()}
+                       for row in frame.to_dict(orient='records')]
+        else:
+            raise ProviderError(f"Format snapshot {extension} tidak didukung (gunakan .csv atau .json)")
+
+        data = {}
+        for record in records:
+            column = next((column for column in TICKER_COLUMNS if record.get(column) is not None), None)
+            if column is None:
+                raise ProviderError(f"Baris snapshot tanpa kolom ticker ({', '.join(TICKER_COLUMNS)})")
+            ticker = str(record[column])
+            data[ticker] = {key: value for key, value in record.items() if key not in TICKER_COLUMNS}
+        return data
+
+    def fetch(self, yahoo_ticker):
+        for candidate in (yahoo_ticker, yahoo_ticker.split('.')[0]):
+            if candidate in self.data:
+                return dict(self.data[candidate])
+        raise ProviderError(f"{yahoo_ticker} tidak ada di snapshot {self.path}")
+
+
+class HTTPProvider:
+    """
+    Data fundamental dari server HTTP/JSON: GET <base_url>/info/<ticker> mengembalikan objek info.
+    Respons 429 dicoba ulang dengan jeda eksponensial (minimal Retry-After dari server);
+    lihat fundamental_stub.py untuk server stub lokal.
+    """
+
+    rate_limit = None
+
+    def __init__(self, base_url, timeout=10.0, retries=5, backoff=0.1):
+        """
+        :param base_url: URL server (misalnya http://127.0.0.1:8766)
+        :param timeout: timeout per request (detik)
+        :param retries: jumlah percobaan ulang saat server membalas 429
+        :param backoff: jeda awal percobaan ulang (detik, berlipat dua setiap percobaan)
+        """
+        self.base_url = base_url.rstrip('/')
+        # Nama dipakai sebagai namespace cache; server berbeda tidak boleh berbagi data
+        self.name = f"http:{self.base_url}"
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+
+    def fetch(self, yahoo_ticker):
+        url = f"{self.base_url}/info/{urllib.parse.quote(yahoo_ticker, safe='')}"
+        for attempt in range(self.retries + 1):
+            try:
+                with urllib.request.urlopen(url, timeout=self.timeout) as response:
+                    return json.loads(response.read())
+            except urllib.error.HTTPError as e:
+                if e.code == 429 and attempt < self.retries:
+                    time.sleep(max(float(e.headers.get('Retry-After') or 0), self.backoff * 2 ** attempt))
+                    continue
+                if e.code == 404:
+                    raise ProviderError(f"{yahoo_ticker} tidak ditemukan di {self.base_url}")
+                raise ProviderError(f"HTTP {e.code} dari {self.base_url} untuk {yahoo_ticker}")
+            except urllib.error.URLError as e:
+                raise ProviderError(f"Gagal menghubungi {self.base_url}: {e.reason}")
+
+
+def create_provider(spec=None):
+    """
+    Membuat provider dari konfigurasi
+
+    :param spec: provider (dikembalikan apa adanya), atau string: 'yfinance', 'snapshot:<path>',
+                 path file .csv/.json, atau URL http(s)://...; None = RRG_FUNDAMENTAL_PROVIDER atau 'yfinance'
+    :return: objek provider dengan method fetch(yahoo_ticker)
+    """
+    if spec is not None and not isinstance(spec, str):
+        return spec
+    spec = spec or os.environ.get('RRG_FUNDAMENTAL_PROVIDER') or DEFAULT_PROVIDER
+
+    if spec == 'yfinance':
+        return YFinanceProvider()
+    if spec.startswith(('http://', 'https://')):
+        return HTTPProvider(spec)
+    if spec.startswith('snapshot:'):
+        return SnapshotProvider(spec[len('snapshot:'):])
+    if os.path.splitext(spec)[1].lower() in ('.csv', '.json'):
+        return SnapshotProvider(spec)
+    raise ProviderError(f"Provider fundamental {spec} tidak dikenal")
@@ -0,0 +1,192 @@
+# fundamental_stub.py
+# Server HTTP stub lokal untuk data fundamental: mensimulasikan latensi dan rate limit provider
+# sehingga analisis gabungan dan throughput pengambilan data dapat diuji tanpa internet
+import argparse
+import hashlib
+import json
+import math
+import random
+import sys
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from fundamental_providers import ProviderError, SnapshotProvider
+from rate_limiter import TokenBucket
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8766
+
+
+def synthetic_info(yahoo_ticker):
+    """
+    Info fundamental sintetis yang selalu sama untuk ticker yang sama (satuan mengikuti Yahoo Finance)
+    """
+    rng = random.Random(int(hashlib.sha256(yahoo_ticker.encode('utf-8')).hexdigest()[:16], 16))
+    symbol = yahoo_ticker.split('.')[0]
+    return {
+        'returnOnEquity': round(rng.gauss(0.12, 0.08), 4),
+        'returnOnAssets': round(rng.gauss(0.06, 0.04), 4),
+        'profitMargins': round(rng.gauss(0.12, 0.10), 4),
+        'earningsGrowth': round(rng.gauss(0.05, 0.20), 4),
+        'debtToEquity': round(rng.uniform(0, 250), 2),
+        'longName': f"{symbol} Tbk (sintetis)",
+        'sector': rng.choice(('Financial Services', 'Energy', 'Consumer Defensive', 'Basic Materials',
+                              'Industrials', 'Technology')),
+        'industry': 'Synthetic',
+        'marketCap': int(10 ** rng.uniform(11, 15)),
+    }
+
+
+class FundamentalStub:
+    """
+    Sumber data stub: snapshot lokal (jika ada) atau data sintetis, dengan latensi dan rate limit buatan
+    """
+
+    def __init__(self, snapshot=None, latency=0.05, jitter=0.0, rate_limit=None, burst=None, seed=0):
+        """
+        :param snapshot: file snapshot .csv/.json (None = data sintetis untuk semua ticker)
+        :param latency: latensi rata-rata per request (detik)
+        :param jitter: variasi latensi acak (detik, seragam +/-)
+        :param rate_limit: request per detik sebelum server membalas 429 (None = tanpa batas)
+        :param burst: kapasitas burst rate limit
+        :param seed: seed jitter latensi
+        """
+        self.snapshot = SnapshotProvider(snapshot) if snapshot else None
+        self.latency = latency
+        self.jitter = jitter
+        self.limiter = TokenBucket(rate_limit, burst)
+        self.served = 0
+        self.throttled = 0
+        self.not_found = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def delay(self):
+        with self._lock:
+            offset = self._rng.uniform(-self.jitter, self.jitter) if self.jitter else 0.0
+        return max(0.0, self.latency + offset)
+
+    def info(self, yahoo_ticker):
+        """
+        :return: dict info ticker
+        :raises ProviderError: jika ticker tidak ada di snapshot
+        """
+        if self.snapshot is None:
+            return synthetic_info(yahoo_ticker)
+        return self.snapshot.fetch(yahoo_ticker)
+
+    def stats(self):
+        return {'served': self.served, 'throttled': self.throttled, 'not_found': self.not_found}
+
+
+class FundamentalStubHandler(BaseHTTPRequestHandler):
+    """
+    GET /info/<ticker>, GET /health, GET /stats
+    """
+
+    stub = None
+    quiet = True
+
+    def _send_json(self, status, payload, headers=()):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        stub = self.stub
+        if self.path == '/health':
+            self._send_json(200, {'status': 'ok'})
+            return
+        if self.path == '/stats':
+            self._send_json(200, stub.stats())
+            return
+        if not self.path.startswith('/info/'):
+            self._send_json(404, {'message': f"Path {self.path} tidak ditemukan"})
+            return
+
+        if not stub.limiter.try_acquire():
+            with stub._lock:
+                stub.throttled += 1
+            retry_after = 1.0 / stub.limiter.rate
+            self._send_json(429, {'message': "Terlalu banyak request"},
+                            headers=(('Retry-After', f"{retry_after:.3f}"),))
+            return
+
+        time.sleep(stub.delay())
+        yahoo_ticker = urllib.parse.unquote(self.path[len('/info/'):])
+        try:
+            info = stub.info(yahoo_ticker)
+        except ProviderError as e:
+            with stub._lock:
+                stub.not_found += 1
+            self._send_json(404, {'message': str(e)})
+            return
+        with stub._lock:
+            stub.served += 1
+        # Nilai NaN/inf tidak valid di JSON
+        self._send_json(200, {key: (None if isinstance(value, float) and not math.isfinite(value) else value)
+                              for key, value in info.items()})
+
+    def log_message(self, format, *args):
+        if not self.quiet:
+            super().log_message(format, *args)
+
+
+def create_server(stub, host=DEFAULT_HOST, port=DEFAULT_PORT, quiet=True):
+    """
+    Membuat ThreadingHTTPServer untuk stub (port 0 = port bebas, lihat server.server_address)
+    """
+    handler = type('BoundFundamentalStubHandler', (FundamentalStubHandler,), {'stub': stub, 'quiet': quiet})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def start_server(stub, host=DEFAULT_HOST, port=0):
+    """
+    Menjalankan stub di thread latar (untuk benchmark/pengujian dalam satu proses)
+
+    :return: tuple (server, URL dasar); hentikan dengan server.shutdown()
+    """
+    server = create_server(stub, host, port)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address[:2]
+    return server, f"http://{host}:{port}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Server stub lokal untuk data fundamental")
+    parser.add_argument('--snapshot', help="file snapshot .csv/.json (default: data sintetis)")
+    parser.add_argument('--latency', type=float, default=0.05, help="latensi per request (detik)")
+    parser.add_argument('--jitter', type=float, default=0.0, help="variasi latensi acak (detik)")
+    parser.add_argument('--rate-limit', type=float, help="request per detik sebelum membalas 429")
+    parser.add_argument('--burst', type=float, help="kapasitas burst rate limit")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--verbose', '-v', action='store_true', help="tampilkan log request")
+    args = parser.parse_args(argv)
+
+    try:
+        stub = FundamentalStub(args.snapshot, args.latency, args.jitter, args.rate_limit, args.burst)
+    except (OSError, ProviderError) as e:
+        print(f"Error: gagal membaca snapshot: {str(e)}", file=sys.stderr)
+        return 2
+
+    server = create_server(stub, args.host, args.port, quiet=not args.verbose)
+    print(f"Stub fundamental berjalan di http://{args.host}:{args.port} "
+          f"(gunakan RRG_FUNDAMENTAL_PROVIDER=http://{args.host}:{args.port})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,481 @@
+# pipeline.py
+# Pipeline analisis sebagai graf stage dengan input eksplisit dan output yang di-cache per stage
+import copy
+import hashlib
+import json
+import time
+import tracemalloc
+from collections import Counter, OrderedDict
+from result_cache import source_fingerprint, store_fingerprint, normalize_params
+
+
+class StageError(Exception):
+    """
+    Stage gagal menghasilkan output (pesan ditujukan untuk ditampilkan ke pengguna)
+    """
+
+    def __init__(self, stage, message):
+        super().__init__(message)
+        self.stage = stage
+
+
+class Stage:
+    """
+    Satu langkah pipeline.
+
+    Kunci cache stage = nama stage + nilai parameternya sendiri + kunci stage upstream,
+    sehingga stage hanya dihitung ulang jika salah satu inputnya berubah.
+    """
+
+    def __init__(self, name, func, deps=(), params=None, key_func=None, label=None, progress=(0.0, 0.0)):
+        """
+        :param name: nama stage
+        :param func: fungsi (pipeline, inputs, params) -> output; inputs berisi output stage upstream
+        :param deps: nama stage upstream
+        :param params: dict nama parameter -> nilai default yang mempengaruhi output stage ini
+        :param key_func: fungsi opsional (inputs, upstream_keys) -> data kunci pengganti kunci upstream,
+                         untuk stage yang hanya bergantung pada sebagian kecil output upstream
+        :param label: teks progress untuk stage ini
+        :param progress: rentang (awal, akhir) fraksi progress keseluruhan yang ditempati stage ini
+        """
+        self.name = name
+        self.func = func
+        self.deps = tuple(deps)
+        self.params = params or {}
+        self.key_func = key_func
+        self.label = label or name
+        self.progress = progress
+
+
+def _analyzer_with(inputs):
+    """
+    RRGAnalyzer dari stage select dengan atribut hasil stage upstream (rs_ratio, rs_momentum, normalize)
+    """
+    analyzer = inputs['select']
+    for name, output in inputs.items():
+        if name != 'select' and isinstance(output, dict):
+            for attr, value in output.items():
+                setattr(analyzer, attr, value)
+    return analyzer
+
+
+def _load(pipeline, inputs, params):
+    from rrg import RRGAnalyzer
+
+    analyzer = RRGAnalyzer(
+        benchmark_file=pipeline.benchmark_file,
+        stock_files=pipeline.stock_files,
+        period_years=params['period_years'],
+        max_date=params['max_date'],
+        price_cache=pipeline.price_cache if params.get('use_price_cache', True) else None,
+        load_workers=params.get('load_workers'),
+        universe_file=pipeline.universe_file,
+        price_store=params['price_store'],
+        benchmark_symbol=params['benchmark_symbol'],
+        progress_callback=pipeline.stage_progress
+    )
+    if not analyzer.load_data_from_files():
+        raise StageError('load', "Gagal memuat data dari file. Periksa format file CSV Anda.")
+    if analyzer.panel is None:
+        analyzer.build_panel()
+    return analyzer
+
+
+def _select(pipeline, inputs, params):
+    analyzer = inputs['load']
+    tickers = params['tickers']
+    if not tickers:
+        return analyzer
+
+    # Ticker dapat dipilih berdasarkan symbol (nama file) atau ticker asli dari data CSV
+    wanted = {str(ticker).upper() for ticker in tickers}
+    symbols = [symbol for symbol in analyzer.stock_symbols
+               if symbol.upper() in wanted or str(analyzer.ticker_map.get(symbol, symbol)).upper() in wanted]
+    if not symbols:
+        raise StageError('select', f"Tidak ada ticker yang cocok dengan: {', '.join(map(str, tickers))}")
+
+    # Salinan dangkal agar analyzer stage load (seluruh universe) tidak berubah
+    selected = copy.copy(analyzer)
+    selected.panel = analyzer.panel.select(symbols)
+    selected.stock_symbols = list(selected.panel.tickers)
+    selected.ticker_map = {symbol: analyzer.ticker_map.get(symbol, symbol) for symbol in selected.stock_symbols}
+    selected.stock_data = {symbol: analyzer.stock_data[symbol] for symbol in selected.stock_symbols
+                           if symbol in analyzer.stock_data}
+    return selected
+
+
+def _rs_ratio(pipeline, inputs, params):
+    analyzer = _analyzer_with(inputs)
+    analyzer.calculate_rs_ratio(period=params['rs_ratio_period'])
+    if not analyzer.rs_ratio:
+        raise StageError('rs_ratio', "Gagal menghitung RS-Ratio. Mungkin tidak cukup data.")
+    return {'rs_ratio': analyzer.rs_ratio, 'rs_ratio_matrix': analyzer.rs_ratio_matrix}
+
+
+def _rs_momentum(pipeline, inputs, params):
+    analyzer = _analyzer_with(inputs)
+    analyzer.calculate_rs_momentum(period=params['rs_momentum_period'])
+    if not analyzer.rs_momentum:
+        raise StageError('rs_momentum', "Gagal menghitung RS-Momentum. Mungkin tidak cukup data.")
+    return {'rs_momentum': analyzer.rs_momentum, 'rs_momentum_matrix': analyzer.rs_momentum_matrix}
+
+
+def _normalize(pipeline, inputs, params):
+    analyzer = _analyzer_with(inputs)
+    if not analyzer.normalize_data():
+        raise StageError('normalize', "Gagal melakukan normalisasi data. Mungkin tidak cukup variasi dalam data.")
+    return {
+        'rs_ratio_norm': analyzer.rs_ratio_norm,
+        'rs_momentum_norm': analyzer.rs_momentum_norm,
+        'rs_ratio_norm_matrix': analyzer.rs_ratio_norm_matrix,
+        'rs_momentum_norm_matrix': analyzer.rs_momentum_norm_matrix,
+    }
+
+
+def _latest(pipeline, inputs, params):
+    return _analyzer_with(inputs).get_latest_data()
+
+
+def configure_fundamental_analyzer(fundamental_analyzer, params):
+    """
+    Menerapkan indikator dan bobot fundamental yang dipilih pengguna ke FundamentalAnalyzer
+
+    :param fundamental_analyzer: FundamentalAnalyzer
+    :param params: dict parameter analisis (fundamental_provider, stale_while_revalidate, include_* dan *_weight)
+    """
+    fundamental_analyzer.stale_while_revalidate = bool(params.get('stale_while_revalidate', False))
+
+    # Sumber data fundamental (None = konfigurasi default, lihat fundamental_providers.create_provider)
+    provider = params.get('fundamental_provider')
+    if provider != fundamental_analyzer.provider_spec:
+        fundamental_analyzer.set_provider(provider)
+
+
+    indicators = []
+    weights = {}
+    for include, indicator, weight in (('include_roe', 'returnOnEquity', 'roe_weight'),
+                                       ('include_roa', 'returnOnAssets', 'roa_weight'),
+                                       ('include_profit_margin', 'profitMargins', 'pm_weight'),
+                                       ('include_earnings_growth', 'earningsGrowth', 'eg_weight'),
+                                       ('include_debt_equity', 'debtToEquity', 'de_weight')):
+        if params.get(include, True):
+            indicators.append(indicator)
+            weights[indicator] = params.get(weight, STAGES['fundamentals'].params[weight])
+    if not indicators:
+        # Tidak ada indikator yang dipilih: kembali ke indikator dan bobot default (analyzer dipakai ulang
+        # antar run, sehingga pilihan run sebelumnya tidak boleh tertinggal)
+        from fundamental_analyzer import DEFAULT_INDICATOR_WEIGHTS
+        indicators = list(DEFAULT_INDICATOR_WEIGHTS)
+        weights = dict(DEFAULT_INDICATOR_WEIGHTS)
+    fundamental_analyzer.fundamental_indicators = indicators
+    fundamental_analyzer.indicator_weights = weights
+
+
+def _fundamental_data(pipeline, inputs, params):
+    from fundamental_providers import ProviderError
+    fundamental_analyzer = pipeline.get_fundamental_analyzer()
+
+    # Set sumber data yang dipilih user
+    try:
+        configure_fundamental_analyzer(fundamental_analyzer, params)
+    except (OSError, ProviderError) as e:
+        raise StageError('fundamental_data', f"Gagal menyiapkan sumber data fundamental: {str(e)}")
+
+    tickers = inputs['latest']['Symbol'].tolist()
+    fundamental_data = fundamental_analyzer.get_fundamental_frame(tickers, progress_callback=pipeline.stage_progress,
+                                                                  max_workers=params.get('fundamental_workers'),
+                                                                  force_refresh=bool(params.get('refresh_fundamental')))
+
+    # Dengan cache persisten, run berikutnya membaca ulang cache (murah, tanpa request ke provider) agar TTL
+    # data diperiksa ulang dan data yang sudah diperbarui (di latar belakang atau oleh sesi lain) ikut terpakai
+    if fundamental_analyzer.cache is not None:
+        pipeline.expire('fundamental_data')
+    return fundamental_data
+
+
+def _fundamentals(pipeline, inputs, params):
+    fundamental_analyzer = pipeline.get_fundamental_analyzer()
+
+    # Set indikator dan bobot yang dipilih user; skor dihitung ulang dari data mentah tanpa mengambil ulang
+    configure_fundamental_analyzer(fundamental_analyzer, params)
+    return fundamental_analyzer.rescore(inputs['fundamental_data'])
+
+
+def _fundamentals_key(inputs, upstream_keys):
+    # Data fundamental hanya bergantung pada daftar ticker, bukan pada nilai RS
+    return sorted(inputs['latest']['Symbol'].tolist()) if 'Symbol' in inputs['latest'] else []
+
+
+def _combine(pipeline, inputs, params):
+    from scoring import combined_score_spec
+    fundamental_analyzer = pipeline.get_fundamental_analyzer()
+
+    # Bobot default: 50% fundamental + 50% RS-Momentum, atau 40% universe + 30% fundamental + 30% RS-Momentum
+    # (bobot kustom dinormalisasi sehingga jumlahnya 1)
+    try:
+        spec = combined_score_spec(params['use_universe_score'], params['universe_score_input'],
+                                   params['fundamental_weight'], params['momentum_weight'], params['universe_weight'])
+    except ValueError as e:
+        raise StageError('combine', str(e))
+    return fundamental_analyzer.combine_with_rrg(inputs['fundamentals'], inputs['latest'], scoring_spec=spec)
+
+
+def _plot(pipeline, inputs, params):
+    return _analyzer_with(inputs).plot_rrg(title=params['plot_title'], trail_length=params['trail_length'])
+
+
+# Graf stage: load → select → rs_ratio → rs_momentum → normalize → latest → fundamentals → combine, serta plot
+STAGES = OrderedDict((stage.name, stage) for stage in (
+    Stage('load', _load, params={'period_years': 3.0, 'max_date': None, 'price_store': None, 'benchmark_symbol': None},
+          label="Memuat data dari file CSV...", progress=(0.0, 0.5)),
+    Stage('select', _select, deps=('load',), params={'tickers': None},
+          label="Memilih ticker...", progress=(0.5, 0.5)),
+    Stage('rs_ratio', _rs_ratio, deps=('select',), params={'rs_ratio_period': 52},
+          label="Menghitung RS-Ratio...", progress=(0.5, 0.6)),
+    Stage('rs_momentum', _rs_momentum, deps=('select', 'rs_ratio'), params={'rs_momentum_period': 26},
+          label="Menghitung RS-Momentum...", progress=(0.6, 0.65)),
+    Stage('normalize', _normalize, deps=('select', 'rs_ratio', 'rs_momentum'),
+          label="Menormalisasi data...", progress=(0.65, 0.7)),
+    Stage('latest', _latest, deps=('select', 'normalize'),
+          label="Mempersiapkan hasil RRG...", progress=(0.7, 0.75)),
+    Stage('fundamental_data', _fundamental_data, deps=('latest',), key_func=_fundamentals_key,
+          params={'fundamental_provider': None, 'stale_while_revalidate': False},
+          label="Mengambil data fundamental...", progress=(0.75, 0.94)),
+    Stage('fundamentals', _fundamentals, deps=('fundamental_data',),
+          label="Menghitung skor fundamental...", progress=(0.94, 0.95), params={
+        'include_roe': True, 'include_roa': True, 'include_profit_margin': True,
+        'include_earnings_growth': True, 'include_debt_equity': True,
+        'roe_weight': 0.25, 'roa_weight': 0.20, 'pm_weight': 0.20, 'eg_weight': 0.20, 'de_weight': 0.15,
+    }),
+    Stage('combine', _combine, deps=('latest', 'fundamentals'),
+          params={'use_universe_score': False, 'universe_score_input': 50,
+                  'fundamental_weight': None, 'momentum_weight': None, 'universe_weight': None},
+          label="Menggabungkan hasil analisis...", progress=(0.95, 1.0)),
+    Stage('plot', _plot, deps=('select', 'normalize'), params={'trail_length': 4, 'plot_title': None},
+          label="Menggambar grafik RRG...", progress=(1.0, 1.0)),
+))
+
+
+class AnalysisPipeline:
+    """
+    Menjalankan stage analisis sesuai kebutuhan (pull) dan menyimpan output terakhir setiap stage.
+    Perubahan parameter hanya menghitung ulang stage yang terpengaruh, misalnya periode momentum
+    baru memakai ulang panel dan matriks RS-Ratio, dan panjang trail baru hanya menggambar ulang grafik.
+    """
+
+    def __init__(self, price_cache=None, max_entries=4, stages=None, progress_callback=None, measure_memory=False,
+                 fundamental_cache=None):
+        """
+        :param price_cache: PriceCache untuk stage load (opsional)
+        :param max_entries: jumlah output yang disimpan per stage
+        :param stages: definisi stage (default: STAGES)
+        :param progress_callback: fungsi (fraksi 0-1, teks) untuk melaporkan progress
+        :param measure_memory: catat puncak memori per stage dengan tracemalloc (memperlambat stage
+                               sekitar 2x; alokasi di worker proses load tidak ikut terhitung)
+        :param fundamental_cache: FundamentalCache persisten untuk stage fundamentals (opsional)
+        """
+        self.price_cache = price_cache
+        self.fundamental_cache = fundamental_cache
+        self.max_entries = max_entries
+        self.stages = stages if stages is not None else STAGES
+        self.benchmark_file = None
+        self.stock_files = []
+        self.universe_file = None
+        self.params = {}
+        self.fundamental_analyzer = None
+        self.stage_runs = Counter()  # jumlah eksekusi per stage sejak pipeline dibuat
+        self.recomputed = []  # stage yang dihitung ulang sejak configure()/update_params() terakhir
+        self.progress_callback = progress_callback
+        self.measure_memory = measure_memory
+        self.timings = OrderedDict()  # nama stage -> {'seconds', 'peak_memory_mb', 'cached'}
+        self._current_stage = None
+        self._source_key = None
+        self._refresh = set()
+        self._expired = set()
+        self._outputs = {name: OrderedDict() for name in self.stages}
+        self._keys = {}
+
+    def configure(self, benchmark_file, stock_files, params, universe_file=None, refresh=()):
+        """
+        Mengatur file input dan parameter. Isi file di-hash sekali di sini.
+
+        :param benchmark_file: file benchmark (path, buffer, atau bytes)
+        :param stock_files: list file saham
+        :param params: dict parameter analisis
+        :param universe_file: file universe opsional
+        :param refresh: nama stage yang dipaksa dihitung ulang (misalnya 'fundamental_data')
+        """
+        self.benchmark_file = benchmark_file
+        self.stock_files = stock_files if stock_files else []
+        self.universe_file = universe_file
+        self._source_key = json.dumps({
+            'benchmark': source_fingerprint(benchmark_file),
+            'stocks': [source_fingerprint(source) for source in self.stock_files],
+            'universe': source_fingerprint(universe_file),
+        }, sort_keys=True)
+        self.params = {}
+        self.update_params(refresh=refresh, **(params or {}))
+
+    def update_params(self, refresh=(), **params):
+        """
+        Mengubah sebagian parameter tanpa membaca ulang file input
+        """
+        self.params.update(params)
+        # Stage yang bergantung pada stage yang di-refresh juga harus dihitung ulang (kuncinya tidak berubah).
+        # Stage yang kedaluwarsa tetap ditandai sampai benar-benar dihitung ulang, walaupun run di antaranya
+        # tidak memakainya (misalnya plot_rrg atau analisis teknikal saja)
+        self._refresh = set(refresh) | self._expired
+        for name, stage in self.stages.items():
+            if self._refresh.intersection(stage.deps):
+                self._refresh.add(name)
+        self._keys = {}
+        self.recomputed = []
+        self.timings = OrderedDict()
+
+    def expire(self, name):
+        """
+        Output stage `name` (dan stage yang bergantung padanya) tidak dipakai ulang pada run berikutnya
+        yang membutuhkannya walaupun inputnya sama (misalnya karena berisi data basi yang sedang diperbarui)
+        """
+        self._expired.add(name)
+        for stage_name, stage in self.stages.items():
+            if self._expired.intersection(stage.deps):
+                self._expired.add(stage_name)
+
+    def report_progress(self, fraction, text):
+        """
+        Meneruskan progress ke progress_callback (jika ada)
+        """
+        if self.progress_callback is not None:
+            self.progress_callback(min(max(fraction, 0.0), 1.0), text)
+
+    def stage_progress(self, done, total):
+        """
+        Progress di dalam stage yang sedang berjalan (misalnya per file saham atau per ticker)
+
+        :param done: jumlah item selesai
+        :param total: jumlah seluruh item
+        """
+        stage = self._current_stage
+        if stage is None or not total:
+            return
+        start, end = stage.progress
+        self.report_progress(start + (end - start) * done / total, f"{stage.label} ({done}/{total})")
+
+    def get_fundamental_analyzer(self):
+        """
+        FundamentalAnalyzer bersama (cache data fundamental di memorinya dipakai ulang antar run,
+        cache persisten dipakai ulang antar sesi dan proses)
+        """
+        if self.fundamental_analyzer is None:
+            from fundamental_analyzer import FundamentalAnalyzer
+            self.fundamental_analyzer = FundamentalAnalyzer(cache=self.fundamental_cache)
+        return self.fundamental_analyzer
+
+    def _stage_params(self, stage):
+        return {name: self.params.get(name, default) for name, default in stage.params.items()}
+
+    def _stage_key(self, stage, inputs, params):
+        if stage.key_func is not None:
+            upstream = stage.key_func(inputs, {dep: self._keys[dep] for dep in stage.deps})
+        elif stage.deps:
+            upstream = [self._keys[dep] for dep in stage.deps]
+        else:
+            # Stage tanpa upstream membaca file input dan/atau price store
+            upstream = [self._source_key, store_fingerprint(params.get('price_store'))]
+        key_params = {key: value for key, value in params.items() if key != 'price_store'}
+        payload = {'stage': stage.name, 'params': normalize_params(key_params), 'upstream': upstream}
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode('utf-8')).hexdigest()
+
+    def get(self, name):
+        """
+        Output stage `name`, dihitung (beserta upstream-nya) hanya jika inputnya berubah
+
+        :param name: nama stage
+        :return: output stage
+        :raises StageError: jika stage (atau upstream-nya) gagal
+        """
+        if self._source_key is None:
+            raise ValueError("Pipeline belum dikonfigurasi, panggil configure() terlebih dahulu")
+        stage = self.stages[name]
+        inputs = {dep: self.get(dep) for dep in stage.deps}
+        params = self._stage_params(stage)
+        key = self._keys.get(name)
+        if key is None:
+            key = self._stage_key(stage, inputs, params)
+            self._keys[name] = key
+
+        cache = self._outputs[name]
+        if key in cache and name not in self._refresh:
+            cache.move_to_end(key)
+            if name not in self.timings:
+                self.timings[name] = {'seconds': 0.0, 'peak_memory_mb': None, 'cached': True}
+                self.report_progress(stage.progress[1], stage.label)
+            return cache[key]
+
+        run_params = dict(self.params)
+        run_params.update(params)
+        # Tanda kedaluwarsa dihapus sebelum stage berjalan (stage boleh menandai dirinya lagi)
+        # dan dikembalikan jika stage gagal
+        expired = name in self._expired
+        self._expired.discard(name)
+        try:
+            output = self._run_stage(stage, inputs, run_params)
+        except Exception:
+            if expired:
+                self._expired.add(name)
+            raise
+        self._refresh.discard(name)
+        self.stage_runs[name] += 1
+        self.recomputed.append(name)
+
+        cache[key] = output
+        cache.move_to_end(key)
+        while len(cache) > self.max_entries:
+            cache.popitem(last=False)
+        return output
+
+    def _run_stage(self, stage, inputs, params):
+        """
+        Menjalankan satu stage sambil mencatat waktu (wall-clock) dan puncak memori
+        """
+        self._current_stage = stage
+        self.report_progress(stage.progress[0], stage.label)
+
+        started_tracing = False
+        if self.measure_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                started_tracing = True
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+        start_time = time.perf_counter()
+        try:
+            output = stage.func(self, inputs, params)
+        finally:
+            seconds = time.perf_counter() - start_time
+            peak_memory_mb = None
+            if self.measure_memory:
+                peak_memory_mb = max(tracemalloc.get_traced_memory()[1] - baseline, 0) / (1024 * 1024)
+                if started_tracing:
+                    tracemalloc.stop()
+            self.timings[stage.name] = {'seconds': seconds, 'peak_memory_mb': peak_memory_mb, 'cached': False}
+            self._current_stage = None
+
+        self.report_progress(stage.progress[1], stage.label)
+        return output
+
+    def analyzer(self):
+        """
+        RRGAnalyzer dengan state stage load..normalize yang sesuai parameter saat ini
+        (untuk plot_rrg, get_analysis_date, dan sebagainya)
+        """
+        return _analyzer_with({name: self.get(name) for name in ('select', 'rs_ratio', 'rs_momentum', 'normalize')})
+
+    def clear(self):
+        """
+        Menghapus semua output yang tersimpan
+        """
+        for cache in self._outputs.values():
+            cache.clear()
+        self._keys = {}
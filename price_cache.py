@@ -0,0 +1,126 @@
+# price_cache.py
+# Cache lokal (Parquet) untuk data harga CSV yang sudah dibersihkan, dengan kunci hash isi file
+import hashlib
+import importlib.util
+import os
+import tempfile
+import pandas as pd
+
+# Nama kolom index tanggal pada file Parquet
+DATE_COLUMN = 'Date'
+
+# Naikkan versi ini jika format data yang disimpan di cache berubah
+CACHE_VERSION = 2
+
+# Jumlah baris per row group Parquet; row group kecil memungkinkan pembacaan
+# rentang tanggal melewati row group yang tidak diperlukan
+ROW_GROUP_ROWS = 1024
+
+
+def cache_base_dir():
+    """
+    Direktori induk semua cache aplikasi (dapat diubah dengan environment variable RRG_CACHE_DIR)
+    """
+    return os.environ.get('RRG_CACHE_DIR') or os.path.join(os.path.expanduser('~'), '.cache', 'rrg_analyzer')
+
+
+def default_cache_dir():
+    """
+    Direktori cache default (dapat diubah dengan environment variable RRG_CACHE_DIR)
+    """
+    return os.path.join(cache_base_dir(), 'prices')
+
+
+def content_hash(data):
+    """
+    Menghitung hash SHA-256 dari isi file
+
+    :param data: bytes isi file
+    :return: string hex digest
+    """
+    return hashlib.sha256(data).hexdigest()
+
+
+class PriceCache:
+    """
+    Cache on-disk untuk DataFrame harga yang sudah diparsing (index tanggal, terurut).
+    Setiap entri disimpan sebagai file Parquet dengan nama berdasarkan hash isi CSV,
+    sehingga file yang sama tidak perlu diparsing ulang pada run berikutnya.
+    """
+
+    def __init__(self, cache_dir=None):
+        """
+        :param cache_dir: direktori cache (default: default_cache_dir())
+        """
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.hits = 0
+        self.misses = 0
+
+        # Parquet membutuhkan pyarrow atau fastparquet
+        self.engine = next((engine for engine in ('pyarrow', 'fastparquet')
+                            if importlib.util.find_spec(engine) is not None), None)
+        self.enabled = self.engine is not None
+        if not self.enabled:
+            print("pyarrow/fastparquet tidak terinstal, cache data harga dinonaktifkan")
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.v{CACHE_VERSION}.parquet")
+
+    def get(self, key, start=None, end=None):
+        """
+        Mengambil DataFrame dari cache
+
+        :param key: hash isi file
+        :param start: batas bawah tanggal (opsional); row group di luar rentang tidak dibaca
+        :param end: batas atas tanggal (opsional)
+        :return: DataFrame atau None jika tidak ada di cache
+        """
+        if not self.enabled:
+            return None
+
+        path = self._path(key)
+        if not os.path.exists(path):
+            self.misses += 1
+            return None
+
+        filters = []
+        if start is not None:
+            filters.append((DATE_COLUMN, '>=', pd.Timestamp(start)))
+        if end is not None:
+            filters.append((DATE_COLUMN, '<=', pd.Timestamp(end)))
+
+        try:
+            frame = pd.read_parquet(path, engine=self.engine, filters=filters or None)
+        except Exception as e:
+            print(f"Gagal membaca cache {path}: {str(e)}")
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return frame
+
+    def put(self, key, frame):
+        """
+        Menyimpan DataFrame ke cache (ditulis ke file sementara lalu di-rename agar atomik)
+
+        :param key: hash isi file
+        :param frame: DataFrame dengan index tanggal
+        """
+        if not self.enabled:
+            return
+
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            os.close(fd)
+            try:
+                if self.engine == 'pyarrow':
+                    frame.to_parquet(temp_path, engine=self.engine, row_group_size=ROW_GROUP_ROWS)
+                else:
+                    frame.to_parquet(temp_path, engine=self.engine, row_group_offsets=ROW_GROUP_ROWS)
+                os.replace(temp_path, self._path(key))
+            finally:
+                if os.path.exists(temp_path):
+                    os.unlink(temp_path)
+        except Exception as e:
+            print(f"Gagal menyimpan cache untuk {key}: {str(e)}")
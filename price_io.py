@@ -0,0 +1,353 @@
+# price_io.py
+# Fungsi untuk membaca file CSV harga menjadi DataFrame berindeks tanggal
+import io
+import os
+import numpy as np
+import pandas as pd
+from price_cache import content_hash
+
+DATE_COLUMN = 'Date'
+TICKER_COLUMN = 'Ticker'
+PRICE_COLUMNS = ('Open', 'High', 'Low', 'Close')
+VOLUME_COLUMN = 'Volume'
+
+# Kolom yang dibutuhkan analisis RRG (Date selalu dibaca)
+RRG_COLUMNS = (TICKER_COLUMN, 'Close')
+
+# Kandidat format tanggal, dicoba berurutan; MM/DD/YYYY didahulukan dari DD/MM/YYYY
+# agar sama dengan fallback max_date sebelumnya
+DATE_FORMATS = (
+    '%Y-%m-%d',
+    '%m/%d/%Y',
+    '%d/%m/%Y',
+    '%Y/%m/%d',
+    '%d-%m-%Y',
+    '%Y%m%d',
+    '%Y-%m-%d %H:%M:%S',
+    '%m/%d/%Y %H:%M:%S',
+    '%d-%b-%Y',
+    '%d %b %Y',
+    '%b %d, %Y',
+)
+
+# Jumlah nilai tanggal yang dipakai untuk mendeteksi format
+DATE_SAMPLE_SIZE = 20
+
+# Jumlah baris per potongan saat membaca CSV dengan batas rentang tanggal
+CHUNK_ROWS = 65536
+
+# Byte awal file gzip
+GZIP_MAGIC = b'\x1f\x8b'
+
+
+class MissingDateColumnError(ValueError):
+    """
+    Kolom 'Date' tidak ditemukan di file harga
+    """
+
+
+class DateConversionError(ValueError):
+    """
+    Kolom 'Date' tidak dapat dikonversi ke datetime
+    """
+
+
+def read_source_bytes(source):
+    """
+    Membaca isi sumber data harga sebagai bytes tanpa menulis file sementara.
+
+    Sumber yang didukung: path file, bytes, tuple (nama, bytes), atau objek buffer
+    seperti io.BytesIO dan UploadedFile Streamlit (memiliki getvalue() atau read()).
+
+    :param source: sumber data
+    :return: bytes
+    """
+    if isinstance(source, tuple):
+        source = source[1]
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return bytes(source)
+    if hasattr(source, 'getvalue'):
+        data = source.getvalue()
+    elif hasattr(source, 'read'):
+        data = source.read()
+    else:
+        with open(source, 'rb') as f:
+            return f.read()
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    return data
+
+
+def source_name(source, default=None):
+    """
+    Nama sumber data tanpa ekstensi (dipakai sebagai symbol file)
+
+    :param source: path, tuple (nama, bytes), atau buffer dengan atribut name
+    :param default: nama pengganti jika sumber tidak memiliki nama
+    :return: string
+    """
+    if isinstance(source, tuple):
+        name = source[0]
+    elif isinstance(source, (str, os.PathLike)):
+        name = os.fspath(source)
+    else:
+        name = getattr(source, 'name', None)
+    if not name:
+        return default
+    return os.path.splitext(os.path.basename(name))[0]
+
+
+def source_label(source):
+    """
+    Label sumber data untuk pesan error (path lengkap jika berupa file)
+    """
+    if isinstance(source, (str, os.PathLike)):
+        return os.fspath(source)
+    return source_name(source, default=type(source).__name__)
+
+
+def detect_date_format(values):
+    """
+    Mendeteksi format tanggal dari sampel nilai
+
+    :param values: iterable string tanggal (nilai kosong diabaikan)
+    :return: string format strftime dari DATE_FORMATS, atau None jika tidak ada yang cocok
+    """
+    sample = pd.Series([value for value in values if isinstance(value, str) and value.strip()],
+                       dtype=object)
+    if sample.empty:
+        return None
+
+    for date_format in DATE_FORMATS:
+        parsed = pd.to_datetime(sample, format=date_format, errors='coerce')
+        if parsed.notna().all():
+            return date_format
+    return None
+
+
+def parse_dates(values, date_format=None):
+    """
+    Konversi kolom tanggal dengan format yang dideteksi satu kali dari sampel.
+    Nilai yang tidak cocok dengan format tersebut diparsing ulang secara fleksibel.
+
+    :param values: Series string tanggal
+    :param date_format: format hasil deteksi sebelumnya (default: dideteksi dari sampel values)
+    :return: Series datetime (NaT untuk tanggal tidak valid)
+    """
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values
+
+    values = values.astype(object)
+    if date_format is None:
+        date_format = detect_date_format(values.dropna().head(DATE_SAMPLE_SIZE))
+    if date_format is None:
+        return pd.to_datetime(values, errors='coerce')
+
+    parsed = pd.to_datetime(values, format=date_format, errors='coerce')
+    failed = parsed.isna() & values.notna()
+    if failed.any():
+        parsed[failed] = pd.to_datetime(values[failed], errors='coerce')
+    return parsed
+
+
+def parse_date_string(value):
+    """
+    Konversi satu string tanggal (misalnya max_date) dengan deteksi format yang sama
+    seperti kolom Date di file harga
+
+    :param value: string tanggal
+    :return: pd.Timestamp
+    :raises ValueError: jika string tidak dapat dikonversi
+    """
+    date_format = detect_date_format([value])
+    if date_format is not None:
+        return pd.to_datetime(value, format=date_format)
+    return pd.to_datetime(value)
+
+
+def slice_dates(frame, start=None, end=None):
+    """
+    Mengambil baris dengan tanggal dalam rentang [start, end] dari DataFrame berindeks
+    tanggal yang sudah terurut, menggunakan pencarian biner pada index
+
+    :param frame: DataFrame berindeks tanggal dan terurut
+    :param start: batas bawah tanggal (inklusif, None = tanpa batas)
+    :param end: batas atas tanggal (inklusif, None = tanpa batas)
+    :return: DataFrame hasil potongan
+    """
+    lower = 0 if start is None else frame.index.searchsorted(pd.Timestamp(start), side='left')
+    upper = len(frame) if end is None else frame.index.searchsorted(pd.Timestamp(end), side='right')
+    if lower == 0 and upper == len(frame):
+        return frame
+    return frame.iloc[lower:upper]
+
+
+def _column_dtypes(price_dtype):
+    """
+    Tipe data eksplisit untuk kolom CSV harga
+    """
+    dtypes = {column: price_dtype for column in PRICE_COLUMNS}
+    dtypes[VOLUME_COLUMN] = 'float64'
+    dtypes[TICKER_COLUMN] = 'category'
+    dtypes[DATE_COLUMN] = object
+    return dtypes
+
+
+def _read_dated_rows(raw, read_kwargs, dtypes, start, end):
+    """
+    Membaca CSV dan mengkonversi kolom Date. Jika rentang tanggal diberikan, file dibaca
+    per potongan: baris di luar rentang langsung dibuang dan pembacaan berhenti lebih awal
+    begitu file yang terurut (naik atau turun) sudah melewati rentang tersebut.
+
+    :return: tuple (DataFrame berindeks tanggal dan terurut, jumlah baris dengan tanggal tidak valid)
+    """
+    windowed = start is not None or end is not None
+    if windowed:
+        chunks = pd.read_csv(io.BytesIO(raw), dtype=dtypes, chunksize=CHUNK_ROWS, **read_kwargs)
+    else:
+        chunks = [pd.read_csv(io.BytesIO(raw), dtype=dtypes, **read_kwargs)]
+
+    pieces = []
+    invalid_count = 0
+    date_format = None
+    ascending = descending = True
+    last_date = None
+
+    for i, chunk in enumerate(chunks):
+        if DATE_COLUMN not in chunk.columns:
+            raise MissingDateColumnError(DATE_COLUMN)
+
+        try:
+            # Format tanggal dideteksi sekali per file, lalu diparsing dengan format tetap
+            if i == 0:
+                date_format = detect_date_format(chunk[DATE_COLUMN].dropna().head(DATE_SAMPLE_SIZE))
+            dates = parse_dates(chunk[DATE_COLUMN], date_format)
+        except Exception as e:
+            raise DateConversionError(str(e)) from e
+
+        # Hapus data dengan tanggal invalid
+        keep = dates.notna()
+        invalid_count += int((~keep).sum())
+        chunk[DATE_COLUMN] = dates
+        if not windowed:
+            pieces.append(chunk[keep] if not keep.all() else chunk)
+            break
+
+        valid_dates = dates[keep]
+        if start is not None:
+            keep &= dates >= start
+        if end is not None:
+            keep &= dates <= end
+        pieces.append(chunk[keep])
+
+        if valid_dates.empty:
+            continue
+        # Pastikan urutan tanggal file tetap terjaga antar potongan sebelum berhenti lebih awal
+        ascending = ascending and valid_dates.is_monotonic_increasing and (
+            last_date is None or valid_dates.iloc[0] >= last_date)
+        descending = descending and valid_dates.is_monotonic_decreasing and (
+            last_date is None or valid_dates.iloc[0] <= last_date)
+        last_date = valid_dates.iloc[-1]
+        if (ascending and end is not None and last_date > end) or (
+                descending and start is not None and last_date < start):
+            break
+
+    if hasattr(chunks, 'close'):
+        chunks.close()
+
+    frame = pieces[0] if len(pieces) == 1 else pd.concat(pieces)
+    if dtypes is not None and TICKER_COLUMN in frame.columns and frame[TICKER_COLUMN].dtype != 'category':
+        # Kategori tiap potongan bisa berbeda sehingga hasil concat menjadi object
+        frame[TICKER_COLUMN] = frame[TICKER_COLUMN].astype('category')
+
+    try:
+        # Set index dan sort
+        frame = frame.set_index(DATE_COLUMN).sort_index()
+    except Exception as e:
+        raise DateConversionError(str(e)) from e
+    return frame, invalid_count
+
+
+def parse_price_csv(raw, columns=None, price_dtype='float64', start=None, end=None):
+    """
+    Parsing isi CSV harga: konversi kolom Date, hapus tanggal tidak valid,
+    jadikan index dan urutkan.
+
+    :param raw: bytes isi file CSV (boleh terkompresi gzip)
+    :param columns: kolom yang dibaca selain Date (default: semua kolom), misalnya RRG_COLUMNS
+    :param price_dtype: tipe data kolom harga ('float64' atau 'float32')
+    :param start: hanya baca baris dengan tanggal >= start (opsional)
+    :param end: hanya baca baris dengan tanggal <= end (opsional)
+    :return: DataFrame berindeks tanggal; jumlah baris dengan tanggal tidak valid
+             yang dihapus disimpan di ``frame.attrs['invalid_dates']`` (jika pembacaan
+             berhenti lebih awal, hanya baris yang sudah dibaca yang dihitung)
+    :raises MissingDateColumnError: jika kolom 'Date' tidak ada
+    :raises DateConversionError: jika konversi tanggal gagal
+    """
+    read_kwargs = {'compression': 'gzip' if raw[:2] == GZIP_MAGIC else None}
+    if columns is not None:
+        wanted = set(columns) | {DATE_COLUMN}
+        read_kwargs['usecols'] = lambda column: column in wanted
+
+    start = pd.Timestamp(start) if start is not None else None
+    end = pd.Timestamp(end) if end is not None else None
+
+    try:
+        frame, invalid_count = _read_dated_rows(raw, read_kwargs, _column_dtypes(price_dtype), start, end)
+    except (MissingDateColumnError, DateConversionError):
+        raise
+    except (ValueError, TypeError):
+        # Ada nilai non-numerik di kolom harga, baca ulang dengan tipe data hasil inferensi
+        frame, invalid_count = _read_dated_rows(raw, read_kwargs, None, start, end)
+
+    frame.attrs['invalid_dates'] = invalid_count
+    return frame
+
+
+def read_price_file(source, cache=None, columns=None, price_dtype='float64', start=None, end=None):
+    """
+    Membaca file CSV harga, menggunakan cache Parquet jika tersedia
+
+    :param source: path file CSV atau buffer/bytes di memori (lihat read_source_bytes)
+    :param cache: PriceCache opsional; hasil parsing disimpan dan dibaca ulang berdasarkan hash isi file
+    :param columns: kolom yang dibaca selain Date (default: semua kolom)
+    :param price_dtype: tipe data kolom harga
+    :param start: batas bawah tanggal yang dibaca (opsional)
+    :param end: batas atas tanggal yang dibaca (opsional)
+    :return: DataFrame berindeks tanggal dan terurut (lihat parse_price_csv)
+    """
+    raw = read_source_bytes(source)
+
+    if cache is None:
+        return parse_price_csv(raw, columns, price_dtype, start, end)
+
+    # Pilihan kolom dan tipe data menjadi bagian dari kunci cache
+    options = repr((sorted(columns) if columns is not None else None, str(np.dtype(price_dtype))))
+    key = f"{content_hash(raw)}-{content_hash(options.encode('utf-8'))[:12]}"
+    frame = cache.get(key, start, end)
+    if frame is None:
+        # Cache menyimpan seluruh histori agar dapat dipakai untuk rentang tanggal lain
+        frame = parse_price_csv(raw, columns, price_dtype)
+        cache.put(key, frame)
+    return slice_dates(frame, start, end)
+
+
+def split_universe(frame):
+    """
+    Memecah DataFrame universe format panjang (Ticker,Date,OHLCV) menjadi DataFrame per ticker
+    dengan satu kali pengurutan stabil berdasarkan ticker (urutan tanggal tetap terjaga).
+
+    :param frame: DataFrame berindeks tanggal dan terurut, dengan kolom 'Ticker'
+    :return: list tuple (ticker, DataFrame), terurut berdasarkan nama ticker
+    """
+    codes, tickers = pd.factorize(frame[TICKER_COLUMN], sort=True)
+    valid = codes >= 0
+    if not valid.all():
+        frame = frame[valid]
+        codes = codes[valid]
+
+    order = np.argsort(codes, kind='stable')
+    grouped = frame.iloc[order]
+    bounds = np.concatenate(([0], np.cumsum(np.bincount(codes, minlength=len(tickers)))))
+
+    return [(tickers[i], grouped.iloc[bounds[i]:bounds[i + 1]]) for i in range(len(tickers))]
@@ -0,0 +1,141 @@
+# price_panel.py
+# Representasi panel harga (tanggal × ticker) untuk perhitungan RRG
+import pandas as pd
+import numpy as np
+
+
+class PricePanel:
+    """
+    Panel harga penutupan: satu matriks float tanggal × ticker yang sudah
+    diselaraskan satu kali ke kalender benchmark, beserta mask validitas.
+
+    - ``dates``: DatetimeIndex kalender benchmark (unik dan terurut)
+    - ``tickers``: list simbol, urutannya sama dengan kolom matriks
+    - ``close``: ndarray float64 (len(dates) × len(tickers)), NaN jika tidak ada data
+    - ``mask``: ndarray bool, True jika ticker memiliki baris data pada tanggal tersebut
+    - ``benchmark_close``: ndarray float64 harga penutupan benchmark per tanggal
+    - ``benchmark_mask``: ndarray bool, True jika tanggal termasuk kalender benchmark
+      (selalu True untuk panel dari from_frames; panel dari PriceStore memakai kalender
+      gabungan seluruh ticker)
+
+    ``close`` boleh berupa view dari array memory-mapped (lihat price_store.PriceStore).
+    """
+
+    def __init__(self, dates, tickers, close, mask, benchmark_close, benchmark_mask=None):
+        self.dates = dates
+        self.tickers = list(tickers)
+        self.close = close
+        self.mask = mask
+        self.benchmark_close = benchmark_close
+        if benchmark_mask is None:
+            benchmark_mask = np.ones(len(dates), dtype=bool)
+        self.benchmark_mask = benchmark_mask
+        self._ticker_pos = {ticker: i for i, ticker in enumerate(self.tickers)}
+
+    @classmethod
+    def from_frames(cls, benchmark_data, stock_data, symbols=None, field='Close'):
+        """
+        Membangun panel dari DataFrame benchmark dan dict DataFrame saham
+
+        :param benchmark_data: DataFrame benchmark dengan index tanggal
+        :param stock_data: dict {symbol: DataFrame} dengan index tanggal
+        :param symbols: urutan symbol yang dimasukkan ke panel (default: urutan dict)
+        :param field: kolom harga yang digunakan
+        :return: PricePanel
+        """
+        benchmark_data = benchmark_data[~benchmark_data.index.duplicated(keep='last')]
+        dates = benchmark_data.index
+        benchmark_close = benchmark_data[field].to_numpy(dtype=np.float64)
+
+        if symbols is None:
+            symbols = list(stock_data.keys())
+
+        tickers = []
+        columns = []
+        for symbol in symbols:
+            data = stock_data.get(symbol)
+            if data is None or field not in data.columns:
+                print(f"Kolom '{field}' tidak ditemukan untuk {symbol}")
+                continue
+            series = data[field]
+            if series.index.has_duplicates:
+                series = series[~series.index.duplicated(keep='last')]
+            tickers.append(symbol)
+            columns.append(series)
+
+        close = np.full((len(dates), len(tickers)), np.nan, dtype=np.float64)
+        mask = np.zeros((len(dates), len(tickers)), dtype=bool)
+
+        for j, series in enumerate(columns):
+            # Posisi setiap tanggal saham di kalender benchmark (-1 jika tidak ada)
+            positions = dates.get_indexer(series.index)
+            found = positions >= 0
+            rows = positions[found]
+            close[rows, j] = series.to_numpy(dtype=np.float64)[found]
+            mask[rows, j] = True
+
+        return cls(dates, tickers, close, mask, benchmark_close)
+
+    @property
+    def n_dates(self):
+        return len(self.dates)
+
+    @property
+    def n_tickers(self):
+        return len(self.tickers)
+
+    def ticker_position(self, ticker):
+        """
+        Mendapatkan posisi kolom untuk ticker (None jika tidak ada)
+        """
+        return self._ticker_pos.get(ticker)
+
+    @property
+    def benchmark_dates(self):
+        """
+        Tanggal kalender benchmark di panel
+        """
+        return self.dates[self.benchmark_mask]
+
+    def select(self, tickers):
+        """
+        Panel baru yang hanya berisi ticker tertentu (kalender dan benchmark tetap sama)
+
+        :param tickers: list symbol, urutan kolom panel baru (symbol yang tidak ada diabaikan)
+        :return: PricePanel
+        """
+        tickers = [ticker for ticker in tickers if ticker in self._ticker_pos]
+        columns = [self._ticker_pos[ticker] for ticker in tickers]
+        return PricePanel(self.dates, tickers, self.close[:, columns], self.mask[:, columns],
+                          self.benchmark_close, self.benchmark_mask)
+
+    def valid_counts(self):
+        """
+        Jumlah tanggal valid (ada di saham dan benchmark) per ticker
+        """
+        return self.mask.sum(axis=0)
+
+    def relative_price(self):
+        """
+        Harga relatif saham terhadap benchmark (x100) untuk seluruh panel.
+        Nilai di luar mask bernilai NaN.
+        """
+        with np.errstate(divide='ignore', invalid='ignore'):
+            relative = self.close / self.benchmark_close[:, None] * 100
+        relative[~self.mask] = np.nan
+        return relative
+
+    def to_series(self, matrix, ticker, index=None):
+        """
+        Mengubah satu kolom matriks panel menjadi Series bertanggal (tanpa nilai NaN)
+
+        :param matrix: ndarray (tanggal × ticker) dengan layout yang sama seperti panel
+        :param ticker: symbol ticker
+        :param index: index tanggal yang sudah diketahui untuk nilai non-NaN kolom ini (opsional)
+        :return: pd.Series
+        """
+        column = matrix[:, self._ticker_pos[ticker]]
+        valid = ~np.isnan(column)
+        if index is None:
+            index = self.dates[valid]
+        return pd.Series(column[valid], index=index, copy=False)
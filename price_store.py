@@ -0,0 +1,343 @@
+# price_store.py
+# Penyimpanan harga on-disk (memory-mapped) untuk seluruh histori bursa
+import json
+import os
+import shutil
+import time
+import numpy as np
+import pandas as pd
+from price_io import (read_price_file, source_name, source_label, split_universe, TICKER_COLUMN, VOLUME_COLUMN,
+                      MissingDateColumnError, DateConversionError)
+from price_panel import PricePanel
+
+# Naikkan versi ini jika format file store berubah
+STORE_VERSION = 1
+
+# Field yang disimpan, masing-masing satu array tanggal × ticker
+STORE_FIELDS = ('Close', VOLUME_COLUMN)
+
+# Array bool tanggal × ticker: True jika ticker memiliki baris data pada tanggal tersebut
+# (baris dengan harga NaN tetap dihitung sebagai observasi, sama seperti panel dari DataFrame)
+PRESENT_FILE = 'present.bin'
+
+STORE_DIRNAME = '.rrg_store'
+META_FILE = 'meta.json'
+TICKERS_FILE = 'tickers.json'
+DATES_FILE = 'dates.npy'
+
+# Percobaan membuka store jika store sedang diganti oleh proses lain tepat saat dibaca
+OPEN_RETRIES = 3
+OPEN_RETRY_DELAY = 0.05
+
+
+def default_store_path(source):
+    """
+    Lokasi default price store: direktori '.rrg_store' di samping file/direktori CSV
+
+    :param source: path file CSV atau direktori berisi file CSV
+    :return: path direktori store
+    """
+    source = os.fspath(source)
+    base_dir = source if os.path.isdir(source) else os.path.dirname(os.path.abspath(source))
+    return os.path.join(base_dir, STORE_DIRNAME)
+
+
+def _field_file(field):
+    return f"{field.lower()}.bin"
+
+
+class PriceStore:
+    """
+    Price store berbasis memory-map: satu array float kontigu per field (Close, Volume)
+    dengan layout tanggal × ticker, ditambah array keberadaan data, index ticker dan index tanggal.
+
+    Array dibuka dengan np.memmap (read-only), sehingga beberapa sesi Streamlit dan
+    batch job di host yang sama berbagi page cache sistem operasi yang sama dan
+    potongan rentang tanggal berupa view tanpa salinan.
+    """
+
+    def __init__(self, path, dates, symbols, names, first_rows, arrays, present, benchmark=None):
+        """
+        :param path: direktori store
+        :param dates: DatetimeIndex tanggal (terurut, unik)
+        :param symbols: list symbol, urutannya sama dengan kolom array
+        :param names: list nama ticker asli (kolom Ticker di CSV) per symbol
+        :param first_rows: list baris pertama yang memiliki data per symbol
+        :param arrays: dict {field: np.memmap (tanggal × ticker)}
+        :param present: np.memmap bool (tanggal × ticker), True jika ada baris data
+        :param benchmark: symbol benchmark default (opsional)
+        """
+        self.path = path
+        self.dates = dates
+        self.symbols = list(symbols)
+        self.names = list(names)
+        self.first_rows = list(first_rows)
+        self.arrays = arrays
+        self.present = present
+        self.benchmark = benchmark
+        self._symbol_pos = {symbol: i for i, symbol in enumerate(self.symbols)}
+
+    def __contains__(self, symbol):
+        return symbol in self._symbol_pos
+
+    @property
+    def shape(self):
+        return len(self.dates), len(self.symbols)
+
+    @classmethod
+    def build(cls, path, stock_files=None, benchmark_file=None, universe_file=None, price_cache=None,
+              dtype='float64'):
+        """
+        Membangun store dari file CSV harga dan menuliskannya ke disk.
+        Store ditulis ke direktori berversi ('<path>.v<waktu>') dan path berupa symlink ke direktori tersebut;
+        setelah store baru selesai ditulis, symlink diganti dengan satu os.replace sehingga pembaca selalu
+        melihat store lama atau store baru secara utuh. Jika symlink tidak didukung (misalnya Windows tanpa
+        hak membuat symlink), direktori diganti dengan dua rename dan PriceStore.open mencoba ulang.
+
+        :param path: direktori store (lihat default_store_path)
+        :param stock_files: list file CSV saham (symbol = nama file tanpa ekstensi)
+        :param benchmark_file: file CSV benchmark; disimpan sebagai kolom pertama
+        :param universe_file: file universe format panjang (Ticker,Date,OHLCV) opsional
+        :param price_cache: PriceCache opsional untuk parsing CSV
+        :param dtype: tipe data array ('float64' atau 'float32')
+        :return: PriceStore yang sudah dibuka dari disk
+        """
+        columns = (TICKER_COLUMN,) + STORE_FIELDS
+        frames = []
+        benchmark = None
+
+        sources = ([benchmark_file] if benchmark_file is not None else []) + list(stock_files or [])
+        for i, source in enumerate(sources):
+            try:
+                frame = read_price_file(source, price_cache, columns=columns)
+            except (MissingDateColumnError, DateConversionError) as e:
+                print(f"File {source_label(source)} dilewati: format tanggal tidak valid ({str(e)})")
+                continue
+            symbol = source_name(source, f"stock_{i + 1}")
+            if i == 0 and benchmark_file is not None:
+                benchmark = symbol
+            frames.append((symbol, frame))
+
+        if universe_file is not None:
+            universe = read_price_file(universe_file, price_cache, columns=columns)
+            frames.extend((str(ticker), frame) for ticker, frame in split_universe(universe))
+
+        # Symbol yang sama di beberapa sumber: sumber terakhir yang dipakai
+        frames = list({symbol: frame for symbol, frame in frames}.items())
+        dates = pd.DatetimeIndex(np.unique(np.concatenate([frame.index.to_numpy('datetime64[ns]')
+                                                           for _, frame in frames] or [[]])))
+        if dates.empty:
+            raise ValueError("Tidak ada data harga untuk membangun price store")
+        symbols = [symbol for symbol, _ in frames]
+        names = []
+        for symbol, frame in frames:
+            if TICKER_COLUMN in frame.columns and not frame.empty:
+                names.append(str(frame[TICKER_COLUMN].iloc[0]))
+            else:
+                names.append(symbol)
+
+        version_path = f"{path}.v{time.time_ns()}-{os.getpid()}"
+        os.makedirs(version_path)
+
+        shape = (len(dates), len(symbols))
+        present = np.memmap(os.path.join(version_path, PRESENT_FILE), dtype=bool, mode='w+', shape=shape)
+        first_rows = []
+        for j, (_, frame) in enumerate(frames):
+            rows = dates.get_indexer(frame.index)
+            present[rows, j] = True
+            first_rows.append(int(rows.min()) if len(rows) else len(dates))
+        present.flush()
+        del present
+
+        for field in STORE_FIELDS:
+            array = np.memmap(os.path.join(version_path, _field_file(field)), dtype=dtype, mode='w+', shape=shape)
+            array[:] = np.nan
+            for j, (_, frame) in enumerate(frames):
+                if field not in frame.columns:
+                    continue
+                series = frame[field]
+                if series.index.has_duplicates:
+                    series = series[~series.index.duplicated(keep='last')]
+                rows = dates.get_indexer(series.index)
+                array[rows, j] = series.to_numpy(dtype=dtype)
+            array.flush()
+            del array
+
+        np.save(os.path.join(version_path, DATES_FILE), dates.to_numpy('datetime64[ns]'))
+        with open(os.path.join(version_path, TICKERS_FILE), 'w') as f:
+            json.dump({'symbols': symbols, 'names': names, 'first_rows': first_rows}, f)
+        with open(os.path.join(version_path, META_FILE), 'w') as f:
+            json.dump({
+                'version': STORE_VERSION,
+                'fields': list(STORE_FIELDS),
+                'dtype': str(np.dtype(dtype)),
+                'shape': list(shape),
+                'benchmark': benchmark,
+            }, f)
+
+        cls._publish(path, version_path)
+        return cls.open(path)
+
+    @staticmethod
+    def _publish(path, version_path):
+        """
+        Mengganti store di path dengan direktori version_path; proses yang masih memetakan file lama
+        tetap dapat membacanya
+        """
+        old_path = None
+        if os.path.islink(path):
+            old_path = os.path.realpath(path)
+        elif os.path.exists(path):
+            # Store format lama (direktori biasa): dipindahkan sekali sebelum diganti symlink
+            old_path = f"{path}.old-{os.getpid()}"
+            os.replace(path, old_path)
+
+        link_path = f"{path}.link-{os.getpid()}"
+        try:
+            if os.path.lexists(link_path):
+                os.remove(link_path)
+            os.symlink(os.path.basename(version_path), link_path, target_is_directory=True)
+            os.replace(link_path, path)
+        except (OSError, NotImplementedError):
+            # Symlink tidak didukung: direktori berversi dipindahkan langsung ke path
+            if os.path.islink(path):
+                os.remove(path)
+            elif os.path.exists(path):
+                old_path = old_path or f"{path}.old-{os.getpid()}"
+                os.replace(path, old_path)
+            os.replace(version_path, path)
+
+        if old_path is not None and old_path != os.path.realpath(path):
+            shutil.rmtree(old_path, ignore_errors=True)
+
+    @classmethod
+    def open(cls, path):
+        """
+        Membuka store yang sudah ada (read-only, memory-mapped)
+
+        :param path: direktori store (atau symlink ke direktori berversi, lihat build)
+        :return: PriceStore
+        """
+        for attempt in range(OPEN_RETRIES):
+            try:
+                # Symlink di-resolve sekali agar semua file dibaca dari versi store yang sama
+                return cls._open(path, os.path.realpath(path))
+            except FileNotFoundError:
+                # Store sedang diganti proses lain; coba lagi dengan versi terbaru
+                if attempt == OPEN_RETRIES - 1:
+                    raise
+                time.sleep(OPEN_RETRY_DELAY)
+
+    @classmethod
+    def _open(cls, path, directory):
+        with open(os.path.join(directory, META_FILE)) as f:
+            meta = json.load(f)
+        if meta.get('version') != STORE_VERSION:
+            raise ValueError(f"Versi price store tidak didukung: {meta.get('version')}")
+
+        with open(os.path.join(directory, TICKERS_FILE)) as f:
+            tickers = json.load(f)
+
+        shape = tuple(meta['shape'])
+        dates = pd.DatetimeIndex(np.load(os.path.join(directory, DATES_FILE)))
+        arrays = {}
+        for field in meta['fields']:
+            arrays[field] = np.memmap(os.path.join(directory, _field_file(field)), dtype=meta['dtype'],
+                                      mode='r', shape=shape)
+
+        present = np.memmap(os.path.join(directory, PRESENT_FILE), dtype=bool, mode='r', shape=shape)
+
+        return cls(path, dates, tickers['symbols'], tickers['names'], tickers['first_rows'], arrays, present,
+                   meta.get('benchmark'))
+
+    def position(self, symbol):
+        """
+        Posisi kolom untuk symbol (None jika tidak ada)
+        """
+        return self._symbol_pos.get(symbol)
+
+    def name(self, symbol):
+        """
+        Nama ticker asli untuk symbol
+        """
+        return self.names[self._symbol_pos[symbol]]
+
+    def first_date(self, symbol):
+        """
+        Tanggal pertama yang memiliki data untuk symbol (None jika tidak ada)
+        """
+        row = self.first_rows[self._symbol_pos[symbol]]
+        return self.dates[row] if row < len(self.dates) else None
+
+    def row_range(self, start=None, end=None):
+        """
+        Rentang baris [lo, hi) untuk tanggal dalam [start, end] (pencarian biner)
+        """
+        lo = 0 if start is None else self.dates.searchsorted(pd.Timestamp(start), side='left')
+        hi = len(self.dates) if end is None else self.dates.searchsorted(pd.Timestamp(end), side='right')
+        return lo, hi
+
+    def window(self, field='Close', start=None, end=None):
+        """
+        View (tanpa salinan) satu field untuk rentang tanggal [start, end]
+
+        :return: tuple (DatetimeIndex tanggal, array tanggal × ticker)
+        """
+        lo, hi = self.row_range(start, end)
+        return self.dates[lo:hi], self.arrays[field][lo:hi]
+
+    def last_valid_date(self, symbol, end=None):
+        """
+        Tanggal terakhir (<= end) yang memiliki baris data untuk symbol, dicari mundur dari end
+        sehingga hanya baris terakhir yang dibaca dari disk
+        """
+        column = self.present[:, self._symbol_pos[symbol]]
+        _, hi = self.row_range(end=end)
+        while hi > 0 and not column[hi - 1]:
+            hi -= 1
+        return self.dates[hi - 1] if hi > 0 else None
+
+    def panel(self, benchmark, symbols=None, start=None, end=None, field='Close'):
+        """
+        Membuat PricePanel untuk rentang tanggal [start, end] langsung dari array store.
+        Jika symbol yang dipilih membentuk kolom yang berurutan (misalnya semua saham
+        selain benchmark di kolom pertama), matriks harga berupa view tanpa salinan.
+
+        :param benchmark: symbol benchmark
+        :param symbols: list symbol saham (default: semua selain benchmark)
+        :return: PricePanel dengan benchmark_mask menandai tanggal kalender benchmark
+        """
+        if symbols is None:
+            symbols = [symbol for symbol in self.symbols if symbol != benchmark]
+        positions = np.array([self._symbol_pos[symbol] for symbol in symbols], dtype=np.intp)
+
+        lo, hi = self.row_range(start, end)
+        if len(positions) and np.array_equal(positions, np.arange(positions[0], positions[0] + len(positions))):
+            columns = slice(positions[0], positions[0] + len(positions))
+        else:
+            columns = positions
+        close = self.arrays[field][lo:hi, columns]
+
+        benchmark_position = self._symbol_pos[benchmark]
+        benchmark_close = np.asarray(self.arrays[field][lo:hi, benchmark_position], dtype=np.float64)
+        benchmark_mask = np.array(self.present[lo:hi, benchmark_position])
+        mask = self.present[lo:hi, columns] & benchmark_mask[:, None]
+
+        return PricePanel(self.dates[lo:hi], symbols, close, mask, benchmark_close, benchmark_mask)
+
+
+if __name__ == "__main__":
+    import argparse
+    import glob
+
+    parser = argparse.ArgumentParser(description="Membangun price store dari direktori file CSV harga")
+    parser.add_argument('csv_dir', help="direktori berisi file CSV saham")
+    parser.add_argument('--benchmark', help="file CSV benchmark")
+    parser.add_argument('--universe', help="file universe format panjang (Ticker,Date,OHLCV)")
+    parser.add_argument('--output', help="direktori store (default: .rrg_store di direktori CSV)")
+    args = parser.parse_args()
+
+    files = sorted(path for path in glob.glob(os.path.join(args.csv_dir, '*.csv'))
+                   if not args.benchmark or os.path.abspath(path) != os.path.abspath(args.benchmark))
+    store = PriceStore.build(args.output or default_store_path(args.csv_dir), files, args.benchmark, args.universe)
+    print(f"Price store {store.path}: {store.shape[0]} tanggal × {store.shape[1]} ticker")
@@ -0,0 +1,66 @@
+# rate_limiter.py
+# Token bucket thread-safe untuk membatasi laju request ke API eksternal
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Token bucket: token bertambah `rate` per detik hingga `capacity`; setiap request memakai satu token.
+    Aman dipakai bersama oleh beberapa thread.
+    """
+
+    def __init__(self, rate, capacity=None, clock=time.monotonic, sleep=time.sleep):
+        """
+        :param rate: jumlah token per detik (None atau <= 0 = tanpa batas)
+        :param capacity: jumlah token maksimal / burst (default: max(1, rate))
+        :param clock: fungsi waktu monoton (dapat diganti untuk pengujian)
+        :param sleep: fungsi sleep (dapat diganti untuk pengujian)
+        """
+        self.rate = rate if rate and rate > 0 else None
+        self.capacity = capacity if capacity is not None else max(1.0, rate or 1.0)
+        self.clock = clock
+        self.sleep = sleep
+        self.tokens = float(self.capacity)
+        self.updated = clock()
+        self.waited = 0.0  # total detik menunggu token (untuk diagnosis)
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self, tokens=1):
+        """
+        Mengambil token tanpa menunggu
+
+        :return: True jika token tersedia
+        """
+        if self.rate is None:
+            return True
+        with self._lock:
+            self._refill(self.clock())
+            if self.tokens >= tokens:
+                self.tokens -= tokens
+                return True
+            return False
+
+    def acquire(self, tokens=1):
+        """
+        Mengambil token, menunggu sampai tersedia
+
+        :return: detik yang dihabiskan untuk menunggu
+        """
+        if self.rate is None:
+            return 0.0
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill(self.clock())
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    self.waited += waited
+                    return waited
+                delay = (tokens - self.tokens) / self.rate
+            self.sleep(delay)
+            waited += delay
@@ -5,24 +5,41 @@ import io
 import os
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
 from datetime import datetime
-from reportlab.lib.pagesizes import letter, landscape
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image, Table, TableStyle
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib import colors
-from reportlab.lib.units import inch
-import streamlit as st
+# reportlab, matplotlib, dan streamlit diimport di dalam fungsi agar import modul ini tetap ringan
 
 def create_and_download_report(data, analysis_type, use_fundamental=False, use_universe_score=False):
     """
-    Membuat laporan PDF berdasarkan hasil analisis
+    Membuat laporan PDF berdasarkan hasil analisis dan menampilkan tombol download Streamlit
     
     :param data: DataFrame hasil analisis
     :param analysis_type: Jenis analisis yang dilakukan
     :param use_fundamental: Boolean apakah analisis fundamental aktif
     :param use_universe_score: Boolean apakah Stock Universe Score digunakan
     """
+    import streamlit as st
+    
+    buffer, filename = build_pdf_report(data, analysis_type, use_fundamental, use_universe_score)
+    
+    # Download file
+    st.download_button(
+        label="📥 Download PDF Report",
+        data=buffer,
+        file_name=filename,
+        mime="application/pdf",
+        key="download_report"
+    )
+
+def build_pdf_report(data, analysis_type, use_fundamental=False, use_universe_score=False):
+    """
+    Membuat laporan PDF berdasarkan hasil analisis (tanpa Streamlit)
+    
+    :param data: DataFrame hasil analisis
+    :param analysis_type: Jenis analisis yang dilakukan
+    :param use_fundamental: Boolean apakah analisis fundamental aktif
+    :param use_universe_score: Boolean apakah Stock Universe Score digunakan
+    :return: Tuple (buffer BytesIO berisi PDF, nama file)
+    """
     from reportlab.lib.pagesizes import letter, landscape
     from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image, Table, TableStyle, PageBreak
     from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
@@ -535,11 +552,4 @@ def create_and_download_report(data, analysis_type, use_fundamental=False, use_u
     else:
         filename = f"{data['Symbol'].iloc[0]}_analysis_report_{datetime.now().strftime('%Y%m%d_%H%M')}.pdf"
     
-    # Download file
-    st.download_button(
-        label="📥 Download PDF Report",
-        data=buffer,
-        file_name=filename,
-        mime="application/pdf",
-        key="download_report"
-    )
\ No newline at end of file
+    return buffer, filename
@@ -1,9 +1,5 @@
 # report_html.py
-import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
-from matplotlib.patches import Wedge
-import matplotlib.patches as mpatches
 import io
 import base64
 import numpy as np
@@ -61,6 +57,7 @@ def create_html_report(data, analysis_type, use_fundamental=False, use_universe_
 
 def create_rrg_plot_base64(data):
     """Create RRG plot and convert to base64"""
+    import matplotlib.pyplot as plt
     # Create RRG plot
     plt.figure(figsize=(10, 7), facecolor='#f5f5f5')
     ax = plt.gca()
@@ -123,6 +120,7 @@ def create_rrg_plot_base64(data):
 
 def create_radar_chart_base64(data):
     """Create radar chart for comparison and convert to base64"""
+    import matplotlib.pyplot as plt
     # Skip if less than 2 stocks
     if len(data['Symbol'].unique()) < 2:
         return ""
@@ -192,6 +190,7 @@ def create_radar_chart_base64(data):
 
 def create_bar_chart_base64(data):
     """Create bar chart for key metrics and convert to base64"""
+    import matplotlib.pyplot as plt
     # Determine metrics to compare
     key_metrics = ['Universe_Score', 'Fundamental_Score', 'Combined_Score']
     
@@ -255,6 +254,8 @@ def create_bar_chart_base64(data):
 
 def create_gauge_charts_base64(data, use_fundamental, use_universe_score):
     """Create gauge charts for single stock metrics and convert to base64"""
+    import matplotlib.pyplot as plt
+    from matplotlib.patches import Wedge
     
     # Extract key metrics
     single_row = data.iloc[0]
@@ -0,0 +1,224 @@
+# result_cache.py
+# Cache hasil analisis (LRU di memori + opsional di disk) dengan kunci hash isi file dan parameter
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import threading
+from collections import OrderedDict
+from datetime import date, datetime
+import numpy as np
+import pandas as pd
+from price_cache import content_hash
+from price_io import read_source_bytes, source_name
+
+# Naikkan versi ini jika format hasil yang disimpan berubah
+RESULT_CACHE_VERSION = 1
+
+# Parameter yang tidak mempengaruhi hasil analisis
+IGNORED_PARAMS = ('use_price_cache', 'use_result_cache', 'load_workers', 'fundamental_workers', 'refresh_fundamental',
+                  'measure_memory')
+
+# Kunci hasil yang disimpan ke disk (objek lain hanya disimpan di memori)
+DISK_RESULT_KEYS = ('rrg_results', 'combined_results', 'analysis_date', 'analysis_type',
+                    'use_fundamental', 'use_universe_score')
+
+
+def _normalize_value(value):
+    """
+    Mengubah nilai parameter ke bentuk JSON yang stabil
+    """
+    if isinstance(value, (datetime, date, pd.Timestamp)):
+        return value.isoformat()
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, dict):
+        return {str(k): _normalize_value(v) for k, v in sorted(value.items(), key=lambda item: str(item[0]))}
+    if isinstance(value, (list, tuple)):
+        return [_normalize_value(v) for v in value]
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    return str(value)
+
+
+def normalize_params(analysis_params):
+    """
+    Normalisasi dict parameter analisis untuk kunci cache (urutan kunci stabil,
+    parameter yang tidak mempengaruhi hasil diabaikan)
+
+    :param analysis_params: dict parameter analisis
+    :return: string JSON
+    """
+    params = {key: value for key, value in (analysis_params or {}).items() if key not in IGNORED_PARAMS}
+    return json.dumps(_normalize_value(params), sort_keys=True)
+
+
+# Hash isi file path per (path, mtime, ukuran) agar file yang sama tidak dibaca dan di-hash ulang
+_path_hashes = {}
+
+
+def source_fingerprint(source):
+    """
+    Sidik sumber data: nama (menjadi symbol ticker) dan hash isi file
+    """
+    if source is None:
+        return None
+    if isinstance(source, (str, os.PathLike)):
+        stat = os.stat(source)
+        path_key = (os.path.abspath(source), stat.st_mtime_ns, stat.st_size)
+        digest = _path_hashes.get(path_key)
+        if digest is None:
+            digest = content_hash(read_source_bytes(source))
+            _path_hashes[path_key] = digest
+        return [source_name(source), digest]
+    return [source_name(source), content_hash(read_source_bytes(source))]
+
+
+def store_fingerprint(price_store):
+    """
+    Sidik price store: path dan waktu modifikasi metadata (berubah setiap kali store dibangun ulang)
+    """
+    path = getattr(price_store, 'path', price_store)
+    if path is None:
+        return None
+    meta_path = os.path.join(os.fspath(path), 'meta.json')
+    mtime = os.stat(meta_path).st_mtime_ns if os.path.exists(meta_path) else None
+    return [os.path.abspath(os.fspath(path)), mtime]
+
+
+def analysis_key(benchmark_file, stock_files, analysis_params, universe_file=None):
+    """
+    Kunci cache untuk satu permintaan analisis
+
+    :param benchmark_file: file benchmark (path, buffer, atau bytes)
+    :param stock_files: list file saham
+    :param analysis_params: dict parameter analisis
+    :param universe_file: file universe opsional
+    :return: string hex digest
+    """
+    analysis_params = analysis_params or {}
+    payload = {
+        'version': RESULT_CACHE_VERSION,
+        'benchmark': source_fingerprint(benchmark_file),
+        'stocks': [source_fingerprint(source) for source in (stock_files or [])],
+        'universe': source_fingerprint(universe_file),
+        'store': store_fingerprint(analysis_params.get('price_store')),
+        'params': normalize_params({key: value for key, value in analysis_params.items() if key != 'price_store'}),
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def _copy_result(result):
+    """
+    Salinan hasil agar DataFrame di cache tidak ikut berubah jika pemanggil memodifikasinya
+    """
+    return {key: value.copy() if isinstance(value, pd.DataFrame) else value for key, value in result.items()}
+
+
+class ResultCache:
+    """
+    Cache hasil analisis dua lapis: LRU terbatas di memori dan (opsional) file pickle di disk.
+    Aman dipakai bersama oleh beberapa sesi Streamlit dalam satu proses.
+    """
+
+    def __init__(self, max_entries=32, cache_dir=None):
+        """
+        :param max_entries: jumlah maksimal entri di memori
+        :param cache_dir: direktori cache disk (None = hanya memori)
+        """
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.v{RESULT_CACHE_VERSION}.pkl")
+
+    def _remember(self, key, result):
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, key):
+        """
+        Mengambil hasil dari cache
+
+        :param key: kunci dari analysis_key()
+        :return: dict hasil (salinan) atau None jika tidak ada
+        """
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return _copy_result(result)
+
+        if self.cache_dir:
+            path = self._path(key)
+            if os.path.exists(path):
+                try:
+                    with open(path, 'rb') as f:
+                        result = pickle.load(f)
+                except Exception as e:
+                    print(f"Gagal membaca cache hasil {path}: {str(e)}")
+                else:
+                    self._remember(key, result)
+                    with self._lock:
+                        self.hits += 1
+                        self.disk_hits += 1
+                    return _copy_result(result)
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key, result):
+        """
+        Menyimpan hasil ke cache memori dan (jika diaktifkan) ke disk
+
+        :param key: kunci dari analysis_key()
+        :param result: dict hasil analisis
+        """
+        self._remember(key, _copy_result(result))
+
+        if not self.cache_dir:
+            return
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    pickle.dump({key: value for key, value in result.items() if key in DISK_RESULT_KEYS}, f)
+                os.replace(temp_path, self._path(key))
+            finally:
+                if os.path.exists(temp_path):
+                    os.unlink(temp_path)
+        except Exception as e:
+            print(f"Gagal menyimpan cache hasil untuk {key}: {str(e)}")
+
+    def clear(self):
+        """
+        Mengosongkan cache memori (file di disk tidak dihapus)
+        """
+        with self._lock:
+            self._entries.clear()
+
+
+_default_result_cache = None
+
+
+def default_result_cache():
+    """
+    Instance ResultCache bersama untuk seluruh AnalysisEngine dalam satu proses
+    (direktori disk dapat diatur dengan environment variable RRG_RESULT_CACHE_DIR)
+    """
+    global _default_result_cache
+    if _default_result_cache is None:
+        _default_result_cache = ResultCache(cache_dir=os.environ.get('RRG_RESULT_CACHE_DIR') or None)
+    return _default_result_cache
@@ -1,35 +1,188 @@
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
 from datetime import datetime, timedelta
 import os
 import re
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from price_panel import PricePanel
+from price_store import PriceStore
+from price_io import (read_price_file, read_source_bytes, source_name, source_label, split_universe,
+                      slice_dates, parse_date_string, RRG_COLUMNS, MissingDateColumnError, DateConversionError)
+from rrg_kernels import compute_rs_ratio, compute_rs_momentum, RunningStats
+
+def _filter_stock_frame(stock_data, file_symbol, max_date, period_years, benchmark_start, benchmark_end, messages):
+    """
+    Mem-filter data satu saham berdasarkan max_date dan rentang tanggal benchmark
+    
+    :return: DataFrame hasil filter, atau None jika kosong
+    """
+    # Filter berdasarkan max_date
+    try:
+        # Pastikan tipe data max_date kompatibel dengan indeks
+        max_date_timestamp = pd.to_datetime(max_date)
+        # Index sudah terurut, jadi batas tanggal dicari dengan pencarian biner
+        stock_data = slice_dates(stock_data, end=max_date_timestamp)
+    except Exception as e:
+        messages.append(f"Error saat mem-filter data {file_symbol} berdasarkan max_date: {str(e)}")
+        # Jika error, jangan filter berdasarkan tanggal dan lanjutkan
+    
+    # Filter data berdasarkan periode tahun
+    if period_years > 0:
+        try:
+            # Gunakan periode yang sama dengan benchmark
+            common_data = slice_dates(stock_data, benchmark_start, benchmark_end)
+            
+            if not common_data.empty:
+                # Gunakan tanggal yang ada di rentang benchmark
+                stock_data = common_data
+            else:
+                # Jika tidak ada tanggal yang sama, filter dengan periode tahun
+                stock_end_date = stock_data.index.max()
+                stock_start_date = stock_end_date - pd.DateOffset(years=period_years)
+                stock_data = slice_dates(stock_data, start=stock_start_date)
+        except Exception as e:
+            messages.append(f"Error saat mem-filter data {file_symbol} berdasarkan periode: {str(e)}")
+            # Jika error, jangan filter berdasarkan periode dan lanjutkan
+    
+    if stock_data.empty:
+        messages.append(f"Data kosong untuk {file_symbol} setelah filtering")
+        return None
+    return stock_data
+
+
+def _load_stock_file(source, file_symbol, max_date, period_years, benchmark_start, benchmark_end, price_cache=None,
+                     read_options=None):
+    """
+    Memuat, parsing dan mem-filter satu file saham.
+    Dipakai oleh loop berurutan maupun worker pool, sehingga semua pesan dikumpulkan
+    dan dicetak oleh proses utama.
+    
+    :param source: path file CSV atau buffer/bytes di memori
+    :param file_symbol: symbol file (nama file tanpa ekstensi)
+    :param read_options: dict argumen tambahan untuk read_price_file (columns, price_dtype)
+    :return: dict dengan kunci file_symbol, ticker, data (DataFrame atau None), messages,
+             traceback, cache_hits, cache_misses
+    """
+    messages = []
+    result = {
+        'file_symbol': file_symbol,
+        'ticker': None,
+        'data': None,
+        'messages': messages,
+        'traceback': None,
+        'cache_hits': 0,
+        'cache_misses': 0,
+    }
+    cache_hits = price_cache.hits if price_cache is not None else 0
+    cache_misses = price_cache.misses if price_cache is not None else 0
+    
+    try:
+        # Load data (hasil parsing diambil dari cache jika isi file sama).
+        # Hanya rentang tanggal benchmark yang dibaca dari file
+        read_options = read_options or {}
+        if period_years > 0:
+            window = {'start': benchmark_start, 'end': benchmark_end}
+        else:
+            window = {'end': max_date}
+        try:
+            stock_data = read_price_file(source, price_cache, **window, **read_options)
+            if stock_data.empty:
+                # Tidak ada tanggal di rentang tersebut: baca ulang seluruh file agar ticker
+                # dan filter cadangan berdasarkan periode tahun tetap sama seperti biasa
+                stock_data = read_price_file(source, price_cache, **read_options)
+        except MissingDateColumnError:
+            messages.append(f"Kolom 'Date' tidak ditemukan di file {file_symbol}")
+            return result
+        except DateConversionError as e:
+            messages.append(f"Gagal mengkonversi format tanggal untuk {file_symbol}: {str(e)}")
+            return result
+        finally:
+            if price_cache is not None:
+                result['cache_hits'] = price_cache.hits - cache_hits
+                result['cache_misses'] = price_cache.misses - cache_misses
+        
+        invalid_count = stock_data.attrs.get('invalid_dates', 0)
+        if invalid_count:
+            messages.append(f"Menghapus {invalid_count} baris dengan tanggal tidak valid dari file {file_symbol}")
+        
+        # Dapatkan ticker dari file jika ada
+        if 'Ticker' in stock_data.columns:
+            # Gunakan ticker dari kolom Ticker file CSV
+            result['ticker'] = stock_data['Ticker'].iloc[0]
+        else:
+            # Gunakan nama file sebagai ticker
+            result['ticker'] = file_symbol
+        
+        result['data'] = _filter_stock_frame(stock_data, file_symbol, max_date, period_years,
+                                             benchmark_start, benchmark_end, messages)
+    
+    except Exception as e:
+        messages.append(f"Error saat memuat data untuk {source_label(source)}: {str(e)}")
+        import traceback
+        result['traceback'] = traceback.format_exc()
+    
+    return result
+
+def classify_quadrant(rs_ratio, rs_momentum):
+    """
+    Menentukan kuadran RRG dan rekomendasi dari nilai RS-Ratio dan RS-Momentum ternormalisasi
+    
+    :return: tuple (quadrant, recommendation)
+    """
+    if rs_ratio >= 100 and rs_momentum >= 100:
+        return "Leading", "Hold/Buy"
+    elif rs_ratio >= 100 and rs_momentum < 100:
+        return "Weakening", "Hold/Take Profit"
+    elif rs_ratio < 100 and rs_momentum < 100:
+        return "Lagging", "Sell/Cut Loss"
+    else:
+        return "Improving", "Accumulate/Buy Carefully"
 
 class RRGAnalyzer:
-    def __init__(self, benchmark_file=None, stock_files=None, period_years=3, max_date=None):
+    def __init__(self, benchmark_file=None, stock_files=None, period_years=3, max_date=None, price_cache=None,
+                 load_workers=None, load_executor='process', universe_file=None, price_dtype='float64',
+                 price_store=None, benchmark_symbol=None, progress_callback=None):
         """
         Inisialisasi analyzer RRG
-        :param benchmark_file: path file CSV benchmark
-        :param stock_files: list path file CSV saham
+        :param benchmark_file: path file CSV benchmark, atau buffer/bytes di memori
+                               (misalnya UploadedFile Streamlit atau tuple (nama, bytes))
+        :param stock_files: list path file CSV saham, atau buffer/bytes di memori
         :param period_years: periode tahun data yang akan diambil
         :param max_date: tanggal maksimal untuk analisis (datetime, string 'YYYY-MM-DD', atau string date)
+        :param price_cache: PriceCache opsional untuk menyimpan hasil parsing CSV berdasarkan hash isi file
+        :param load_workers: jumlah worker untuk memuat file saham secara paralel (None/1 = berurutan)
+        :param load_executor: jenis worker pool, 'process' atau 'thread'
+        :param universe_file: satu file format panjang (Ticker,Date,Open,High,Low,Close,Volume, boleh .gz)
+                              yang berisi seluruh universe saham; dapat digabung dengan stock_files
+        :param price_dtype: tipe data kolom harga saat membaca CSV ('float64' atau 'float32')
+        :param price_store: PriceStore atau path direktori store; jika diisi, panel dibaca langsung dari
+                            array memory-mapped tanpa membaca file CSV. stock_files (jika ada) memilih
+                            symbol berdasarkan nama file
+        :param benchmark_symbol: symbol benchmark di price store (default: benchmark store atau nama file benchmark)
+        :param progress_callback: fungsi (selesai, total) yang dipanggil setiap satu file saham selesai dimuat
         """
         self.benchmark_file = benchmark_file
         self.stock_files = stock_files if stock_files else []
         self.period_years = period_years
+        self.price_cache = price_cache
+        self.load_workers = load_workers
+        self.load_executor = load_executor
+        self.universe_file = universe_file
+        self.price_store = price_store
+        self.benchmark_symbol = benchmark_symbol
+        self.progress_callback = progress_callback
+        # Hanya kolom yang dibutuhkan RRG yang dibaca dari CSV
+        self.read_options = {'columns': RRG_COLUMNS, 'price_dtype': price_dtype}
         
         # Konversi max_date ke datetime jika string
         if isinstance(max_date, str):
             try:
-                # Coba dengan format YYYY-MM-DD
-                self.max_date = pd.to_datetime(max_date)
-            except:
-                try:
-                    # Jika gagal, coba format yang lain (seperti MM/DD/YYYY)
-                    self.max_date = pd.to_datetime(max_date, format='%m/%d/%Y')
-                except Exception as e:
-                    print(f"Format tanggal tidak valid: {max_date}. Error: {str(e)}. Menggunakan tanggal hari ini.")
-                    self.max_date = pd.to_datetime(datetime.now())
+                # Deteksi format (YYYY-MM-DD, MM/DD/YYYY, dst.) sama seperti kolom Date di file CSV
+                self.max_date = parse_date_string(max_date)
+            except Exception as e:
+                print(f"Format tanggal tidak valid: {max_date}. Error: {str(e)}. Menggunakan tanggal hari ini.")
+                self.max_date = pd.to_datetime(datetime.now())
         elif isinstance(max_date, datetime):
             # Konversi datetime ke pandas Timestamp
             self.max_date = pd.to_datetime(max_date)
@@ -45,58 +198,56 @@ class RRGAnalyzer:
         self.rs_ratio_norm = {}
         self.rs_momentum_norm = {}
         self.ticker_map = {}  # Untuk menyimpan mapping ticker asli dari file CSV
+        
+        # Panel harga (tanggal × ticker) dan matriks hasil perhitungan
+        self.panel = None
+        self.rs_ratio_matrix = None
+        self.rs_momentum_matrix = None
+        self.rs_ratio_norm_matrix = None
+        self.rs_momentum_norm_matrix = None
     
     def load_data_from_files(self):
         """
         Load data dari file CSV
         """
+        if self.price_store is not None:
+            return self._load_from_store()
+        
         if not self.benchmark_file:
             print("File benchmark tidak ditemukan")
             return False
         
         try:
-            # Load benchmark data
-            self.benchmark_data = pd.read_csv(self.benchmark_file)
-            
-            # Cek format tanggal dan konversi jika perlu
-            date_col = 'Date'
-            if date_col in self.benchmark_data.columns:
-                # Coba konversi tanggal
-                try:
-                    # Gunakan pd.to_datetime yang lebih fleksibel
-                    self.benchmark_data[date_col] = pd.to_datetime(self.benchmark_data[date_col], errors='coerce')
-                    
-                    # Hapus data dengan tanggal invalid
-                    invalid_dates = self.benchmark_data[date_col].isna()
-                    if invalid_dates.any():
-                        print(f"Menghapus {invalid_dates.sum()} baris dengan tanggal tidak valid dari benchmark data")
-                        self.benchmark_data = self.benchmark_data[~invalid_dates]
-                    
-                    # Set index dan sort
-                    self.benchmark_data.set_index(date_col, inplace=True)
-                    self.benchmark_data.sort_index(inplace=True)
-                except Exception as e:
-                    print(f"Gagal mengkonversi format tanggal benchmark: {str(e)}")
-                    return False
-            else:
+            # Load benchmark data (hasil parsing diambil dari cache jika isi file sama)
+            try:
+                # Hanya batas atas (max_date) yang diketahui sebelum membaca benchmark
+                self.benchmark_data = read_price_file(self.benchmark_file, self.price_cache, end=self.max_date,
+                                                      **self.read_options)
+            except MissingDateColumnError:
                 print("Kolom 'Date' tidak ditemukan di file benchmark")
                 return False
+            except DateConversionError as e:
+                print(f"Gagal mengkonversi format tanggal benchmark: {str(e)}")
+                return False
+            
+            invalid_count = self.benchmark_data.attrs.get('invalid_dates', 0)
+            if invalid_count:
+                print(f"Menghapus {invalid_count} baris dengan tanggal tidak valid dari benchmark data")
             
             # Ekstrak ticker dari data benchmark
-            if 'Ticker' in self.benchmark_data.columns:
+            if 'Ticker' in self.benchmark_data.columns and not self.benchmark_data.empty:
                 benchmark_ticker_value = self.benchmark_data['Ticker'].iloc[0]
                 self.benchmark_ticker = benchmark_ticker_value
             else:
                 # Jika tidak ada kolom Ticker, gunakan nama file sebagai ticker
-                benchmark_basename = os.path.splitext(os.path.basename(self.benchmark_file))[0]
+                benchmark_basename = source_name(self.benchmark_file, 'Benchmark')
                 self.benchmark_ticker = benchmark_basename
             
             # Filter berdasarkan max_date - pastikan menggunakan tipe data yang sama
             try:
                 # Pastikan tipe data max_date kompatibel dengan indeks
                 max_date_timestamp = pd.to_datetime(self.max_date)
-                # Gunakan operator .loc untuk menghindari kesalahan tipe data
-                self.benchmark_data = self.benchmark_data.loc[self.benchmark_data.index <= max_date_timestamp]
+                self.benchmark_data = slice_dates(self.benchmark_data, end=max_date_timestamp)
             except Exception as e:
                 print(f"Error saat mem-filter data berdasarkan max_date: {str(e)}")
                 # Jika error, jangan filter berdasarkan tanggal dan lanjutkan
@@ -110,7 +261,7 @@ class RRGAnalyzer:
                 try:
                     end_date = self.benchmark_data.index.max()
                     start_date = end_date - pd.DateOffset(years=self.period_years)
-                    self.benchmark_data = self.benchmark_data.loc[self.benchmark_data.index >= start_date]
+                    self.benchmark_data = slice_dates(self.benchmark_data, start=start_date)
                 except Exception as e:
                     print(f"Error saat mem-filter data berdasarkan periode tahun: {str(e)}")
                     # Jika error, jangan filter berdasarkan periode dan lanjutkan
@@ -120,92 +271,40 @@ class RRGAnalyzer:
             self.stock_symbols = []  # Reset daftar symbol
             self.ticker_map = {}  # Reset ticker map
             
-            for file_path in self.stock_files:
-                try:
-                    # Extract symbol dari nama file
-                    file_symbol = os.path.splitext(os.path.basename(file_path))[0]
-                    
-                    # Load data
-                    stock_data = pd.read_csv(file_path)
-                    
-                    # Cek dan konversi format tanggal jika perlu
-                    if date_col in stock_data.columns:
-                        try:
-                            # Gunakan pd.to_datetime yang lebih fleksibel
-                            stock_data[date_col] = pd.to_datetime(stock_data[date_col], errors='coerce')
-                            
-                            # Hapus data dengan tanggal invalid
-                            invalid_dates = stock_data[date_col].isna()
-                            if invalid_dates.any():
-                                print(f"Menghapus {invalid_dates.sum()} baris dengan tanggal tidak valid dari file {file_symbol}")
-                                stock_data = stock_data[~invalid_dates]
-                            
-                            # Set index dan sort
-                            stock_data.set_index(date_col, inplace=True)
-                            stock_data.sort_index(inplace=True)
-                        except Exception as e:
-                            print(f"Gagal mengkonversi format tanggal untuk {file_symbol}: {str(e)}")
-                            continue
-                    else:
-                        print(f"Kolom 'Date' tidak ditemukan di file {file_symbol}")
-                        continue
-                    
-                    # Dapatkan ticker dari file jika ada
-                    if 'Ticker' in stock_data.columns:
-                        # Gunakan ticker dari kolom Ticker file CSV
-                        ticker_from_csv = stock_data['Ticker'].iloc[0]
-                        symbol = ticker_from_csv
-                        # Simpan mapping untuk referensi
-                        self.ticker_map[file_symbol] = ticker_from_csv
-                    else:
-                        # Gunakan nama file sebagai ticker
-                        symbol = file_symbol
-                        self.ticker_map[file_symbol] = file_symbol
-                    
-                    # Filter berdasarkan max_date
-                    try:
-                        # Pastikan tipe data max_date kompatibel dengan indeks
-                        max_date_timestamp = pd.to_datetime(self.max_date)
-                        # Gunakan operator .loc untuk menghindari kesalahan tipe data
-                        stock_data = stock_data.loc[stock_data.index <= max_date_timestamp]
-                    except Exception as e:
-                        print(f"Error saat mem-filter data {file_symbol} berdasarkan max_date: {str(e)}")
-                        # Jika error, jangan filter berdasarkan tanggal dan lanjutkan
-                    
-                    # Filter data berdasarkan periode tahun
-                    if self.period_years > 0 and not self.benchmark_data.empty:
-                        try:
-                            # Gunakan periode yang sama dengan benchmark
-                            start_date = self.benchmark_data.index.min()
-                            end_date = self.benchmark_data.index.max()
-                            
-                            # Cari rentang tanggal yang ada di kedua dataset
-                            common_dates = stock_data.index.intersection(pd.date_range(start=start_date, end=end_date))
-                            
-                            if len(common_dates) > 0:
-                                # Gunakan tanggal pertama dan terakhir yang umum
-                                stock_data = stock_data.loc[common_dates.min():common_dates.max()]
-                            else:
-                                # Jika tidak ada tanggal yang sama, filter dengan periode tahun
-                                stock_end_date = stock_data.index.max()
-                                stock_start_date = stock_end_date - pd.DateOffset(years=self.period_years)
-                                stock_data = stock_data.loc[stock_data.index >= stock_start_date]
-                        except Exception as e:
-                            print(f"Error saat mem-filter data {file_symbol} berdasarkan periode: {str(e)}")
-                            # Jika error, jangan filter berdasarkan periode dan lanjutkan
-                    
-                    # Simpan data dan tambahkan symbol
-                    if not stock_data.empty:
-                        self.stock_data[file_symbol] = stock_data
-                        self.stock_symbols.append(file_symbol)
-                        load_success = True
-                    else:
-                        print(f"Data kosong untuk {file_symbol} setelah filtering")
+            benchmark_start = self.benchmark_data.index.min()
+            benchmark_end = self.benchmark_data.index.max()
+            
+            total_files = len(self.stock_files)
+            for done, result in enumerate(self._iter_stock_files(benchmark_start, benchmark_end), start=1):
+                if self.progress_callback is not None:
+                    self.progress_callback(done, total_files)
                 
-                except Exception as e:
-                    print(f"Error saat memuat data untuk {file_path}: {str(e)}")
-                    import traceback
-                    traceback.print_exc()
+                # Cetak pesan per file dengan urutan yang sama seperti file input
+                for message in result['messages']:
+                    print(message)
+                if result['traceback']:
+                    sys.stderr.write(result['traceback'])
+                
+                file_symbol = result['file_symbol']
+                if result['ticker'] is not None:
+                    # Simpan mapping untuk referensi
+                    self.ticker_map[file_symbol] = result['ticker']
+                
+                # Simpan data dan tambahkan symbol
+                if result['data'] is not None:
+                    self.stock_data[file_symbol] = result['data']
+                    self.stock_symbols.append(file_symbol)
+                    load_success = True
+            
+            # Load universe format panjang (satu file berisi banyak ticker)
+            if self.universe_file is not None:
+                if self._load_universe_file(benchmark_start, benchmark_end):
+                    load_success = True
+            
+            # Selaraskan seluruh saham ke kalender benchmark satu kali
+            self.panel = None
+            if load_success:
+                self.build_panel()
             
             return load_success
         
@@ -215,6 +314,153 @@ class RRGAnalyzer:
             traceback.print_exc()
             return False
     
+    def _iter_stock_files(self, benchmark_start, benchmark_end):
+        """
+        Memuat semua file saham, secara berurutan atau paralel dengan worker pool.
+        Hasil selalu dikembalikan sesuai urutan self.stock_files.
+        """
+        load_args = (self.max_date, self.period_years, benchmark_start, benchmark_end, self.price_cache,
+                     self.read_options)
+        sources = list(self.stock_files)
+        # Symbol diambil dari nama file; buffer tanpa nama diberi nomor urut
+        symbols = [source_name(source, f"stock_{i + 1}") for i, source in enumerate(sources)]
+        workers = self.load_workers or 1
+        
+        if workers <= 1 or len(sources) <= 1:
+            for source, file_symbol in zip(sources, symbols):
+                yield _load_stock_file(source, file_symbol, *load_args)
+            return
+        
+        if self.load_executor == 'thread':
+            executor_class = ThreadPoolExecutor
+        else:
+            executor_class = ProcessPoolExecutor
+            # Buffer di memori dikirim ke worker proses sebagai tuple (nama, bytes)
+            sources = [
+                source if isinstance(source, (str, os.PathLike)) else (source_label(source), read_source_bytes(source))
+                for source in sources
+            ]
+        
+        chunksize = max(1, len(sources) // (workers * 4))
+        with executor_class(max_workers=workers) as executor:
+            arg_lists = [[arg] * len(sources) for arg in load_args]
+            kwargs = {'chunksize': chunksize} if executor_class is ProcessPoolExecutor else {}
+            for result in executor.map(_load_stock_file, sources, symbols, *arg_lists, **kwargs):
+                # Worker proses memakai salinan cache, jadi statistiknya digabung di sini
+                if self.price_cache is not None and executor_class is ProcessPoolExecutor:
+                    self.price_cache.hits += result['cache_hits']
+                    self.price_cache.misses += result['cache_misses']
+                yield result
+    
+    def _load_universe_file(self, benchmark_start, benchmark_end):
+        """
+        Memuat file universe format panjang dan memecahnya per ticker dengan satu kali pengurutan
+        :return: True jika ada ticker yang berhasil dimuat
+        """
+        universe_name = source_name(self.universe_file, 'universe')
+        try:
+            # Rentang per ticker dipotong di _filter_stock_frame, sehingga filter cadangan
+            # periode tahun tetap berlaku untuk ticker tanpa tanggal yang sama dengan benchmark
+            universe_data = read_price_file(self.universe_file, self.price_cache, end=self.max_date,
+                                            **self.read_options)
+        except MissingDateColumnError:
+            print(f"Kolom 'Date' tidak ditemukan di file {universe_name}")
+            return False
+        except DateConversionError as e:
+            print(f"Gagal mengkonversi format tanggal untuk {universe_name}: {str(e)}")
+            return False
+        
+        if 'Ticker' not in universe_data.columns:
+            print(f"Kolom 'Ticker' tidak ditemukan di file {universe_name}")
+            return False
+        
+        invalid_count = universe_data.attrs.get('invalid_dates', 0)
+        if invalid_count:
+            print(f"Menghapus {invalid_count} baris dengan tanggal tidak valid dari file {universe_name}")
+        
+        load_success = False
+        messages = []
+        for ticker, stock_data in split_universe(universe_data):
+            symbol = str(ticker)
+            self.ticker_map[symbol] = symbol
+            
+            stock_data = _filter_stock_frame(stock_data, symbol, self.max_date, self.period_years,
+                                             benchmark_start, benchmark_end, messages)
+            if stock_data is not None:
+                self.stock_data[symbol] = stock_data
+                self.stock_symbols.append(symbol)
+                load_success = True
+        
+        for message in messages:
+            print(message)
+        
+        return load_success
+    
+    def _load_from_store(self):
+        """
+        Memuat panel harga langsung dari PriceStore untuk rentang tanggal analisis.
+        Matriks harga panel berupa view dari array memory-mapped (tanpa salinan DataFrame).
+        """
+        try:
+            store = self.price_store
+            if not isinstance(store, PriceStore):
+                store = PriceStore.open(store)
+        except Exception as e:
+            print(f"Gagal membuka price store {self.price_store}: {str(e)}")
+            return False
+        
+        benchmark = self.benchmark_symbol or store.benchmark
+        if benchmark is None and self.benchmark_file:
+            benchmark = source_name(self.benchmark_file)
+        if benchmark not in store:
+            print(f"Benchmark {benchmark} tidak ditemukan di price store")
+            return False
+        self.benchmark_ticker = store.name(benchmark)
+        
+        # Rentang kalender benchmark: tanggal terakhir <= max_date lalu mundur sesuai periode tahun
+        end_date = store.last_valid_date(benchmark, end=self.max_date)
+        if end_date is None:
+            print("Data benchmark kosong setelah filter tanggal")
+            return False
+        start_date = end_date - pd.DateOffset(years=self.period_years) if self.period_years > 0 else None
+        
+        if self.stock_files:
+            symbols = []
+            for i, source in enumerate(self.stock_files):
+                symbol = source_name(source, f"stock_{i + 1}")
+                if symbol in store:
+                    symbols.append(symbol)
+                else:
+                    print(f"Symbol {symbol} tidak ditemukan di price store")
+        else:
+            symbols = [symbol for symbol in store.symbols if symbol != benchmark]
+        
+        # Ticker tanpa data sampai max_date tidak dimasukkan ke panel
+        available = []
+        for symbol in symbols:
+            first_date = store.first_date(symbol)
+            if first_date is None or first_date > self.max_date:
+                print(f"Data kosong untuk {symbol} setelah filtering")
+            else:
+                available.append(symbol)
+        symbols = available
+        
+        self.panel = store.panel(benchmark, symbols, start_date, end_date)
+        self.stock_data = {}
+        self.stock_symbols = list(self.panel.tickers)
+        self.ticker_map = {symbol: store.name(symbol) for symbol in self.stock_symbols}
+        self.benchmark_data = pd.DataFrame({'Close': self.panel.benchmark_close[self.panel.benchmark_mask]},
+                                           index=self.panel.benchmark_dates)
+        
+        return len(self.stock_symbols) > 0
+    
+    def build_panel(self):
+        """
+        Membangun panel harga Close (tanggal × ticker) yang diselaraskan ke kalender benchmark
+        """
+        self.panel = PricePanel.from_frames(self.benchmark_data, self.stock_data, self.stock_symbols)
+        return self.panel
+    
     def calculate_rs_ratio(self, period=63):
         """
         Menghitung Relative Strength Ratio (RS-Ratio)
@@ -222,28 +468,21 @@ class RRGAnalyzer:
         """
         self.rs_ratio = {}  # Reset untuk menghindari data lama
         
-        for ticker in self.stock_symbols:
-            data = self.stock_data.get(ticker)
-            if data is None or len(data) == 0:
-                continue
-            
-            # Pastikan data memiliki index yang sama
-            common_index = data.index.intersection(self.benchmark_data.index)
-            if len(common_index) < period:
-                print(f"Data tidak cukup untuk {ticker}, minimal {period} hari diperlukan. Hanya tersedia {len(common_index)} hari.")
+        if self.panel is None:
+            self.build_panel()
+        panel = self.panel
+        
+        # Menghitung Relative Strength Ratio dan rata-rata bergerak untuk seluruh panel sekaligus
+        self.rs_ratio_matrix, eligible = compute_rs_ratio(panel, period)
+        valid_counts = panel.valid_counts()
+        
+        for j, ticker in enumerate(panel.tickers):
+            if not eligible[j]:
+                print(f"Data tidak cukup untuk {ticker}, minimal {period} hari diperlukan. Hanya tersedia {valid_counts[j]} hari.")
                 continue
-                
-            stock_aligned = data.loc[common_index]
-            benchmark_aligned = self.benchmark_data.loc[common_index]
-            
-            # Menghitung Relative Strength Ratio
-            relative_price = (stock_aligned['Close'] / benchmark_aligned['Close']) * 100
-            
-            # Menghitung rata-rata bergerak
-            rs_ratio = relative_price.rolling(window=period, min_periods=1).mean()
             
             # Pastikan tidak ada NaN
-            rs_ratio = rs_ratio.dropna()
+            rs_ratio = panel.to_series(self.rs_ratio_matrix, ticker)
             
             if len(rs_ratio) > 0:
                 self.rs_ratio[ticker] = rs_ratio
@@ -255,17 +494,21 @@ class RRGAnalyzer:
         """
         self.rs_momentum = {}  # Reset untuk menghindari data lama
         
+        panel = self.panel
+        candidates = np.zeros(panel.n_tickers, dtype=bool)
+        for ticker in self.rs_ratio:
+            candidates[panel.ticker_position(ticker)] = True
+        
+        # Perubahan persentase terhadap nilai RS-Ratio `period` observasi sebelumnya
+        self.rs_momentum_matrix, eligible = compute_rs_momentum(self.rs_ratio_matrix, period, candidates)
+        
         for ticker in list(self.rs_ratio.keys()):
-            rs_ratio_series = self.rs_ratio[ticker]
-            
-            if len(rs_ratio_series) <= period:
+            if not eligible[panel.ticker_position(ticker)]:
                 print(f"Data tidak cukup untuk menghitung momentum {ticker}")
                 continue
             
-            # Hitung pct_change dengan fill_method=None untuk menghindari warning
-            # Dan pastikan tidak ada NaN
-            rs_momentum = rs_ratio_series.pct_change(periods=period, fill_method=None) * 100
-            rs_momentum = rs_momentum.dropna()
+            # Pastikan tidak ada NaN
+            rs_momentum = panel.to_series(self.rs_momentum_matrix, ticker)
             
             if len(rs_momentum) > 0:
                 self.rs_momentum[ticker] = rs_momentum
@@ -278,51 +521,46 @@ class RRGAnalyzer:
         self.rs_ratio_norm = {}
         self.rs_momentum_norm = {}
         
-        # Mengumpulkan semua nilai RS-Ratio dan RS-Momentum yang valid
-        all_rs_ratio = []
-        all_rs_momentum = []
-        valid_tickers = []
-        
-        for ticker in list(self.rs_ratio.keys()):
-            if ticker in self.rs_momentum:
-                rs_ratio_values = self.rs_ratio[ticker].dropna().values
-                rs_momentum_values = self.rs_momentum[ticker].dropna().values
-                
-                if len(rs_ratio_values) > 0 and len(rs_momentum_values) > 0:
-                    all_rs_ratio.extend(rs_ratio_values)
-                    all_rs_momentum.extend(rs_momentum_values)
-                    valid_tickers.append(ticker)
+        # Ticker valid adalah yang memiliki RS-Ratio dan RS-Momentum
+        valid_tickers = [ticker for ticker in self.rs_ratio if ticker in self.rs_momentum]
         
         if not valid_tickers:
             print("Tidak ada ticker valid dengan data lengkap")
             return False
         
-        if len(all_rs_ratio) < 2 or len(all_rs_momentum) < 2:
+        panel = self.panel
+        columns = np.zeros(panel.n_tickers, dtype=bool)
+        for ticker in valid_tickers:
+            columns[panel.ticker_position(ticker)] = True
+        
+        # Gabungkan statistik per ticker (count/mean/M2) tanpa mengumpulkan semua nilai
+        rs_ratio_stats = RunningStats.from_columns(self.rs_ratio_matrix, columns)
+        rs_momentum_stats = RunningStats.from_columns(self.rs_momentum_matrix, columns)
+        
+        if rs_ratio_stats.count < 2 or rs_momentum_stats.count < 2:
             print("Tidak cukup data untuk normalisasi")
             return False
         
         # Menghitung mean dan standard deviation
-        rs_ratio_mean = np.mean(all_rs_ratio)
-        rs_ratio_std = np.std(all_rs_ratio)
-        rs_momentum_mean = np.mean(all_rs_momentum)
-        rs_momentum_std = np.std(all_rs_momentum)
+        rs_ratio_mean = rs_ratio_stats.mean
+        rs_ratio_std = rs_ratio_stats.std
+        rs_momentum_mean = rs_momentum_stats.mean
+        rs_momentum_std = rs_momentum_stats.std
         
         # Cek standard deviasi tidak nol
         if rs_ratio_std <= 0.0001 or rs_momentum_std <= 0.0001:
             print("Standard deviasi terlalu kecil, tidak dapat melakukan normalisasi")
             return False
         
-        # Normalisasi dengan Z-score dan pindahkan mean ke 100
+        # Normalisasi dengan Z-score dan pindahkan mean ke 100 (mean 100, std 10)
+        self.rs_ratio_norm_matrix = 100 + 10 * ((self.rs_ratio_matrix - rs_ratio_mean) / rs_ratio_std)
+        self.rs_momentum_norm_matrix = 100 + 10 * ((self.rs_momentum_matrix - rs_momentum_mean) / rs_momentum_std)
+        self.rs_ratio_norm_matrix[:, ~columns] = np.nan
+        self.rs_momentum_norm_matrix[:, ~columns] = np.nan
+        
         for ticker in valid_tickers:
-            # Pastikan data yang akan dinormalisasi tidak ada NaN
-            ratio_series = self.rs_ratio[ticker].dropna()
-            momentum_series = self.rs_momentum[ticker].dropna()
-            
-            # Hanya lakukan normalisasi jika keduanya memiliki data
-            if len(ratio_series) > 0 and len(momentum_series) > 0:
-                # Normalisasi dan atur ke mean 100, std 10
-                self.rs_ratio_norm[ticker] = 100 + 10 * ((ratio_series - rs_ratio_mean) / rs_ratio_std)
-                self.rs_momentum_norm[ticker] = 100 + 10 * ((momentum_series - rs_momentum_mean) / rs_momentum_std)
+            self.rs_ratio_norm[ticker] = panel.to_series(self.rs_ratio_norm_matrix, ticker, self.rs_ratio[ticker].index)
+            self.rs_momentum_norm[ticker] = panel.to_series(self.rs_momentum_norm_matrix, ticker, self.rs_momentum[ticker].index)
         
         # Verifikasi hasil normalisasi
         if not self.rs_ratio_norm:
@@ -349,18 +587,7 @@ class RRGAnalyzer:
                 rs_momentum = self.rs_momentum_norm[ticker].iloc[-1]
                 
                 # Tentukan kuadran
-                if rs_ratio >= 100 and rs_momentum >= 100:
-                    quadrant = "Leading"
-                    recommendation = "Hold/Buy"
-                elif rs_ratio >= 100 and rs_momentum < 100:
-                    quadrant = "Weakening"
-                    recommendation = "Hold/Take Profit"
-                elif rs_ratio < 100 and rs_momentum < 100:
-                    quadrant = "Lagging"
-                    recommendation = "Sell/Cut Loss"
-                else:
-                    quadrant = "Improving"
-                    recommendation = "Accumulate/Buy Carefully"
+                quadrant, recommendation = classify_quadrant(rs_ratio, rs_momentum)
                 
                 # Gunakan ticker yang sebenarnya dari data CSV jika tersedia
                 display_name = self.ticker_map.get(ticker, ticker)
@@ -381,6 +608,9 @@ class RRGAnalyzer:
         :param title: judul grafik
         :param trail_length: panjang trail (berapa periode sebelumnya yang ditampilkan)
         """
+        # Diimport di sini agar analisis tanpa grafik (CLI, service) tidak memuat matplotlib
+        import matplotlib.pyplot as plt
+        
         fig, ax = plt.subplots(figsize=(10, 8))
         
         # Gambar garis sumbu
@@ -460,7 +690,7 @@ class RRGAnalyzer:
         if hasattr(self, 'benchmark_ticker') and self.benchmark_ticker:
             benchmark_display = self.benchmark_ticker
         elif self.benchmark_file:
-            benchmark_display = os.path.splitext(os.path.basename(self.benchmark_file))[0]
+            benchmark_display = source_name(self.benchmark_file, 'Benchmark')
         else:
             benchmark_display = "Benchmark"
         
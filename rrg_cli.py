@@ -0,0 +1,199 @@
+# rrg_cli.py
+# Runner batch RRG dari command line (tanpa Streamlit dan matplotlib), misalnya untuk cron
+import argparse
+import contextlib
+import glob
+import io
+import json
+import os
+import sys
+
+OUTPUT_FORMATS = ('.csv', '.parquet', '.json')
+
+
+def parse_value(text):
+    """
+    Mengubah teks nilai parameter menjadi bool/int/float/None jika memungkinkan
+    """
+    lowered = text.strip().lower()
+    if lowered in ('true', 'false'):
+        return lowered == 'true'
+    if lowered in ('none', 'null', ''):
+        return None
+    for convert in (int, float):
+        try:
+            return convert(text)
+        except ValueError:
+            pass
+    return text
+
+
+def parse_param_set(text):
+    """
+    Parse satu set parameter 'key=value,key=value'
+
+    :param text: string set parameter
+    :return: dict parameter
+    """
+    params = {}
+    for item in text.split(','):
+        if not item.strip():
+            continue
+        if '=' not in item:
+            raise ValueError(f"Parameter '{item}' harus berbentuk key=value")
+        key, value = item.split('=', 1)
+        params[key.strip()] = parse_value(value)
+    return params
+
+
+def load_param_sets(path):
+    """
+    Membaca list set parameter dari file JSON (list of dict)
+    """
+    with open(path, encoding='utf-8') as f:
+        param_sets = json.load(f)
+    if isinstance(param_sets, dict):
+        param_sets = [param_sets]
+    return param_sets
+
+
+def collect_stock_files(inputs, benchmark_file=None):
+    """
+    Mengumpulkan file CSV saham dari direktori, pola glob, atau path file
+
+    :param inputs: list direktori/glob/path
+    :param benchmark_file: path benchmark yang dikecualikan dari daftar saham
+    :return: list path terurut tanpa duplikat
+    """
+    benchmark_path = os.path.abspath(benchmark_file) if benchmark_file else None
+    files = []
+    for item in inputs:
+        if os.path.isdir(item):
+            matches = glob.glob(os.path.join(item, '*.csv'))
+        else:
+            matches = glob.glob(item) or [item]
+        files.extend(matches)
+    return sorted(path for path in set(files) if os.path.abspath(path) != benchmark_path)
+
+
+def write_output(frame, path):
+    """
+    Menulis hasil ke CSV/Parquet/JSON sesuai ekstensi path (tanpa path: CSV ke stdout)
+    """
+    if not path:
+        frame.to_csv(sys.stdout, index=False)
+        return
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in OUTPUT_FORMATS:
+        raise ValueError(f"Format output {extension} tidak didukung (gunakan {', '.join(OUTPUT_FORMATS)})")
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    if extension == '.parquet':
+        frame.to_parquet(path, index=False)
+    elif extension == '.json':
+        frame.to_json(path, orient='records', date_format='iso', indent=2)
+    else:
+        frame.to_csv(path, index=False)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="Menjalankan analisis RRG secara batch untuk satu atau beberapa set parameter")
+    parser.add_argument('inputs', nargs='*', help="direktori, pola glob, atau file CSV saham")
+    parser.add_argument('--benchmark', '-b', help="file CSV benchmark (wajib kecuali memakai --store)")
+    parser.add_argument('--universe', help="file universe format panjang (Ticker,Date,OHLCV, boleh .gz)")
+    parser.add_argument('--store', help="direktori price store (lihat price_store.py)")
+    parser.add_argument('--benchmark-symbol', help="symbol benchmark di price store")
+    parser.add_argument('--output', '-o', help="file output .csv, .parquet, atau .json (default: CSV ke stdout)")
+    parser.add_argument('--period-years', type=float, default=3.0)
+    parser.add_argument('--rs-ratio-period', type=int, default=52)
+    parser.add_argument('--rs-momentum-period', type=int, default=26)
+    parser.add_argument('--max-date', help="tanggal maksimal analisis (YYYY-MM-DD)")
+    parser.add_argument('--set', dest='param_sets', action='append', default=[], metavar='KEY=VALUE,...',
+                        help="satu set parameter yang menimpa nilai default; boleh diulang")
+    parser.add_argument('--params-file', help="file JSON berisi list set parameter")
+    parser.add_argument('--fundamental-provider', metavar='SPEC',
+                        help="sumber data fundamental: yfinance, file snapshot .csv/.json, atau URL http(s)://")
+    parser.add_argument('--workers', type=int, help="jumlah worker untuk memuat file saham")
+    parser.add_argument('--cache-dir', help="direktori cache Parquet hasil parsing CSV")
+    parser.add_argument('--no-cache', action='store_true', help="nonaktifkan cache harga dan cache hasil")
+    parser.add_argument('--quiet', '-q', action='store_true', help="sembunyikan pesan per ticker")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if not args.benchmark and not args.store:
+        print("Error: --benchmark wajib diisi jika tidak memakai --store", file=sys.stderr)
+        return 2
+
+    base_params = {
+        'period_years': args.period_years,
+        'rs_ratio_period': args.rs_ratio_period,
+        'rs_momentum_period': args.rs_momentum_period,
+        'max_date': args.max_date,
+        'load_workers': args.workers,
+        'use_price_cache': not args.no_cache,
+        'use_result_cache': not args.no_cache,
+    }
+    if args.fundamental_provider:
+        base_params['fundamental_provider'] = args.fundamental_provider
+    if args.store:
+        base_params['price_store'] = args.store
+        base_params['benchmark_symbol'] = args.benchmark_symbol
+
+    try:
+        overrides = load_param_sets(args.params_file) if args.params_file else []
+        overrides += [parse_param_set(text) for text in args.param_sets]
+    except (OSError, ValueError) as e:
+        print(f"Error: set parameter tidak valid: {str(e)}", file=sys.stderr)
+        return 2
+    param_sets = [dict(base_params, **override) for override in overrides] or [base_params]
+
+    stock_files = collect_stock_files(args.inputs, args.benchmark)
+    if not stock_files and not args.universe and not args.store:
+        print("Error: tidak ada file saham yang ditemukan", file=sys.stderr)
+        return 2
+
+    # Hanya modul komputasi yang dimuat (tanpa Streamlit/matplotlib)
+    import pandas as pd
+    from analysis_engine import AnalysisEngine
+
+    engine = AnalysisEngine(cache_dir=args.cache_dir)
+    frames = []
+    failures = 0
+    for index, params in enumerate(param_sets):
+        # Pesan analyzer dikirim ke stderr agar stdout tetap berisi hasil
+        log_stream = io.StringIO() if args.quiet else sys.stderr
+        with contextlib.redirect_stdout(log_stream):
+            success, message, results = engine.run_analysis(args.benchmark, stock_files, params, args.universe)
+        if not success:
+            failures += 1
+            print(f"Set parameter {index + 1} gagal: {message}", file=sys.stderr)
+            continue
+
+        frame = results['combined_results'] if results['combined_results'] is not None else results['rrg_results']
+        frame = frame.copy()
+        frame.insert(0, 'analysis_date', results['analysis_date'])
+        frame.insert(0, 'rs_momentum_period', params['rs_momentum_period'])
+        frame.insert(0, 'rs_ratio_period', params['rs_ratio_period'])
+        frame.insert(0, 'period_years', params['period_years'])
+        frame.insert(0, 'param_set', index + 1)
+        frames.append(frame)
+
+    if frames:
+        try:
+            write_output(pd.concat(frames, ignore_index=True), args.output)
+        except (OSError, ValueError, ImportError) as e:
+            print(f"Error: gagal menulis output: {str(e)}", file=sys.stderr)
+            return 1
+        if args.output:
+            print(f"{sum(len(frame) for frame in frames)} baris dari {len(frames)} set parameter ditulis ke "
+                  f"{args.output}", file=sys.stderr)
+
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
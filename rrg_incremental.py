@@ -0,0 +1,476 @@
+# rrg_incremental.py
+# Pembaruan RRG inkremental: menambahkan satu bar harian per ticker tanpa menghitung ulang seluruh histori
+import json
+import numpy as np
+import pandas as pd
+from rrg import classify_quadrant
+from rrg_kernels import rolling_mean, pct_change, column_stats, RunningStats
+
+# Kapasitas tambahan buffer observasi per ticker sebelum buffer perlu diperbesar
+CAPACITY_SLACK = 64
+
+# Penanda tanggal kosong pada buffer tanggal (int64 nanodetik)
+NAT = np.iinfo(np.int64).min
+
+
+def _gather(array, rows, idx, valid, fill=np.nan):
+    """
+    Mengambil array[rows, idx] per baris; posisi yang tidak valid diisi `fill`
+    """
+    idx = np.where(valid, idx, 0)
+    return np.where(valid, array[rows[:, None], idx], fill)
+
+
+class _ShiftedSums:
+    """
+    Jumlah per ticker (count, jumlah, jumlah kuadrat) terhadap nilai geser tetap per ticker,
+    sehingga nilai dapat ditambah maupun dikurangi tanpa kehilangan presisi
+    """
+
+    def __init__(self, count, shift, s1, s2):
+        self.count = count
+        self.shift = shift
+        self.s1 = s1
+        self.s2 = s2
+
+    @classmethod
+    def empty(cls, n):
+        return cls(np.zeros(n), np.zeros(n), np.zeros(n), np.zeros(n))
+
+    def reset(self, rows, values):
+        """
+        Menghitung ulang jumlah untuk baris tertentu dari seluruh nilainya (NaN diabaikan)
+        """
+        count, mean, m2 = column_stats(values.T)
+        self.count[rows] = count
+        self.shift[rows] = mean
+        self.s1[rows] = 0.0
+        self.s2[rows] = m2
+
+    def add(self, rows, values, sign=1.0):
+        """
+        Menambahkan nilai (baris × nilai) ke jumlah per ticker; NaN diabaikan
+        """
+        finite = ~np.isnan(values)
+        deviation = np.where(finite, values - self.shift[rows][:, None], 0.0)
+        self.count[rows] += sign * finite.sum(axis=1)
+        self.s1[rows] += sign * deviation.sum(axis=1)
+        self.s2[rows] += sign * (deviation ** 2).sum(axis=1)
+
+    def remove(self, rows, values):
+        self.add(rows, values, sign=-1.0)
+
+    def moments(self, columns):
+        """
+        Statistik count/mean/M2 per ticker untuk digabung dengan RunningStats.merge
+        """
+        count = self.count[columns]
+        s1 = self.s1[columns]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean = np.where(count > 0, self.shift[columns] + s1 / count, 0.0)
+            m2 = np.where(count > 0, self.s2[columns] - s1 ** 2 / count, 0.0)
+        return count, mean, np.maximum(m2, 0.0)
+
+    def to_dict(self, prefix):
+        return {f"{prefix}_{name}": getattr(self, name) for name in ('count', 'shift', 's1', 's2')}
+
+    @classmethod
+    def from_dict(cls, data, prefix):
+        return cls(*(np.array(data[f"{prefix}_{name}"]) for name in ('count', 'shift', 's1', 's2')))
+
+
+class IncrementalRRG:
+    """
+    State RRG yang dapat diperbarui per bar harian.
+
+    Untuk setiap ticker disimpan observasi di dalam jendela analisis (tanggal, harga relatif,
+    RS-Ratio dan RS-Momentum) dalam buffer ticker × observasi, serta jumlah statistik
+    normalisasi per ticker. Setiap update hanya menyentuh observasi baru dan observasi awal
+    jendela yang bergeser (rs_ratio_period + rs_momentum_period nilai per ticker), sehingga
+    biayanya sebanding dengan jumlah ticker, bukan panjang histori. Hasilnya sama dengan
+    RRGAnalyzer.analyze() penuh pada tanggal yang sama.
+    """
+
+    def __init__(self, tickers, names, rs_ratio_period, rs_momentum_period, period_years):
+        """
+        :param tickers: list symbol ticker
+        :param names: list nama tampilan per ticker (ticker asli dari CSV)
+        :param rs_ratio_period: periode rata-rata bergerak RS-Ratio
+        :param rs_momentum_period: periode RS-Momentum
+        :param period_years: panjang jendela analisis dalam tahun (0 = seluruh histori)
+        """
+        self.tickers = list(tickers)
+        self.names = list(names)
+        self.rs_ratio_period = rs_ratio_period
+        self.rs_momentum_period = rs_momentum_period
+        self.period_years = period_years
+        self.last_date = None
+        self._ticker_pos = {ticker: i for i, ticker in enumerate(self.tickers)}
+
+        n = len(self.tickers)
+        self.dates = np.full((n, 0), NAT, dtype=np.int64)
+        self.relative = np.full((n, 0), np.nan)
+        self.rs_ratio = np.full((n, 0), np.nan)
+        self.rs_momentum = np.full((n, 0), np.nan)
+        self.start = np.zeros(n, dtype=np.intp)
+        self.length = np.zeros(n, dtype=np.intp)
+        # Ticker dengan RS-Ratio NaN di jendela (seluruh harga NaN selama satu periode)
+        # dihitung ulang penuh karena lag momentum tidak lagi sejajar dengan observasi
+        self.irregular = np.zeros(n, dtype=bool)
+        self.rs_ratio_sums = _ShiftedSums.empty(n)
+        self.rs_momentum_sums = _ShiftedSums.empty(n)
+
+    @classmethod
+    def from_analyzer(cls, analyzer, rs_ratio_period=63, rs_momentum_period=21):
+        """
+        Membuat state dari RRGAnalyzer yang datanya sudah dimuat (load_data_from_files)
+
+        :param analyzer: RRGAnalyzer dengan panel harga
+        :return: IncrementalRRG, atau None jika panel belum tersedia
+        """
+        if analyzer.panel is None:
+            print("Panel harga belum dimuat, jalankan load_data_from_files() terlebih dahulu")
+            return None
+
+        panel = analyzer.panel
+        state = cls(panel.tickers, [analyzer.ticker_map.get(ticker, ticker) for ticker in panel.tickers],
+                    rs_ratio_period, rs_momentum_period, analyzer.period_years)
+
+        # Observasi setiap ticker dipadatkan ke awal baris (layout ticker × observasi)
+        present_t = panel.mask.T
+        counts = present_t.sum(axis=1)
+        capacity = int(counts.max(initial=0)) + CAPACITY_SLACK
+        head = np.arange(capacity)[None, :] < counts[:, None]
+        date_values = panel.dates.to_numpy('datetime64[ns]').view(np.int64)
+
+        n = len(panel.tickers)
+        state.dates = np.full((n, capacity), NAT, dtype=np.int64)
+        state.dates[head] = np.broadcast_to(date_values[None, :], present_t.shape)[present_t]
+        state.relative = np.full((n, capacity), np.nan)
+        state.relative[head] = panel.relative_price().T[present_t]
+        state.rs_ratio = np.full((n, capacity), np.nan)
+        state.rs_momentum = np.full((n, capacity), np.nan)
+        state.length = counts.astype(np.intp)
+
+        benchmark_dates = panel.benchmark_dates
+        state.last_date = benchmark_dates[-1] if len(benchmark_dates) else None
+        state._recompute(np.arange(n))
+        return state
+
+    @property
+    def capacity(self):
+        return self.dates.shape[1]
+
+    def _window_start(self, date):
+        """
+        Tanggal awal jendela analisis untuk tanggal akhir `date` (None = tanpa batas)
+        """
+        if not self.period_years > 0:
+            return None
+        try:
+            return date - pd.DateOffset(years=self.period_years)
+        except Exception:
+            # Sama seperti RRGAnalyzer: jika periode tidak valid, data tidak difilter berdasarkan periode
+            return None
+
+    def add_tickers(self, symbols, names=None):
+        """
+        Menambahkan ticker baru (misalnya saham yang baru listing) tanpa observasi
+
+        :param symbols: list symbol baru (symbol yang sudah ada diabaikan)
+        :param names: dict {symbol: nama tampilan} opsional
+        """
+        symbols = [symbol for symbol in dict.fromkeys(symbols) if symbol not in self._ticker_pos]
+        if not symbols:
+            return
+        names = names or {}
+        for symbol in symbols:
+            self._ticker_pos[symbol] = len(self.tickers)
+            self.tickers.append(symbol)
+            self.names.append(names.get(symbol, symbol))
+
+        extra = len(symbols)
+        self.dates = np.concatenate([self.dates, np.full((extra, self.capacity), NAT, dtype=np.int64)])
+        for name in ('relative', 'rs_ratio', 'rs_momentum'):
+            setattr(self, name, np.concatenate([getattr(self, name), np.full((extra, self.capacity), np.nan)]))
+        self.start = np.concatenate([self.start, np.zeros(extra, dtype=np.intp)])
+        self.length = np.concatenate([self.length, np.zeros(extra, dtype=np.intp)])
+        self.irregular = np.concatenate([self.irregular, np.zeros(extra, dtype=bool)])
+        for sums in (self.rs_ratio_sums, self.rs_momentum_sums):
+            for name in ('count', 'shift', 's1', 's2'):
+                setattr(sums, name, np.concatenate([getattr(sums, name), np.zeros(extra)]))
+
+    def _reset_offsets(self, rows):
+        """
+        Menggeser observasi baris tertentu kembali ke awal buffer
+        """
+        rows = rows[self.start[rows] > 0]
+        if len(rows) == 0:
+            return
+        positions = np.arange(self.capacity)[None, :]
+        valid = positions < self.length[rows][:, None]
+        idx = self.start[rows][:, None] + positions
+        self.dates[rows] = _gather(self.dates, rows, idx, valid, NAT)
+        for name in ('relative', 'rs_ratio', 'rs_momentum'):
+            array = getattr(self, name)
+            array[rows] = _gather(array, rows, idx, valid)
+        self.start[rows] = 0
+
+    def _ensure_capacity(self, rows):
+        """
+        Memastikan setiap baris masih memiliki slot kosong di akhir buffer
+        """
+        full = rows[self.start[rows] + self.length[rows] >= self.capacity]
+        if len(full) == 0:
+            return
+        self._reset_offsets(full)
+        if self.length[full].max() < self.capacity:
+            return
+
+        extra = max(CAPACITY_SLACK, self.capacity // 4)
+        n = len(self.tickers)
+        self.dates = np.concatenate([self.dates, np.full((n, extra), NAT, dtype=np.int64)], axis=1)
+        for name in ('relative', 'rs_ratio', 'rs_momentum'):
+            setattr(self, name, np.concatenate([getattr(self, name), np.full((n, extra), np.nan)], axis=1))
+
+    def _recompute(self, rows):
+        """
+        Menghitung ulang RS-Ratio, RS-Momentum dan statistik normalisasi seluruh jendela untuk baris tertentu
+        """
+        if len(rows) == 0:
+            return
+        self._reset_offsets(rows)
+        present = np.arange(self.capacity)[None, :] < self.length[rows][:, None]
+
+        rs_ratio = rolling_mean(self.relative[rows].T, present.T, self.rs_ratio_period).T
+        rs_present = ~np.isnan(rs_ratio)
+        rs_momentum = pct_change(rs_ratio.T, rs_present.T, self.rs_momentum_period).T
+
+        self.rs_ratio[rows] = rs_ratio
+        self.rs_momentum[rows] = rs_momentum
+        self.rs_ratio_sums.reset(rows, rs_ratio)
+        self.rs_momentum_sums.reset(rows, rs_momentum)
+        self.irregular[rows] = (rs_present != present).any(axis=1)
+
+    def _drop_before(self, start_date):
+        """
+        Membuang observasi sebelum start_date, lalu menghitung ulang nilai awal jendela yang berubah
+        (RS-Ratio dengan jendela parsial dan RS-Momentum yang bergantung padanya)
+        """
+        cutoff = pd.Timestamp(start_date).value
+        all_rows = np.arange(len(self.tickers))
+        drop = np.zeros(len(self.tickers), dtype=np.intp)
+        while True:
+            position = np.minimum(self.start + drop, self.capacity - 1)
+            more = (drop < self.length) & (self.dates[all_rows, position] < cutoff)
+            if not more.any():
+                break
+            drop += more
+
+        rows = np.flatnonzero(drop > 0)
+        if len(rows) == 0:
+            return
+
+        ratio_period = self.rs_ratio_period
+        momentum_period = self.rs_momentum_period
+        head_size = ratio_period - 1 + momentum_period
+        regular = rows[~self.irregular[rows]]
+
+        # Keluarkan nilai lama (yang dibuang dan yang akan dihitung ulang) dari statistik
+        size = drop[regular] + head_size
+        width = int(size.max(initial=0))
+        positions = np.arange(width)[None, :]
+        idx = self.start[regular][:, None] + positions
+        valid = positions < np.minimum(size, self.length[regular])[:, None]
+        self.rs_ratio_sums.remove(regular, _gather(self.rs_ratio, regular, idx, valid))
+        self.rs_momentum_sums.remove(regular, _gather(self.rs_momentum, regular, idx, valid))
+
+        self.start[rows] += drop[rows]
+        self.length[rows] -= drop[rows]
+        if len(regular) == 0:
+            return
+
+        # Hitung ulang awal jendela: RS-Ratio parsial (rata-rata kumulatif) untuk
+        # ratio_period - 1 observasi pertama, lalu RS-Momentum untuk head_size observasi pertama
+        positions = np.arange(head_size)[None, :]
+        idx = self.start[regular][:, None] + positions
+        valid = positions < self.length[regular][:, None]
+        relative = _gather(self.relative, regular, idx, valid)[:, :ratio_period - 1]
+        finite = ~np.isnan(relative)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            partial = np.cumsum(np.where(finite, relative, 0.0), axis=1) / np.cumsum(finite, axis=1)
+        partial = np.where(valid[:, :ratio_period - 1] & (np.cumsum(finite, axis=1) > 0), partial, np.nan)
+
+        rs_ratio = _gather(self.rs_ratio, regular, idx, valid)
+        rs_ratio[:, :ratio_period - 1] = partial
+        rs_momentum = np.full(rs_ratio.shape, np.nan)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rs_momentum[:, momentum_period:] = (rs_ratio[:, momentum_period:] / rs_ratio[:, :-momentum_period] - 1) * 100
+        rs_momentum = np.where(valid, rs_momentum, np.nan)
+
+        row, column = np.nonzero(valid)
+        self.rs_ratio[regular[row], idx[row, column]] = rs_ratio[row, column]
+        self.rs_momentum[regular[row], idx[row, column]] = rs_momentum[row, column]
+        self.rs_ratio_sums.add(regular, rs_ratio)
+        self.rs_momentum_sums.add(regular, rs_momentum)
+        self.irregular[regular] |= (valid[:, :ratio_period - 1] & np.isnan(partial)).any(axis=1)
+
+    def _append(self, rows, date, relative):
+        """
+        Menambahkan satu observasi per baris dan menghitung RS-Ratio/RS-Momentum untuk observasi tersebut
+        """
+        self._ensure_capacity(rows)
+        position = self.start[rows] + self.length[rows]
+        self.dates[rows, position] = pd.Timestamp(date).value
+        self.relative[rows, position] = relative
+        self.length[rows] += 1
+
+        # RS-Ratio: rata-rata rs_ratio_period observasi terakhir (NaN diabaikan)
+        offsets = np.arange(-self.rs_ratio_period + 1, 1)[None, :]
+        idx = position[:, None] + offsets
+        window = _gather(self.relative, rows, idx, idx >= self.start[rows][:, None])
+        finite = ~np.isnan(window)
+        count = finite.sum(axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rs_ratio = np.where(count > 0, np.where(finite, window, 0.0).sum(axis=1) / count, np.nan)
+
+        # RS-Momentum terhadap RS-Ratio rs_momentum_period observasi sebelumnya
+        lag = position - self.rs_momentum_period
+        has_lag = lag >= self.start[rows]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rs_momentum = np.where(has_lag, (rs_ratio / self.rs_ratio[rows, np.maximum(lag, 0)] - 1) * 100, np.nan)
+
+        self.rs_ratio[rows, position] = rs_ratio
+        self.rs_momentum[rows, position] = rs_momentum
+        self.rs_ratio_sums.add(rows, rs_ratio[:, None])
+        self.rs_momentum_sums.add(rows, rs_momentum[:, None])
+        self.irregular[rows] |= np.isnan(rs_ratio)
+
+    def update(self, date, benchmark_close, closes, names=None):
+        """
+        Menambahkan bar harian baru dan memperbarui hasil RRG terbaru
+
+        :param date: tanggal bar (harus setelah tanggal terakhir)
+        :param benchmark_close: harga penutupan benchmark pada tanggal tersebut
+        :param closes: dict/Series {symbol: harga penutupan}; ticker yang tidak ada dianggap tidak memiliki bar.
+                       Symbol baru ditambahkan di akhir daftar ticker (lihat add_tickers)
+        :param names: dict {symbol: nama tampilan} opsional untuk symbol baru
+        :return: DataFrame hasil terbaru (sama seperti RRGAnalyzer.get_latest_data), atau None jika tanggal tidak valid
+        """
+        date = pd.Timestamp(date)
+        if self.last_date is not None and date <= self.last_date:
+            print(f"Tanggal {date.strftime('%Y-%m-%d')} harus setelah tanggal terakhir "
+                  f"{self.last_date.strftime('%Y-%m-%d')}")
+            return None
+
+        self.add_tickers(closes.keys(), names)
+        rows = []
+        values = []
+        for symbol, close in closes.items():
+            position = self._ticker_pos.get(symbol)
+            if position is not None:
+                rows.append(position)
+                values.append(close)
+        rows = np.array(rows, dtype=np.intp)
+        values = np.array(values, dtype=np.float64)
+
+        # Geser awal jendela terlebih dahulu agar RS-Ratio bar baru memakai jendela yang benar
+        start_date = self._window_start(date)
+        if start_date is not None:
+            self._drop_before(start_date)
+
+        if len(rows):
+            with np.errstate(divide='ignore', invalid='ignore'):
+                relative = values / benchmark_close * 100
+            self._append(rows, date, relative)
+
+        self._recompute(np.flatnonzero(self.irregular))
+        self.last_date = date
+        return self.get_latest_data()
+
+    def _last_values(self, array, rows):
+        """
+        Nilai non-NaN terakhir per baris
+        """
+        last = array[rows, self.start[rows] + self.length[rows] - 1]
+        for i in np.flatnonzero(np.isnan(last)):
+            row = rows[i]
+            values = array[row, self.start[row]:self.start[row] + self.length[row]]
+            values = values[~np.isnan(values)]
+            last[i] = values[-1] if len(values) else np.nan
+        return last
+
+    def get_latest_data(self):
+        """
+        Hasil RRG terbaru (Symbol, RS-Ratio, RS-Momentum, Quadrant, Recommendation)
+        dengan normalisasi dari statistik seluruh jendela
+        """
+        rs_ratio_count = self.rs_ratio_sums.count
+        valid = ((self.length >= self.rs_ratio_period)
+                 & (rs_ratio_count > self.rs_momentum_period)
+                 & (self.rs_momentum_sums.count > 0))
+        if not valid.any():
+            print("Tidak ada ticker valid dengan data lengkap")
+            return pd.DataFrame()
+
+        rs_ratio_stats = RunningStats().merge(*self.rs_ratio_sums.moments(valid))
+        rs_momentum_stats = RunningStats().merge(*self.rs_momentum_sums.moments(valid))
+        if rs_ratio_stats.count < 2 or rs_momentum_stats.count < 2:
+            print("Tidak cukup data untuk normalisasi")
+            return pd.DataFrame()
+        if rs_ratio_stats.std <= 0.0001 or rs_momentum_stats.std <= 0.0001:
+            print("Standard deviasi terlalu kecil, tidak dapat melakukan normalisasi")
+            return pd.DataFrame()
+
+        rows = np.flatnonzero(valid)
+        rs_ratio = 100 + 10 * ((self._last_values(self.rs_ratio, rows) - rs_ratio_stats.mean) / rs_ratio_stats.std)
+        rs_momentum = 100 + 10 * ((self._last_values(self.rs_momentum, rows) - rs_momentum_stats.mean)
+                                  / rs_momentum_stats.std)
+
+        latest_data = []
+        for row, ratio, momentum in zip(rows, rs_ratio, rs_momentum):
+            quadrant, recommendation = classify_quadrant(ratio, momentum)
+            latest_data.append({
+                'Symbol': self.names[row],
+                'RS-Ratio': ratio,
+                'RS-Momentum': momentum,
+                'Quadrant': quadrant,
+                'Recommendation': recommendation
+            })
+        return pd.DataFrame(latest_data)
+
+    def save(self, path):
+        """
+        Menyimpan state ke file .npz
+
+        :param path: path file (ekstensi .npz ditambahkan oleh NumPy jika belum ada)
+        """
+        meta = {
+            'tickers': self.tickers,
+            'names': self.names,
+            'rs_ratio_period': self.rs_ratio_period,
+            'rs_momentum_period': self.rs_momentum_period,
+            'period_years': self.period_years,
+            'last_date': self.last_date.isoformat() if self.last_date is not None else None,
+        }
+        np.savez(path, meta=np.array(json.dumps(meta)), dates=self.dates, relative=self.relative,
+                 rs_ratio=self.rs_ratio, rs_momentum=self.rs_momentum, start=self.start, length=self.length,
+                 irregular=self.irregular, **self.rs_ratio_sums.to_dict('rs_ratio_sums'),
+                 **self.rs_momentum_sums.to_dict('rs_momentum_sums'))
+
+    @classmethod
+    def load(cls, path):
+        """
+        Memuat state dari file .npz hasil save()
+        """
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data['meta']))
+            state = cls(meta['tickers'], meta['names'], meta['rs_ratio_period'], meta['rs_momentum_period'],
+                        meta['period_years'])
+            if meta['last_date'] is not None:
+                state.last_date = pd.Timestamp(meta['last_date'])
+            for name in ('dates', 'relative', 'rs_ratio', 'rs_momentum', 'start', 'length', 'irregular'):
+                setattr(state, name, np.array(data[name]))
+            state.rs_ratio_sums = _ShiftedSums.from_dict(data, 'rs_ratio_sums')
+            state.rs_momentum_sums = _ShiftedSums.from_dict(data, 'rs_momentum_sums')
+        return state
@@ -0,0 +1,194 @@
+# rrg_kernels.py
+# Kernel NumPy untuk menghitung RS-Ratio dan RS-Momentum seluruh universe sekaligus
+import numpy as np
+
+
+def _compact(values, present):
+    """
+    Memadatkan observasi setiap ticker ke awal baris (layout ticker × observasi).
+
+    :param values: ndarray (tanggal × ticker)
+    :param present: ndarray bool, True untuk baris yang merupakan observasi kolom tersebut
+    :return: tuple (compact, head, present_t) - compact berukuran ticker × tanggal dengan NaN
+             sebagai padding, head menandai posisi observasi di compact, present_t adalah
+             mask observasi dalam layout ticker × tanggal
+    """
+    present_t = present.T
+    counts = present_t.sum(axis=1)
+    head = np.arange(present_t.shape[1])[None, :] < counts[:, None]
+    compact = np.full(present_t.shape, np.nan)
+    compact[head] = values.T[present_t]
+    return compact, head, present_t
+
+
+def _expand(compact, head, present_t):
+    """
+    Kebalikan dari _compact: mengembalikan nilai ke posisi tanggal asal (tanggal × ticker)
+    """
+    result = np.full(present_t.shape, np.nan)
+    result[present_t] = compact[head]
+    return result.T
+
+
+def rolling_mean(values, present, window):
+    """
+    Rata-rata bergerak per kolom atas `window` observasi terakhir (setara dengan
+    ``Series.rolling(window, min_periods=1).mean()`` pada observasi yang ada).
+    Nilai NaN di dalam jendela diabaikan.
+
+    :param values: ndarray (tanggal × ticker)
+    :param present: ndarray bool, baris yang merupakan observasi kolom
+    :param window: panjang jendela (jumlah observasi)
+    :return: ndarray (tanggal × ticker), NaN di luar observasi
+    """
+    compact, head, present_t = _compact(values, present)
+    n_tickers, n_obs = compact.shape
+
+    # Geser setiap ticker dengan nilai pertamanya agar jumlah kumulatif tetap presisi
+    finite = ~np.isnan(compact)
+    first = compact[np.arange(n_tickers), finite.argmax(axis=1)]
+    first = np.where(np.isnan(first), 0.0, first)
+    shifted = np.where(finite, compact - first[:, None], 0.0)
+
+    cum_sum = np.zeros((n_tickers, n_obs + 1))
+    cum_count = np.zeros((n_tickers, n_obs + 1))
+    np.cumsum(shifted, axis=1, out=cum_sum[:, 1:])
+    np.cumsum(finite, axis=1, out=cum_count[:, 1:])
+
+    # Jumlah dan banyaknya nilai di dalam jendela [k - window + 1, k]
+    lagged = np.maximum(np.arange(n_obs) + 1 - window, 0)
+    window_sum = cum_sum[:, 1:] - cum_sum[:, lagged]
+    window_count = cum_count[:, 1:] - cum_count[:, lagged]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = np.where(window_count > 0, window_sum / window_count + first[:, None], np.nan)
+
+    return _expand(mean, head, present_t)
+
+
+def pct_change(values, present, periods):
+    """
+    Perubahan persentase per kolom terhadap nilai `periods` observasi sebelumnya
+    (setara dengan ``Series.pct_change(periods, fill_method=None) * 100``).
+
+    :param values: ndarray (tanggal × ticker)
+    :param present: ndarray bool, baris yang merupakan observasi kolom
+    :param periods: jarak observasi
+    :return: ndarray (tanggal × ticker), NaN jika belum tersedia
+    """
+    compact, head, present_t = _compact(values, present)
+    change = np.full(compact.shape, np.nan)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        change[:, periods:] = (compact[:, periods:] / compact[:, :-periods] - 1) * 100
+
+    return _expand(change, head, present_t)
+
+
+def compute_rs_ratio(panel, period):
+    """
+    Menghitung matriks RS-Ratio untuk seluruh ticker di panel
+
+    :param panel: PricePanel
+    :param period: periode rata-rata bergerak
+    :return: tuple (matriks RS-Ratio, array bool ticker dengan data cukup)
+    """
+    eligible = panel.valid_counts() >= period
+    present = panel.mask & eligible[None, :]
+    rs_ratio = rolling_mean(panel.relative_price(), present, period)
+    return rs_ratio, eligible
+
+
+def compute_rs_momentum(rs_ratio, period, candidates=None):
+    """
+    Menghitung matriks RS-Momentum dari matriks RS-Ratio
+
+    :param rs_ratio: matriks RS-Ratio (tanggal × ticker), NaN jika tidak ada nilai
+    :param period: periode momentum (jumlah observasi RS-Ratio)
+    :param candidates: array bool ticker yang dihitung (default: semua)
+    :return: tuple (matriks RS-Momentum, array bool ticker dengan data cukup)
+    """
+    present = ~np.isnan(rs_ratio)
+    if candidates is not None:
+        present &= candidates[None, :]
+    eligible = present.sum(axis=0) > period
+    rs_momentum = pct_change(rs_ratio, present & eligible[None, :], period)
+    return rs_momentum, eligible
+
+
+def column_stats(matrix):
+    """
+    Statistik count/mean/M2 per kolom dengan mengabaikan NaN
+
+    :param matrix: ndarray (tanggal × ticker)
+    :return: tuple array (count, mean, m2) per kolom
+    """
+    finite = ~np.isnan(matrix)
+    count = finite.sum(axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = np.where(finite, matrix, 0.0).sum(axis=0) / count
+    deviation = np.where(finite, matrix - mean, 0.0)
+    m2 = np.einsum('ij,ij->j', deviation, deviation)
+    mean = np.where(count > 0, mean, 0.0)
+    return count, mean, m2
+
+
+class RunningStats:
+    """
+    Akumulator mean dan standard deviation (populasi) yang dapat digabung
+    tanpa menyimpan seluruh nilai (Welford/Chan).
+    """
+
+    def __init__(self, count=0, mean=0.0, m2=0.0):
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+
+    @classmethod
+    def from_columns(cls, matrix, columns=None):
+        """
+        Membuat akumulator dari kolom-kolom matriks (NaN diabaikan)
+
+        :param matrix: ndarray (tanggal × ticker)
+        :param columns: array bool kolom yang diikutkan (default: semua)
+        """
+        count, mean, m2 = column_stats(matrix)
+        if columns is not None:
+            count, mean, m2 = count[columns], mean[columns], m2[columns]
+        stats = cls()
+        stats.merge(count, mean, m2)
+        return stats
+
+    def merge(self, count, mean, m2):
+        """
+        Menggabungkan satu atau beberapa kelompok statistik (skalar atau array)
+        """
+        count = np.asarray(count, dtype=np.float64)
+        mean = np.asarray(mean, dtype=np.float64)
+        m2 = np.asarray(m2, dtype=np.float64)
+
+        total = self.count + count.sum()
+        if total == 0:
+            return self
+        combined_mean = (self.count * self.mean + (count * mean).sum()) / total
+        self.m2 = (self.m2 + self.count * (self.mean - combined_mean) ** 2
+                   + m2.sum() + (count * (mean - combined_mean) ** 2).sum())
+        self.mean = combined_mean
+        self.count = total
+        return self
+
+    def add(self, values):
+        """
+        Menambahkan nilai baru (NaN diabaikan)
+        """
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return self
+        mean = values.mean()
+        return self.merge(len(values), mean, ((values - mean) ** 2).sum())
+
+    @property
+    def std(self):
+        if self.count == 0:
+            return np.nan
+        return np.sqrt(self.m2 / self.count)
@@ -0,0 +1,279 @@
+# rrg_service.py
+# Service HTTP/JSON lokal di atas AnalysisEngine; panel harga dan cache fundamental tetap hangat antar request
+import argparse
+import glob
+import json
+import os
+import sys
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from analysis_engine import AnalysisEngine
+from fundamental_analyzer import default_fetch_flight
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+
+# Parameter request yang diteruskan ke AnalysisEngine.run_analysis
+REQUEST_PARAMS = ('period_years', 'rs_ratio_period', 'rs_momentum_period', 'max_date', 'tickers', 'analysis_type',
+                  'use_fundamental', 'use_universe_score', 'universe_score_input', 'refresh_fundamental',
+                  'include_roe', 'include_roa', 'include_profit_margin', 'include_earnings_growth',
+                  'include_debt_equity', 'roe_weight', 'roa_weight', 'pm_weight', 'eg_weight', 'de_weight',
+                  'fundamental_weight', 'momentum_weight', 'universe_weight', 'stale_while_revalidate')
+
+# Tipe parameter request yang divalidasi sebelum analisis dijalankan
+INTEGER_PARAMS = ('rs_ratio_period', 'rs_momentum_period')
+NUMBER_PARAMS = ('period_years', 'universe_score_input', 'roe_weight', 'roa_weight', 'pm_weight', 'eg_weight',
+                 'de_weight', 'fundamental_weight', 'momentum_weight', 'universe_weight')
+BOOLEAN_PARAMS = ('use_fundamental', 'use_universe_score', 'refresh_fundamental', 'include_roe', 'include_roa',
+                  'include_profit_margin', 'include_earnings_growth', 'include_debt_equity',
+                  'stale_while_revalidate')
+
+# Ukuran maksimal body request (byte)
+MAX_BODY_BYTES = 1024 * 1024
+
+
+class RequestError(Exception):
+    """
+    Request tidak valid (dijawab dengan HTTP 400)
+    """
+
+
+def validate_request_params(request):
+    """
+    Memeriksa tipe dan rentang parameter request (null = nilai default)
+
+    :param request: dict parameter request
+    :raises RequestError: jika ada parameter yang tidak valid
+    """
+    for key in INTEGER_PARAMS:
+        value = request.get(key)
+        if value is not None and (isinstance(value, bool) or not isinstance(value, int) or value < 1):
+            raise RequestError(f"Parameter '{key}' harus berupa bilangan bulat positif")
+    for key in NUMBER_PARAMS:
+        value = request.get(key)
+        if value is not None and (isinstance(value, bool) or not isinstance(value, (int, float)) or value < 0):
+            raise RequestError(f"Parameter '{key}' harus berupa angka tidak negatif")
+    universe_score = request.get('universe_score_input')
+    if universe_score is not None and universe_score > 100:
+        raise RequestError("Parameter 'universe_score_input' harus di antara 0 dan 100")
+    for key in BOOLEAN_PARAMS:
+        value = request.get(key)
+        if value is not None and not isinstance(value, bool):
+            raise RequestError(f"Parameter '{key}' harus berupa boolean")
+
+    max_date = request.get('max_date')
+    if max_date is not None:
+        try:
+            datetime.fromisoformat(max_date)
+        except (TypeError, ValueError):
+            raise RequestError("Parameter 'max_date' harus berupa tanggal ISO (YYYY-MM-DD)")
+    tickers = request.get('tickers')
+    if tickers is not None and (not isinstance(tickers, list)
+                                or not all(isinstance(ticker, str) for ticker in tickers)):
+        raise RequestError("Parameter 'tickers' harus berupa list string")
+    analysis_type = request.get('analysis_type')
+    if analysis_type is not None and not isinstance(analysis_type, str):
+        raise RequestError("Parameter 'analysis_type' harus berupa string")
+    benchmark = request.get('benchmark')
+    if benchmark is not None and not isinstance(benchmark, str):
+        raise RequestError("Parameter 'benchmark' harus berupa string")
+
+
+class RRGService:
+    """
+    Menjalankan analisis untuk request JSON dengan satu AnalysisEngine bersama.
+    Stage yang tidak berubah (panel harga, RS-Ratio, data fundamental) dipakai ulang antar request.
+    """
+
+    def __init__(self, data_dir=None, benchmark=None, universe_file=None, price_store=None, cache_dir=None,
+                 default_params=None):
+        """
+        :param data_dir: direktori file CSV (saham dan benchmark)
+        :param benchmark: file benchmark default (path, atau nama file/symbol di data_dir)
+        :param universe_file: file universe format panjang opsional
+        :param price_store: direktori price store opsional (menggantikan pembacaan CSV)
+        :param cache_dir: direktori cache Parquet hasil parsing CSV
+        :param default_params: parameter analisis default untuk setiap request
+        """
+        self.data_dir = data_dir
+        self.benchmark = benchmark
+        self.universe_file = universe_file
+        self.price_store = price_store
+        self.default_params = default_params or {}
+        self.engine = AnalysisEngine(cache_dir=cache_dir)
+        self.requests = 0
+        # Engine (pipeline) tidak thread-safe; request dianalisis satu per satu
+        self._lock = threading.Lock()
+
+    def _resolve_benchmark(self, benchmark):
+        """
+        Path file benchmark dari nama symbol/file (relatif ke data_dir) atau path lengkap
+        """
+        if benchmark is None:
+            return None
+        if os.path.exists(benchmark):
+            return benchmark
+        if self.data_dir:
+            for candidate in (benchmark, f"{benchmark}.csv"):
+                path = os.path.join(self.data_dir, candidate)
+                if os.path.exists(path):
+                    return path
+        raise RequestError(f"Benchmark {benchmark} tidak ditemukan")
+
+    def _stock_files(self, benchmark_file):
+        if not self.data_dir:
+            return []
+        benchmark_path = os.path.abspath(benchmark_file) if benchmark_file else None
+        return sorted(path for path in glob.glob(os.path.join(self.data_dir, '*.csv'))
+                      if os.path.abspath(path) != benchmark_path)
+
+    def analyze(self, request):
+        """
+        Menjalankan analisis untuk satu request
+
+        :param request: dict parameter (lihat REQUEST_PARAMS, plus 'benchmark')
+        :return: dict respons JSON
+        :raises RequestError: jika parameter tidak valid
+        """
+        if not isinstance(request, dict):
+            raise RequestError("Body request harus berupa objek JSON")
+        unknown = sorted(set(request) - set(REQUEST_PARAMS) - {'benchmark'})
+        if unknown:
+            raise RequestError(f"Parameter tidak dikenal: {', '.join(unknown)}")
+        validate_request_params(request)
+
+        params = dict(self.default_params)
+        params.update({key: value for key, value in request.items() if key in REQUEST_PARAMS})
+        benchmark = request.get('benchmark', self.benchmark)
+        if self.price_store:
+            params['price_store'] = self.price_store
+            params['benchmark_symbol'] = benchmark
+            benchmark_file = None
+        else:
+            benchmark_file = self._resolve_benchmark(benchmark)
+            if benchmark_file is None:
+                raise RequestError("Parameter 'benchmark' wajib diisi")
+
+        with self._lock:
+            self.requests += 1
+            success, message, results = self.engine.run_analysis(
+                benchmark_file, self._stock_files(benchmark_file), params, self.universe_file)
+
+        if not success:
+            return {'success': False, 'message': message}
+
+        table = results['combined_results'] if results['combined_results'] is not None else results['rrg_results']
+        return {
+            'success': True,
+            'message': message,
+            'analysis_date': results['analysis_date'],
+            'from_cache': results['from_cache'],
+            'timings': {stage: timing['seconds'] for stage, timing in results['timings'].items()},
+            # to_json mengubah NaN menjadi null (json.dumps akan menulis NaN yang tidak valid)
+            'results': json.loads(table.to_json(orient='records', date_format='iso')),
+        }
+
+
+class RRGRequestHandler(BaseHTTPRequestHandler):
+    """
+    GET /health, POST /analyze (body JSON parameter analisis)
+    """
+
+    service = None
+    quiet = False
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == '/health':
+            # executions = request fundamental ke provider, coalesced = request yang memakai hasil request berjalan
+            self._send_json(200, {'status': 'ok', 'requests': self.service.requests,
+                                  'fundamental_fetches': default_fetch_flight().stats()})
+        else:
+            self._send_json(404, {'success': False, 'message': f"Path {self.path} tidak ditemukan"})
+
+    def do_POST(self):
+        if self.path != '/analyze':
+            self._send_json(404, {'success': False, 'message': f"Path {self.path} tidak ditemukan"})
+            return
+        try:
+            length = int(self.headers.get('Content-Length') or 0)
+            if length > MAX_BODY_BYTES:
+                raise RequestError("Body request terlalu besar")
+            body = self.rfile.read(length) if length else b'{}'
+            try:
+                request = json.loads(body)
+            except ValueError as e:
+                raise RequestError(f"Body request bukan JSON yang valid: {str(e)}")
+            response = self.service.analyze(request)
+        except RequestError as e:
+            self._send_json(400, {'success': False, 'message': str(e)})
+            return
+        except Exception as e:
+            self._send_json(500, {'success': False, 'message': f"Terjadi kesalahan dalam analisis: {str(e)}"})
+            return
+        self._send_json(200 if response['success'] else 422, response)
+
+    def log_message(self, format, *args):
+        if not self.quiet:
+            super().log_message(format, *args)
+
+
+def create_server(service, host=DEFAULT_HOST, port=DEFAULT_PORT, quiet=False):
+    """
+    Membuat ThreadingHTTPServer untuk service
+
+    :return: ThreadingHTTPServer (jalankan dengan serve_forever())
+    """
+    handler = type('BoundRRGRequestHandler', (RRGRequestHandler,), {'service': service, 'quiet': quiet})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Service HTTP/JSON lokal untuk analisis RRG")
+    parser.add_argument('--data-dir', help="direktori file CSV saham dan benchmark")
+    parser.add_argument('--benchmark', help="file/symbol benchmark default")
+    parser.add_argument('--universe', help="file universe format panjang (Ticker,Date,OHLCV)")
+    parser.add_argument('--store', help="direktori price store")
+    parser.add_argument('--cache-dir', help="direktori cache Parquet hasil parsing CSV")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--no-warm', action='store_true', help="jangan muat panel saat start")
+    parser.add_argument('--quiet', '-q', action='store_true', help="sembunyikan log request")
+    args = parser.parse_args(argv)
+
+    if not args.data_dir and not args.store and not args.universe:
+        print("Error: isi --data-dir, --universe, atau --store", file=sys.stderr)
+        return 2
+
+    # Service berjalan lama: data fundamental kedaluwarsa dipakai langsung dan diperbarui di latar belakang
+    service = RRGService(args.data_dir, args.benchmark, args.universe, args.store, args.cache_dir,
+                         default_params={'stale_while_revalidate': True})
+    if not args.no_warm:
+        # Muat panel dan hitung parameter default sekali agar request pertama sudah hangat
+        try:
+            response = service.analyze({})
+            print(f"Panel dimuat: {len(response.get('results', []))} ticker, {response.get('message')}")
+        except RequestError as e:
+            print(f"Gagal memuat panel saat start: {str(e)}", file=sys.stderr)
+
+    server = create_server(service, args.host, args.port, args.quiet)
+    print(f"RRG service berjalan di http://{args.host}:{args.port} (POST /analyze, GET /health)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
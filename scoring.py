@@ -0,0 +1,165 @@
+# scoring.py
+# Engine skor gabungan deklaratif: komponen, bobot, dan ambang rekomendasi dievaluasi dengan operasi vektor NumPy
+import numpy as np
+
+# Ambang rekomendasi gabungan (skor minimal, label), dari yang tertinggi
+RECOMMENDATION_THRESHOLDS = ((80, "Strong Buy"), (65, "Buy"), (50, "Hold"), (35, "Reduce"))
+DEFAULT_RECOMMENDATION = "Sell"
+
+
+class ScoreComponent:
+    """
+    Satu komponen skor gabungan dengan nilai 0-100
+    """
+
+    def __init__(self, name, weight, source=None, value_range=None, fill_value=None):
+        """
+        :param name: nama kolom nilai komponen (ditulis ke DataFrame hasil)
+        :param weight: bobot komponen dalam skor gabungan
+        :param source: kolom sumber (default: name)
+        :param value_range: (rendah, tinggi) opsional; nilai sumber dipetakan linear ke 0-100 lalu di-clip
+        :param fill_value: pengganti nilai kosong/NaN dan kolom sumber yang tidak ada (None = tetap NaN)
+        """
+        self.name = name
+        self.weight = weight
+        self.source = source or name
+        self.value_range = value_range
+        self.fill_value = fill_value
+
+    def values(self, frame):
+        """
+        Nilai komponen untuk setiap baris frame
+
+        :return: ndarray float
+        """
+        if self.source in frame.columns:
+            values = frame[self.source].to_numpy(dtype=float, na_value=np.nan)
+        else:
+            values = np.full(len(frame), np.nan)
+        if self.value_range is not None:
+            low, high = self.value_range
+            values = np.clip((values - low) * 100 / (high - low), 0, 100)
+        if self.fill_value is not None:
+            values = np.where(np.isnan(values), self.fill_value, values)
+        return values
+
+
+class ScoringSpec:
+    """
+    Spesifikasi skor gabungan: skor = jumlah (nilai komponen x bobot), label dari ambang rekomendasi.
+    Bobot dipakai apa adanya (jumlah bobot 1 menghasilkan skor 0-100); lihat normalized().
+    """
+
+    def __init__(self, components, thresholds=RECOMMENDATION_THRESHOLDS, default_label=DEFAULT_RECOMMENDATION,
+                 score_column='Combined_Score', label_column='Combined_Recommendation'):
+        """
+        :param components: list ScoreComponent (urutan menentukan urutan penjumlahan)
+        :param thresholds: list (skor minimal, label), dari yang tertinggi
+        :param default_label: label jika skor di bawah semua ambang (atau NaN)
+        :param score_column: kolom skor gabungan
+        :param label_column: kolom label rekomendasi
+        """
+        self.components = list(components)
+        self.thresholds = sorted(thresholds, key=lambda item: item[0], reverse=True)
+        self.default_label = default_label
+        self.score_column = score_column
+        self.label_column = label_column
+        # Ambang dan label disiapkan sekali; label terakhir adalah default_label
+        self._threshold_values = np.array([threshold for threshold, _ in self.thresholds], dtype=float)
+        self._labels = np.array([label for _, label in self.thresholds] + [default_label], dtype=object)
+
+    def with_weights(self, **weights):
+        """
+        Salinan spesifikasi dengan bobot komponen yang diganti (nama komponen -> bobot; None = tetap)
+        """
+        components = [ScoreComponent(component.name,
+                                     weights[component.name] if weights.get(component.name) is not None
+                                     else component.weight,
+                                     component.source, component.value_range, component.fill_value)
+                      for component in self.components]
+        return ScoringSpec(components, self.thresholds, self.default_label, self.score_column, self.label_column)
+
+    def normalized(self):
+        """
+        Salinan spesifikasi dengan bobot yang dinormalisasi sehingga jumlahnya 1 (skor tetap 0-100 dan
+        ambang rekomendasi tetap bermakna)
+
+        :raises ValueError: jika ada bobot negatif atau jumlah bobot 0
+        """
+        weights = {component.name: component.weight for component in self.components}
+        negative = [name for name, weight in weights.items() if weight < 0]
+        if negative:
+            raise ValueError(f"Bobot skor gabungan tidak boleh negatif: {', '.join(negative)}")
+        total = sum(weights.values())
+        if total <= 0:
+            raise ValueError("Jumlah bobot skor gabungan harus lebih dari 0")
+        if abs(total - 1) <= 1e-9:
+            return self
+        return self.with_weights(**{name: weight / total for name, weight in weights.items()})
+
+    def score(self, frame):
+        """
+        Menghitung nilai setiap komponen dan skor gabungan
+
+        :param frame: DataFrame berisi kolom sumber komponen
+        :return: tuple (dict nama komponen -> ndarray nilai, ndarray skor gabungan)
+        """
+        values = {component.name: component.values(frame) for component in self.components}
+        scores = np.zeros(len(frame))
+        for index, component in enumerate(self.components):
+            weighted = values[component.name] * component.weight
+            scores = weighted if index == 0 else scores + weighted
+        return values, scores
+
+    def recommend(self, scores):
+        """
+        Label rekomendasi untuk array skor (np.select atas ambang, dari yang tertinggi)
+
+        :return: ndarray label
+        """
+        scores = np.asarray(scores, dtype=float)
+        if not len(self._threshold_values):
+            return np.full(scores.shape, self.default_label, dtype=object)
+        conditions = list(scores[None, :] >= self._threshold_values[:, None])
+        # Pilih indeks label (bukan string) agar np.select tetap bekerja pada array numerik
+        label_index = np.select(conditions, np.arange(len(conditions)), default=len(conditions))
+        return self._labels[label_index]
+
+    def apply(self, frame):
+        """
+        Menulis kolom nilai komponen, skor gabungan, dan rekomendasi ke frame (in place)
+
+        :return: frame
+        """
+        values, scores = self.score(frame)
+        for name, component_values in values.items():
+            frame[name] = component_values
+        frame[self.score_column] = scores
+        frame[self.label_column] = self.recommend(scores)
+        return frame
+
+
+def combined_score_spec(use_universe_score=False, universe_score=50, fundamental_weight=None,
+                        momentum_weight=None, universe_weight=None):
+    """
+    Spesifikasi skor gabungan aplikasi: 50% fundamental + 50% RS-Momentum, atau dengan Stock Universe Score
+    40% universe + 30% fundamental + 30% RS-Momentum
+
+    :param use_universe_score: sertakan Stock Universe Score
+    :param universe_score: nilai Stock Universe Score (0-100) untuk semua saham
+    :param fundamental_weight: bobot Fundamental_Score (None = default)
+    :param momentum_weight: bobot RS-Momentum ternormalisasi (None = default)
+    :param universe_weight: bobot Stock Universe Score (None = default)
+    :return: ScoringSpec dengan jumlah bobot 1 (bobot kustom dinormalisasi, lihat ScoringSpec.normalized)
+    :raises ValueError: jika ada bobot negatif atau jumlah bobot 0
+    """
+    # RS-Momentum biasanya berada di sekitar 100 dengan std 10: 90 = 0, 110 = 100
+    momentum = ScoreComponent('RS_Momentum_Normalized', 0.5, source='RS-Momentum', value_range=(90, 110))
+    fundamental = ScoreComponent('Fundamental_Score', 0.5, fill_value=0)
+    components = [fundamental, momentum]
+    if use_universe_score:
+        fundamental.weight = momentum.weight = 0.3
+        components = [ScoreComponent('Universe_Score', 0.4, fill_value=universe_score)] + components
+    return ScoringSpec(components).with_weights(Fundamental_Score=fundamental_weight,
+                                                RS_Momentum_Normalized=momentum_weight,
+                                                Universe_Score=universe_weight).normalized()
@@ -0,0 +1,60 @@
+# single_flight.py
+# Penggabungan (coalescing) pemanggilan paralel dengan kunci yang sama menjadi satu eksekusi
+import threading
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    """
+    Pemanggilan dengan kunci yang sama yang datang saat eksekusi sebelumnya masih berjalan
+    menunggu dan memakai hasil eksekusi tersebut (termasuk exception-nya) alih-alih menjalankan ulang.
+    Aman dipakai dari banyak thread.
+    """
+
+    def __init__(self):
+        self.executions = 0  # jumlah eksekusi sebenarnya
+        self.coalesced = 0  # jumlah pemanggilan yang memakai hasil eksekusi yang sedang berjalan
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, func, *args, **kwargs):
+        """
+        Menjalankan func(*args, **kwargs) kecuali eksekusi untuk key yang sama sedang berjalan
+
+        :param key: kunci pemanggilan (hashable)
+        :param func: fungsi yang dijalankan
+        :return: hasil func
+        :raises: exception dari func (juga diteruskan ke pemanggilan yang digabungkan)
+        """
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                leader = False
+            else:
+                future = Future()
+                self._in_flight[key] = future
+                self.executions += 1
+                leader = True
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = func(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    def stats(self):
+        """
+        :return: dict jumlah eksekusi, pemanggilan yang digabungkan, dan eksekusi yang sedang berjalan
+        """
+        with self._lock:
+            return {'executions': self.executions, 'coalesced': self.coalesced, 'in_flight': len(self._in_flight)}
@@ -0,0 +1,144 @@
+# synthetic_data.py
+# Generator universe saham sintetis dengan format CSV aplikasi (Ticker,Date,Open,High,Low,Close,Volume)
+import argparse
+import os
+import numpy as np
+import pandas as pd
+
+BENCHMARK_TICKER = 'LQ45'
+DEFAULT_END_DATE = '2024-12-31'
+UNIVERSE_FILE = 'universe.csv.gz'
+
+
+def trading_calendar(years, end_date=DEFAULT_END_DATE, holiday_rate=0.02, rng=None):
+    """
+    Kalender hari bursa: hari kerja selama `years` tahun hingga end_date, dikurangi hari libur acak
+    (libur berlaku untuk benchmark dan semua saham)
+
+    :param years: panjang periode dalam tahun
+    :param end_date: tanggal terakhir
+    :param holiday_rate: fraksi hari kerja yang dijadikan hari libur
+    :param rng: numpy Generator (opsional)
+    :return: DatetimeIndex
+    """
+    rng = rng if rng is not None else np.random.default_rng(0)
+    end = pd.Timestamp(end_date)
+    dates = pd.bdate_range(end - pd.DateOffset(days=int(round(years * 365.25))), end)
+    holidays = rng.random(len(dates)) < holiday_rate
+    return dates[~holidays]
+
+
+def _ohlcv(close, rng):
+    """
+    Membentuk Open/High/Low/Volume di sekitar harga Close (array tanggal × ticker)
+    """
+    previous = np.vstack([close[:1], close[:-1]])
+    open_ = previous * (1 + rng.normal(0, 0.005, close.shape))
+    high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.005, close.shape)))
+    low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.005, close.shape)))
+    volume = np.round(rng.lognormal(13, 1, close.shape))
+    return open_, high, low, volume
+
+
+def _frame(ticker, dates, open_, high, low, close, volume):
+    return pd.DataFrame({
+        'Ticker': ticker,
+        'Date': dates,
+        'Open': np.round(open_, 2),
+        'High': np.round(high, 2),
+        'Low': np.round(low, 2),
+        'Close': np.round(close, 2),
+        'Volume': volume.astype(np.int64),
+    })
+
+
+def generate_prices(n_tickers=100, years=3, missing_rate=0.01, holiday_rate=0.02, seed=0,
+                    end_date=DEFAULT_END_DATE):
+    """
+    Membuat harga sintetis benchmark dan saham (random walk log-normal dengan beta terhadap benchmark).
+    Hasil selalu sama untuk seed yang sama.
+
+    :param n_tickers: jumlah saham
+    :param years: panjang data dalam tahun
+    :param missing_rate: fraksi hari bursa yang hilang secara acak per saham
+    :param holiday_rate: fraksi hari kerja yang menjadi hari libur bursa
+    :param seed: seed generator acak
+    :param end_date: tanggal terakhir data
+    :return: tuple (DataFrame benchmark, dict ticker -> DataFrame saham)
+    """
+    rng = np.random.default_rng(seed)
+    dates = trading_calendar(years, end_date, holiday_rate, rng)
+    n_dates = len(dates)
+
+    benchmark_returns = rng.normal(0.0003, 0.01, n_dates)
+    benchmark_close = 1000 * np.exp(np.cumsum(benchmark_returns))
+    open_, high, low, volume = _ohlcv(benchmark_close[:, None], rng)
+    benchmark = _frame(BENCHMARK_TICKER, dates, open_[:, 0], high[:, 0], low[:, 0], benchmark_close, volume[:, 0])
+
+    beta = rng.uniform(0.5, 1.5, n_tickers)
+    drift = rng.normal(0, 0.0005, n_tickers)
+    returns = benchmark_returns[:, None] * beta + drift + rng.normal(0, 0.015, (n_dates, n_tickers))
+    close = rng.uniform(50, 10000, n_tickers) * np.exp(np.cumsum(returns, axis=0))
+    open_, high, low, volume = _ohlcv(close, rng)
+    present = rng.random((n_dates, n_tickers)) >= missing_rate
+
+    stocks = {}
+    width = max(4, len(str(n_tickers)))
+    for j in range(n_tickers):
+        ticker = f"S{j:0{width}d}"
+        rows = present[:, j]
+        stocks[ticker] = _frame(ticker, dates[rows], open_[rows, j], high[rows, j], low[rows, j],
+                                close[rows, j], volume[rows, j])
+    return benchmark, stocks
+
+
+def write_universe(output_dir, n_tickers=100, years=3, missing_rate=0.01, holiday_rate=0.02, seed=0,
+                   end_date=DEFAULT_END_DATE, long_format=False, date_format='%Y-%m-%d'):
+    """
+    Menulis universe sintetis ke output_dir: file benchmark dan satu CSV per saham,
+    atau satu file universe format panjang (universe.csv.gz) jika long_format
+
+    :param output_dir: direktori tujuan
+    :param long_format: tulis semua saham ke satu file universe
+    :param date_format: format tanggal di CSV
+    :return: dict dengan kunci 'benchmark' (path), 'stocks' (list path) dan 'universe' (path atau None)
+    """
+    benchmark, stocks = generate_prices(n_tickers, years, missing_rate, holiday_rate, seed, end_date)
+    os.makedirs(output_dir, exist_ok=True)
+
+    benchmark_path = os.path.join(output_dir, f"{BENCHMARK_TICKER}.csv")
+    benchmark.to_csv(benchmark_path, index=False, date_format=date_format)
+
+    if long_format:
+        universe_path = os.path.join(output_dir, UNIVERSE_FILE)
+        pd.concat(stocks.values(), ignore_index=True).to_csv(universe_path, index=False, date_format=date_format)
+        return {'benchmark': benchmark_path, 'stocks': [], 'universe': universe_path}
+
+    stock_paths = []
+    for ticker, frame in stocks.items():
+        path = os.path.join(output_dir, f"{ticker}.csv")
+        frame.to_csv(path, index=False, date_format=date_format)
+        stock_paths.append(path)
+    return {'benchmark': benchmark_path, 'stocks': stock_paths, 'universe': None}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Membuat universe saham sintetis dalam format CSV aplikasi")
+    parser.add_argument('output_dir', help="direktori tujuan")
+    parser.add_argument('--tickers', type=int, default=100, help="jumlah saham (10-2000)")
+    parser.add_argument('--years', type=float, default=3, help="panjang data dalam tahun (1-20)")
+    parser.add_argument('--missing-rate', type=float, default=0.01, help="fraksi hari yang hilang per saham")
+    parser.add_argument('--holiday-rate', type=float, default=0.02, help="fraksi hari kerja yang menjadi libur")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--end-date', default=DEFAULT_END_DATE)
+    parser.add_argument('--long-format', action='store_true', help="tulis satu file universe format panjang")
+    parser.add_argument('--date-format', default='%Y-%m-%d')
+    args = parser.parse_args()
+
+    paths = write_universe(args.output_dir, args.tickers, args.years, args.missing_rate, args.holiday_rate,
+                           args.seed, args.end_date, args.long_format, args.date_format)
+    print(f"Benchmark: {paths['benchmark']}")
+    if paths['universe']:
+        print(f"Universe: {paths['universe']}")
+    else:
+        print(f"{len(paths['stocks'])} file saham ditulis ke {args.output_dir}")